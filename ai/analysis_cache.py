@@ -0,0 +1,154 @@
+# ai/analysis_cache.py - EDITORIAL ELEMZÉS CACHE
+# Változatlan cikkre (cím + tartalom + prompt verzió) nem hívjuk újra a Gemini elemzést
+
+import os
+import re
+import json
+import time
+import atexit
+import hashlib
+import tempfile
+import threading
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: a folyamatok közti zár nélkül, csak atomikus cserével mentünk
+    fcntl = None
+
+from config.settings import (
+    EDITORIAL_ANALYSIS_CACHE_FILE,
+    EDITORIAL_ANALYSIS_CACHE_MAX_ENTRIES,
+    EDITORIAL_ANALYSIS_CACHE_MAX_AGE_DAYS,
+    EDITORIAL_ANALYSIS_CACHE_SAVE_INTERVAL_SECONDS,
+)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class EditorialAnalysisCache:
+    """
+    Tartós elemzés-cache tartalom-hash kulccsal.
+
+    - Kulcs: sha1(prompt verzió + normalizált cím + normalizált tisztított tartalom).
+    - Érték: a `real_category` / `importance_score` / `duplicate_fingerprint` elemzés.
+    - Kilakoltatás mentéskor: `max_age_days`-nél régebbi bejegyzések törlése, majd a
+      legrégebben használtak eldobása `max_entries` fölött.
+    - `hits` / `misses` számlálók a futás statisztikájához.
+    - Mentés: csak változás után és legfeljebb `save_interval` másodpercenként (kilépéskor mindig);
+      a lemezen lévő fájllal összefésülve, `.lock` fájlzár alatt, egyedi ideiglenes fájlon át
+      atomikus cserével - párhuzamos folyamatok nem írják felül egymás bejegyzéseit.
+
+    `path=None` esetén csak memóriában él.
+    """
+
+    def __init__(self, path: Optional[str] = EDITORIAL_ANALYSIS_CACHE_FILE,
+                 max_entries: int = EDITORIAL_ANALYSIS_CACHE_MAX_ENTRIES,
+                 max_age_days: float = EDITORIAL_ANALYSIS_CACHE_MAX_AGE_DAYS,
+                 save_interval: float = EDITORIAL_ANALYSIS_CACHE_SAVE_INTERVAL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.save_interval = save_interval
+        self.entries: Dict[str, Dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._last_save = 0.0
+        self._lock = threading.Lock()
+        self.entries = self._read_file()
+        if self.path:
+            atexit.register(self.save, True)
+
+    def _read_file(self) -> Dict[str, Dict]:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Elemzés cache betöltési hiba: {e}")
+            return {}
+
+    def save(self, force: bool = False):
+        """Összefésülés a lemezen lévő cache-sel, kilakoltatás, majd mentés (ritkítva, `force` esetén azonnal)."""
+        if not self.path:
+            self.evict()
+            return
+        if not self._dirty or (not force and time.time() - self._last_save < self.save_interval):
+            return
+        try:
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            with open(f"{self.path}.lock", 'a') as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                on_disk = self._read_file()
+                with self._lock:
+                    # A másik folyamat bejegyzései megmaradnak; azonos kulcsnál a frissebben használt nyer
+                    for key, entry in on_disk.items():
+                        current = self.entries.get(key)
+                        if current is None or entry.get('last_used', 0) > current.get('last_used', 0):
+                            self.entries[key] = entry
+                    self._dirty = False
+                self.evict()
+                with self._lock:
+                    snapshot = dict(self.entries)
+                fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".analysis_cache.", suffix=".tmp")
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        json.dump(snapshot, f, ensure_ascii=False)
+                    os.replace(tmp_path, self.path)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+            self._last_save = time.time()
+        except Exception as e:
+            self._dirty = True
+            print(f"⚠️ Elemzés cache mentési hiba: {e}")
+
+    @staticmethod
+    def _normalize(text: Optional[str]) -> str:
+        return _WHITESPACE_RE.sub(' ', text or "").strip().lower()
+
+    @classmethod
+    def make_key(cls, title: Optional[str], content: Optional[str], prompt_version: str) -> str:
+        payload = "\x1f".join([prompt_version, cls._normalize(title), cls._normalize(content)])
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or now - entry['created_at'] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            entry['last_used'] = now
+            self.hits += 1
+            return dict(entry['analysis'])
+
+    def put(self, key: str, analysis: Dict):
+        now = time.time()
+        with self._lock:
+            self.entries[key] = {'analysis': analysis, 'created_at': now, 'last_used': now}
+            self._dirty = True
+
+    def evict(self):
+        now = time.time()
+        with self._lock:
+            self.entries = {
+                key: entry for key, entry in self.entries.items()
+                if now - entry['created_at'] <= self.max_age_seconds
+            }
+            if len(self.entries) > self.max_entries:
+                newest = sorted(self.entries.items(), key=lambda item: item[1]['last_used'], reverse=True)
+                self.entries = dict(newest[:self.max_entries])
+
+    def get_statistics(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0,
+        }
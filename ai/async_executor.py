@@ -0,0 +1,54 @@
+# ai/async_executor.py - KORLÁTOS PÁRHUZAMOSSÁGÚ VÉGREHAJTÓ
+# Blokkoló AI hívások futtatása szálakon, felső párhuzamossági korláttal és rate limiterrel
+
+import asyncio
+import concurrent.futures
+from typing import Any, Callable, Iterable, List, Optional
+
+from ai.rate_limiter import TokenBucket
+
+
+def run_coroutine_sync(coroutine) -> Any:
+    """Coroutine futtatása szinkron kódból. Futó event loop esetén külön szálon fut."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+class BoundedAsyncExecutor:
+    """
+    Aszinkron worker pool blokkoló függvényekhez.
+
+    - Egyszerre legfeljebb `max_concurrency` hívás fut, saját szálkészleten
+      (az alapértelmezett executor CPU-számhoz kötött mérete nem korlátozza).
+    - Minden hívás előtt a `rate_limiter` tokent foglal (ha meg van adva).
+    - `map()` az eredményeket a bemenet sorrendjében adja vissza; egy elem
+      kivétele nem állítja le a többit, a helyére `None` kerül.
+    """
+
+    def __init__(self, max_concurrency: int, rate_limiter: Optional[TokenBucket] = None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = rate_limiter
+
+    async def _run(self, semaphore: asyncio.Semaphore, pool: concurrent.futures.ThreadPoolExecutor,
+                   func: Callable, item: Any) -> Any:
+        async with semaphore:
+            if self.rate_limiter:
+                await self.rate_limiter.acquire_async()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(pool, func, item)
+            except Exception as e:
+                print(f"      ⚠️ Párhuzamos végrehajtási hiba ({getattr(func, '__name__', 'task')}): {str(e)}")
+                return None
+
+    async def map(self, func: Callable, items: Iterable[Any]) -> List[Any]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            return await asyncio.gather(*(self._run(semaphore, pool, func, item) for item in items))
+
+    def map_sync(self, func: Callable, items: Iterable[Any]) -> List[Any]:
+        return run_coroutine_sync(self.map(func, list(items)))
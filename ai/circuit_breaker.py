@@ -0,0 +1,144 @@
+# ai/circuit_breaker.py - SZOLGÁLTATÓNKÉNTI CIRCUIT BREAKER
+# Leállt / lassú szolgáltatónál nem várunk minden cikkre timeoutot: azonnali elutasítás, félig nyitott próbával
+
+import time
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from config.settings import (
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    CIRCUIT_BREAKER_RECOVERY_SECONDS,
+    CIRCUIT_BREAKER_HALF_OPEN_PROBES,
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """A szolgáltató áramköre nyitva van - a hívás el sem indult."""
+
+
+class CircuitBreaker:
+    """
+    Klasszikus háromállapotú áramkör.
+
+    - closed: a hívások mennek; `failure_threshold` egymást követő hiba után → open.
+    - open: minden hívás azonnal `CircuitOpenError`; `recovery_seconds` után → half_open.
+    - half_open: legfeljebb `half_open_probes` próbahívás mehet ki egyszerre; siker → closed,
+      hiba → újra open (a várakozás duplázódik, legfeljebb 8x).
+    """
+
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                 recovery_seconds: float = CIRCUIT_BREAKER_RECOVERY_SECONDS,
+                 half_open_probes: int = CIRCUIT_BREAKER_HALF_OPEN_PROBES):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_seconds = recovery_seconds
+        self.half_open_probes = max(1, half_open_probes)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.open_count = 0
+        self.last_error: Optional[str] = None
+        self.stats = {"calls": 0, "failures": 0, "rejected": 0}
+        self._current_recovery = recovery_seconds
+        self._probes_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _refresh_state(self):
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self._current_recovery:
+            self.state = HALF_OPEN
+            self._probes_in_flight = 0
+
+    def is_available(self) -> bool:
+        """Mehet-e most új munka erre a szolgáltatóra (foglalás nélkül, routinghoz)."""
+        with self._lock:
+            self._refresh_state()
+            return self.state == CLOSED or (self.state == HALF_OPEN and self._probes_in_flight < self.half_open_probes)
+
+    def before_call(self):
+        with self._lock:
+            self._refresh_state()
+            if self.state == OPEN or (self.state == HALF_OPEN and self._probes_in_flight >= self.half_open_probes):
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(f"{self.name} áramkör nyitva ({self.last_error or 'ismeretlen hiba'})")
+            if self.state == HALF_OPEN:
+                self._probes_in_flight += 1
+            self.stats["calls"] += 1
+
+    def record_success(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                print(f"   🟢 Circuit breaker ({self.name}): helyreállt, zárva")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self._current_recovery = self.recovery_seconds
+            self._probes_in_flight = 0
+
+    def record_failure(self, error: Exception):
+        with self._lock:
+            self.stats["failures"] += 1
+            self.consecutive_failures += 1
+            self.last_error = f"{type(error).__name__}: {str(error)[:200]}"
+            if self.state == HALF_OPEN:
+                self._current_recovery = min(self._current_recovery * 2, self.recovery_seconds * 8)
+                self._open()
+            elif self.state == CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.open_count += 1
+        self._probes_in_flight = 0
+        print(f"   🔴 Circuit breaker ({self.name}): nyitva {self._current_recovery:.0f}s-ig - {self.last_error}")
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """`func` futtatása az áramkörön át; minden kivétel hibának számít és továbbmegy."""
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+        return result
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh_state()
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = round(max(0.0, self._current_recovery - (time.monotonic() - self.opened_at)), 1)
+            return {
+                "name": self.name,
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "open_count": self.open_count,
+                "retry_in_seconds": retry_in,
+                "last_error": self.last_error,
+                **self.stats,
+            }
+
+
+# === KÖZÖS ÁRAMKÖRÖK ===
+# Szolgáltatónként egy áramkör, amit a generálás, az editorial AI és az API megoszt
+
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    with _registry_lock:
+        breaker = _circuit_breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name)
+            _circuit_breakers[name] = breaker
+        return breaker
+
+
+def get_circuit_breaker_status() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        return {name: breaker.get_status() for name, breaker in _circuit_breakers.items()}
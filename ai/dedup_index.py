@@ -0,0 +1,204 @@
+# ai/dedup_index.py - MINHASH / LSH DUPLIKÁTUM INDEX
+# Jelölt-párok közel lineáris időben; pontos hasonlóság csak a jelöltekre
+
+import zlib
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# A duplikátum-döntés küszöbe (0.6 téma + 0.4 entitás súlyozott hasonlóság fölött duplikátum)
+DUPLICATE_SIMILARITY_THRESHOLD = 0.55
+# MinHash paraméterek: 20 sáv x 3 sor. Közös entitás nélkül csak ~0.92 fölötti téma-hasonlóság
+# lépi át a küszöböt, ami 3-gram Jaccard-ban legalább ~0.6; ott a találati esély > 99%.
+MINHASH_NUM_PERM = 60
+MINHASH_BANDS = 20
+TOPIC_SHINGLE_SIZE = 3
+
+_MERSENNE_PRIME = (1 << 31) - 1
+
+
+def fingerprint_similarity(fp1: Dict, fp2: Dict) -> float:
+    """Két AI ujjlenyomat hasonlósága: 60% téma (SequenceMatcher) + 40% entitás Jaccard."""
+    if not fp1 or not fp2:
+        return 0.0
+
+    topic1 = fp1.get("main_topic", "").lower()
+    topic2 = fp2.get("main_topic", "").lower()
+    topic_sim = SequenceMatcher(None, topic1, topic2).ratio()
+
+    entities1 = set([e.lower() for e in fp1.get("key_entities", [])])
+    entities2 = set([e.lower() for e in fp2.get("key_entities", [])])
+
+    if not entities1 or not entities2:
+        entity_overlap = 0.0
+    else:
+        intersection = len(entities1.intersection(entities2))
+        union = len(entities1.union(entities2))
+        entity_overlap = intersection / union if union > 0 else 0
+
+    return (topic_sim * 0.6) + (entity_overlap * 0.4)
+
+
+def _stable_hash(token: str) -> int:
+    return zlib.crc32(token.encode('utf-8'))
+
+
+def _char_shingles(text: str, size: int = TOPIC_SHINGLE_SIZE) -> Set[str]:
+    text = f" {' '.join(text.lower().split())} "
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def _word_shingles(text: str) -> Set[str]:
+    words = [w for w in ''.join(ch if ch.isalnum() else ' ' for ch in text.lower()).split() if len(w) > 2]
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def _entities(fingerprint: Dict) -> Set[str]:
+    return {str(e).lower() for e in (fingerprint or {}).get("key_entities", []) or []}
+
+
+class FingerprintLSHIndex:
+    """
+    Duplikátum-jelölt index AI ujjlenyomatokhoz és címekhez.
+
+    Három kulcscsalád, a jelöltek ezek uniója:
+    - téma karakter-shingle MinHash sávok (közel azonos `main_topic`),
+    - cím szó-shingle MinHash sávok (azonos sztori más címmel),
+    - pontos entitás invertált index. Mivel közös entitás nélkül csak ~0.92 fölötti
+      téma-hasonlóság lépheti át a 0.55-ös küszöböt, az entitás index + téma LSH együtt
+      gyakorlatilag minden küszöb fölötti párt jelöltként ad vissza.
+    """
+
+    def __init__(self, num_perm: int = MINHASH_NUM_PERM, bands: int = MINHASH_BANDS, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+        self.buckets: Dict[Tuple, List[int]] = {}
+
+    def _minhash(self, shingles: Iterable[str]) -> Optional[np.ndarray]:
+        hashes = np.fromiter((_stable_hash(s) for s in shingles), dtype=np.int64)
+        if hashes.size == 0:
+            return None
+        return ((self._a[:, None] * hashes[None, :] + self._b[:, None]) % _MERSENNE_PRIME).min(axis=1)
+
+    def _band_keys(self, family: str, shingles: Set[str]) -> List[Tuple]:
+        signature = self._minhash(shingles)
+        if signature is None:
+            return []
+        return [(family, band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+                for band in range(self.bands)]
+
+    def _keys(self, fingerprint: Dict, title: str = "") -> List[Tuple]:
+        fingerprint = fingerprint or {}
+        keys = [("e", entity) for entity in _entities(fingerprint)]
+        topic = str(fingerprint.get("main_topic", "") or "")
+        if topic.strip():
+            keys.extend(self._band_keys("t", _char_shingles(topic)))
+        if title:
+            keys.extend(self._band_keys("h", _word_shingles(title)))
+        return keys
+
+    def add(self, item_id: int, fingerprint: Dict, title: str = ""):
+        for key in self._keys(fingerprint, title):
+            self.buckets.setdefault(key, []).append(item_id)
+
+    def candidates(self, fingerprint: Dict, title: str = "") -> Set[int]:
+        found: Set[int] = set()
+        for key in self._keys(fingerprint, title):
+            found.update(self.buckets.get(key, ()))
+        return found
+
+
+def greedy_dedup(items: List[Dict], use_index: bool = True,
+                 threshold: float = DUPLICATE_SIMILARITY_THRESHOLD) -> Tuple[List[int], Dict[int, Tuple[int, float]]]:
+    """
+    Mohó megtartás/elvetés a megadott (már fontosság szerint rendezett) sorrendben.
+    `items`: {"fingerprint": ..., "title": ...} elemek.
+    Visszaad: (megtartott indexek, {duplikátum index: (megtartott index, hasonlóság)}).
+    Indexszel is ugyanaz az első egyező megtartott elem nyer, mint a teljes ciklusban.
+    """
+    kept: List[int] = []
+    duplicates: Dict[int, Tuple[int, float]] = {}
+    index = FingerprintLSHIndex() if use_index else None
+
+    for position, item in enumerate(items):
+        fingerprint = item.get("fingerprint") or {}
+        if index is not None:
+            # A jelöltek a megtartás sorrendjében (kept pozíció szerint) kerülnek összevetésre
+            compare_to = [kept[k] for k in sorted(index.candidates(fingerprint, item.get("title", "")))]
+        else:
+            compare_to = kept
+        for kept_position in compare_to:
+            similarity = fingerprint_similarity(fingerprint, items[kept_position].get("fingerprint") or {})
+            if similarity > threshold:
+                duplicates[position] = (kept_position, similarity)
+                break
+        else:
+            if index is not None:
+                index.add(len(kept), fingerprint, item.get("title", ""))
+            kept.append(position)
+    return kept, duplicates
+
+
+# === REGRESSZIÓS ELLENŐRZÉS ===
+
+def load_regression_corpus(path: str) -> List[Dict]:
+    """
+    Korpusz betöltése: az editorial elemzés cache (valós ujjlenyomatok) vagy egy JSON lista
+    {"title", "importance_score", "duplicate_fingerprint"} elemekkel.
+    """
+    import json
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    records = [entry['analysis'] for entry in data.values()] if isinstance(data, dict) else data
+    items = [
+        {
+            "title": record.get("title", ""),
+            "score": record.get("importance_score", 8),
+            "fingerprint": record.get("duplicate_fingerprint") or {},
+        }
+        for record in records if isinstance(record, dict)
+    ]
+    return sorted(items, key=lambda item: float(item["score"] or 0), reverse=True)
+
+
+def main():
+    import argparse
+    import time
+    from config.settings import EDITORIAL_ANALYSIS_CACHE_FILE
+
+    parser = argparse.ArgumentParser(description="LSH duplikátum index regressziós ellenőrzés")
+    parser.add_argument('--corpus', type=str, default=EDITORIAL_ANALYSIS_CACHE_FILE,
+                        help="Elemzés cache fájl vagy JSON lista ujjlenyomatokkal")
+    args = parser.parse_args()
+
+    items = load_regression_corpus(args.corpus)
+    print(f"🧪 Regressziós korpusz: {len(items)} ujjlenyomat ({args.corpus})")
+
+    start_time = time.perf_counter()
+    brute_kept, brute_duplicates = greedy_dedup(items, use_index=False)
+    brute_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    index_kept, index_duplicates = greedy_dedup(items, use_index=True)
+    index_time = time.perf_counter() - start_time
+
+    print(f"   Teljes ciklus: {brute_time * 1000:8.1f} ms | megtartva {len(brute_kept)}, duplikátum {len(brute_duplicates)}")
+    print(f"   LSH index:     {index_time * 1000:8.1f} ms | megtartva {len(index_kept)}, duplikátum {len(index_duplicates)}")
+    if brute_kept == index_kept and brute_duplicates == index_duplicates:
+        print("✅ A döntések azonosak.")
+    else:
+        differing = set(brute_kept) ^ set(index_kept)
+        print(f"❌ Eltérő döntés {len(differing)} elemnél: {sorted(differing)[:20]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,47 @@
 # ai/editorial_ai.py - v5.0 - OPERATION EFFIZIENZ
 # Egyesített, intelligens előfeldolgozás
 
-import google.generativeai as genai
 from typing import List, Dict, Optional, Any
 import time
-import re
+import threading
 import json
-import os
-from difflib import SequenceMatcher
 
 # A rendszer többi részével való kompatibilitás megőrzése
 from database.models import Article
+from scraper.text_cleaner import clean_html, get_clean_content
+from config.settings import (
+    EDITORIAL_BATCH_ENABLED,
+    EDITORIAL_BATCH_MAX_ARTICLES,
+    EDITORIAL_BATCH_TOKEN_BUDGET,
+    EDITORIAL_BATCH_CONTENT_CHARS,
+    EDITORIAL_MAX_CONCURRENCY,
+    CROSS_RUN_DEDUP_ENABLED,
+    EDITORIAL_DEDUP_ENGINE,
+)
+from ai.rate_limiter import get_gemini_rate_limiter, call_with_backoff
+from ai.circuit_breaker import get_circuit_breaker
+from ai.providers import get_llm_provider
+from ai.async_executor import BoundedAsyncExecutor, run_coroutine_sync
+from ai.analysis_cache import EditorialAnalysisCache
+from ai.dedup_index import greedy_dedup, fingerprint_similarity, DUPLICATE_SIMILARITY_THRESHOLD
+from ai.similarity_matrix import SimilarityMatrixEngine
+from ai.fingerprint_store import StoryFingerprintStore
+from database.db import get_db_session
 try:
     from ai.prompt_manager import get_prompt_manager
     PROMPT_MANAGER_AVAILABLE = True
 except ImportError:
     PROMPT_MANAGER_AVAILABLE = False
 
+# Az elemzés prompt verziója - prompt változtatásnál emelni kell, ez érvényteleníti a cache-t
+ANALYSIS_PROMPT_VERSION = "unified-v1.1"
+# Az elemzésben megengedett kategóriák (zárt lista)
+EDITORIAL_CATEGORIES = ["politics", "economy", "tech", "sport", "entertainment", "foreign", "lifestyle", "cars", "general"]
+# Durva token becslés: ~3 karakter / token (magyar szövegnél óvatosabb, mint a 4)
+CHARS_PER_TOKEN = 3
+# A batch prompt fix (utasítás) részének becsült mérete tokenben
+BATCH_PROMPT_OVERHEAD_TOKENS = 600
+
 
 class StrategicEditorialAI:
     """
@@ -30,24 +55,43 @@ class StrategicEditorialAI:
     ✅ Finomhangolt 0.55 similarity threshold az optimális duplikátum-detektáláshoz.
     """
     
-    def __init__(self):
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
-        if gemini_api_key:
-            genai.configure(api_key=gemini_api_key)
-            self.gemini_model = genai.GenerativeModel('gemini-2.5-flash-preview-05-20')
-            print("✅ Strategic Editorial AI v5.0 (EFFIZIENZ) inicializálva Gemini 2.5 Flash-sel")
+    def __init__(self, batch_size: int = EDITORIAL_BATCH_MAX_ARTICLES,
+                 batch_token_budget: int = EDITORIAL_BATCH_TOKEN_BUDGET,
+                 max_concurrency: int = EDITORIAL_MAX_CONCURRENCY):
+        # A Gemini szolgáltató közös a generálással (élő vagy offline fake, ai/providers.py)
+        self.gemini_provider = get_llm_provider('gemini')
+        if self.gemini_provider.available:
+            print(f"✅ Strategic Editorial AI v5.0 (EFFIZIENZ) inicializálva ({self.gemini_provider.model_name})")
         else:
-            self.gemini_model = None
             print("⚠️ GEMINI_API_KEY hiányzik! Editorial AI letiltva.")
         
         # A PromptManager itt már csak fallback célokat szolgálhat, a fő prompt belső.
         self.prompt_manager = get_prompt_manager() if PROMPT_MANAGER_AVAILABLE else None
+        
+        # Batch elemzés: egy hívásban legfeljebb `batch_size` cikk, `batch_token_budget` becsült tokenig
+        self.batch_enabled = EDITORIAL_BATCH_ENABLED and batch_size > 1
+        self.batch_size = max(1, batch_size)
+        self.batch_token_budget = batch_token_budget
+        self.analysis_stats = {"api_calls": 0, "batch_calls": 0, "batch_items": 0, "single_fallbacks": 0}
+        self._stats_lock = threading.Lock()
+        
+        # Párhuzamos elemzés: korlátos worker pool + a generálással közös Gemini limiter (backoff 429 / 503-ra)
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = get_gemini_rate_limiter(self.gemini_provider.model_name)
+        # A Gemini áramköre közös a generálással: nyitott áramkörnél az elemzés azonnal visszaesik
+        self.circuit_breaker = get_circuit_breaker('gemini')
+        
+        # Változatlan tartalomra nincs újabb AI hívás
+        self.analysis_cache = EditorialAnalysisCache()
+        
+        # Phase 2 duplikátum-motor: "matrix" (NumPy) vagy "lsh" (MinHash index)
+        self.dedup_engine = EDITORIAL_DEDUP_ENGINE
 
     def _get_unified_analysis_prompt(self, article: Article) -> str:
         """
         Létrehozza az új, EGYESÍTETT FELDERÍTÉSI ÉS BESOROLÁSI PARANCS v1.1-et.
         """
-        clean_content = self._clean_content(article.original_content or "")
+        clean_content = get_clean_content(article)
         return f"""
         Elemezd a következő magyar hírcikket a megadott szempontok szerint. A válaszodat kizárólag egyetlen, valid JSON objektumként add vissza.
 
@@ -74,26 +118,250 @@ class StrategicEditorialAI:
         }}
         """
 
+    @staticmethod
+    def _extract_json_value(text: str, opener: str, expected_type: type):
+        """Az első `opener`-rel kezdődő érvényes JSON érték a válaszban (mohó regex helyett: a körítő szöveg zárójelei nem zavarnak)."""
+        decoder = json.JSONDecoder()
+        start = text.find(opener)
+        while start != -1:
+            try:
+                value, _ = decoder.raw_decode(text, start)
+                if isinstance(value, expected_type):
+                    return value
+            except ValueError:
+                pass
+            start = text.find(opener, start + 1)
+        return None
+
+    @classmethod
+    def _extract_json_object(cls, text: str) -> Optional[Dict]:
+        return cls._extract_json_value(text, '{', dict)
+
+    @classmethod
+    def _extract_json_array(cls, text: str) -> Optional[List]:
+        return cls._extract_json_value(text, '[', list)
+
     def _get_unified_analysis(self, article: Article) -> Optional[Dict]:
-        """Egyetlen AI hívással lefuttatja a kategorizálást, fontosság-becslést és ujjlenyomat-készítést."""
-        if not self.gemini_model:
+        """
+        Egyetlen AI hívással lefuttatja a kategorizálást, fontosság-becslést és ujjlenyomat-készítést.
+        Az eredmény a batch elemekkel azonos ellenőrzésen megy át; None, ha nem használható.
+        """
+        if not self.gemini_provider.available:
             return None
         
         prompt = self._get_unified_analysis_prompt(article)
         try:
-            response = self.gemini_model.generate_content(prompt)
-            json_text_match = re.search(r'\{.*\}', response.text, re.DOTALL)
-            if json_text_match:
-                return json.loads(json_text_match.group(0))
-            print(f"      ⚠️ AI Unified Analysis - JSON nem található a válaszban: {response.text}")
-            return None
+            response_text = self._generate(prompt)
+            analysis = self._extract_json_object(response_text)
+            if analysis is None:
+                print(f"      ⚠️ AI Unified Analysis - JSON nem található a válaszban: {response_text}")
+                return None
+            validated = self._validate_analysis(analysis)
+            if validated is None:
+                print(f"      ⚠️ AI Unified Analysis - érvénytelen elemzés: {analysis}")
+            return validated
         except Exception as e:
             print(f"      ⚠️ AI Unified Analysis hiba: {str(e)}")
             return None
 
+    # === BATCH ELEMZÉS ===
+
+    def _get_batch_analysis_prompt(self, articles: List[Article]) -> str:
+        """Több cikk EGYESÍTETT ELEMZÉSE egyetlen promptban; a válasz egy JSON tömb."""
+        article_blocks = []
+        for index, article in enumerate(articles):
+            article_blocks.append(
+                f"[CIKK {index}]\n"
+                f"CÍM: {article.original_title}\n"
+                f"TARTALOM (RÉSZLET): {get_clean_content(article)[:EDITORIAL_BATCH_CONTENT_CHARS]}"
+            )
+        articles_text = "\n\n".join(article_blocks)
+        return f"""
+        Elemezd a következő {len(articles)} magyar hírcikket EGYENKÉNT, egymástól függetlenül. A válaszodat kizárólag egyetlen, valid JSON tömbként add vissza, cikkenként pontosan egy objektummal.
+
+        {articles_text}
+
+        FELADATOK MINDEN CIKKRE:
+        1.  **Kategorizálás:** A cikk legpontosabb kategóriája ebből a zárt listából: [{", ".join(EDITORIAL_CATEGORIES)}].
+        2.  **Fontosság Becslése:** Előzetes fontossági pontszám 1-20 közötti egész számként, ahol a 20 a világszinten is kiemelt hír.
+        3.  **Duplikátum Ujjlenyomat:** A CÍM **ÉS** a TARTALOM együttes elemzése alapján:
+            - `main_topic`: A cikk fő témája 2-4 szóban.
+            - `key_entities`: A legfontosabb személyek, helyek, szervezetek (maximum 4).
+
+        VÁLASZ KIZÁRÓLAG JSON TÖMB FORMÁTUMBAN (az "id" a cikk sorszáma a [CIKK n] jelölésből):
+        [
+            {{
+                "id": 0,
+                "real_category": "meghatározott_kategória",
+                "importance_score": 12,
+                "duplicate_fingerprint": {{
+                    "main_topic": "fő téma 2-4 szóban",
+                    "key_entities": ["entitás_1", "entitás_2"]
+                }},
+                "reasoning": "Rövid, 1 mondatos indoklás."
+            }}
+        ]
+        """
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        return len(text or "") // CHARS_PER_TOKEN + 1
+
+    def _build_analysis_batches(self, articles: List[Article]) -> List[List[Article]]:
+        """Cikkek csoportosítása batch-ekbe a darabszám és a becsült token keret szerint."""
+        batches: List[List[Article]] = []
+        current: List[Article] = []
+        current_tokens = BATCH_PROMPT_OVERHEAD_TOKENS
+        for article in articles:
+            article_tokens = self._estimate_tokens(
+                f"{article.original_title or ''} {get_clean_content(article)[:EDITORIAL_BATCH_CONTENT_CHARS]}"
+            )
+            if current and (len(current) >= self.batch_size or current_tokens + article_tokens > self.batch_token_budget):
+                batches.append(current)
+                current, current_tokens = [], BATCH_PROMPT_OVERHEAD_TOKENS
+            current.append(article)
+            current_tokens += article_tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _validate_analysis(self, analysis: Any) -> Optional[Dict]:
+        """Egy elemzés-objektum ellenőrzése és normalizálása; None, ha nem használható."""
+        if not isinstance(analysis, dict):
+            return None
+        category = str(analysis.get("real_category", "")).strip().lower()
+        if category not in EDITORIAL_CATEGORIES:
+            return None
+        try:
+            score = int(float(analysis.get("importance_score")))
+        except (TypeError, ValueError):
+            return None
+        if not 1 <= score <= 20:
+            return None
+        fingerprint = analysis.get("duplicate_fingerprint")
+        if not isinstance(fingerprint, dict) or not isinstance(fingerprint.get("main_topic"), str):
+            return None
+        entities = fingerprint.get("key_entities", [])
+        if not isinstance(entities, list):
+            return None
+        return {
+            "real_category": category,
+            "importance_score": score,
+            "duplicate_fingerprint": {
+                "main_topic": fingerprint["main_topic"],
+                "key_entities": [str(entity) for entity in entities][:4],
+            },
+            "reasoning": analysis.get("reasoning", ""),
+        }
+
+    def _get_batch_analysis(self, articles: List[Article]) -> List[Optional[Dict]]:
+        """Egy AI hívás több cikkre. A lista sorrendje a bemenetével egyezik; hibás elem helyén None."""
+        results: List[Optional[Dict]] = [None] * len(articles)
+        if not self.gemini_provider.available:
+            return results
+
+        prompt = self._get_batch_analysis_prompt(articles)
+        try:
+            self._count_stat("api_calls")
+            self._count_stat("batch_calls")
+            response_text = self._generate(prompt)
+            items = self._extract_json_array(response_text)
+            if items is None:
+                print(f"      ⚠️ AI Batch Analysis - JSON tömb nem található a válaszban ({len(articles)} cikk)")
+                return results
+        except Exception as e:
+            print(f"      ⚠️ AI Batch Analysis hiba: {str(e)}")
+            return results
+
+        # Eltérő elemszámnál a pozíció nem megbízható: csak az explicit id-vel jelölt elemek használhatók
+        length_matches = len(items) == len(articles)
+        if not length_matches:
+            print(f"      ⚠️ AI Batch Analysis - {len(items)} elem érkezett {len(articles)} cikkre, csak az id-s elemek használhatók")
+        for position, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            if "id" not in item and not length_matches:
+                continue
+            index = item.get("id", position)
+            try:
+                index = int(index)
+            except (TypeError, ValueError):
+                continue
+            if 0 <= index < len(articles) and results[index] is None:
+                results[index] = self._validate_analysis(item)
+        return results
+
+    def _generate(self, prompt: str) -> str:
+        """Gemini hívás az áramkörön és a közös limiter keretén belül, 429 / 503 esetén backoff-fal."""
+        return self.circuit_breaker.call(
+            call_with_backoff, self.rate_limiter, self.gemini_provider.generate, prompt,
+            estimated_tokens=self._estimate_tokens(prompt)
+        )
+
+    def _count_stat(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.analysis_stats[key] += amount
+
+    def _analyze_single(self, article: Article) -> Optional[Dict]:
+        self._count_stat("api_calls")
+        return self._get_unified_analysis(article)
+
+    def _analyze_batch(self, batch: List[Article]) -> List[Optional[Dict]]:
+        # Egyelemű batch-nél nincs értelme a batch promptnak: egyből az egyedi hívás jön
+        return self._get_batch_analysis(batch) if len(batch) > 1 else [None]
+
+    def _analysis_cache_key(self, article: Article) -> str:
+        return EditorialAnalysisCache.make_key(article.original_title, get_clean_content(article), ANALYSIS_PROMPT_VERSION)
+
+    async def _analyze_articles_async(self, articles: List[Article]) -> List[Optional[Dict]]:
+        """
+        Phase 1 elemzés: előbb a tartalom-hash cache, a maradék cikkekre AI hívás.
+        A lista sorrendje megegyezik a bemenetével.
+        """
+        cache_keys = [self._analysis_cache_key(article) for article in articles]
+        # A korábban (ellenőrzés nélkül) cache-elt elemzések is átmennek az ellenőrzésen
+        analyses = [self._validate_analysis(self.analysis_cache.get(key)) for key in cache_keys]
+        miss_positions = [i for i, analysis in enumerate(analyses) if analysis is None]
+
+        if miss_positions:
+            fresh_results = await self._analyze_uncached_async([articles[i] for i in miss_positions])
+            for position, analysis in zip(miss_positions, fresh_results):
+                analyses[position] = analysis
+                if analysis is not None:
+                    self.analysis_cache.put(cache_keys[position], analysis)
+            self.analysis_cache.save()
+        return analyses
+
+    async def _analyze_uncached_async(self, articles: List[Article]) -> List[Optional[Dict]]:
+        """
+        AI elemzés a korlátos worker poolon: batch hívások, a hibás / hiányzó
+        elemekre egyedi hívás visszaesésként. A lista sorrendje megegyezik a bemenetével.
+        """
+        executor = BoundedAsyncExecutor(self.max_concurrency)
+        if not self.batch_enabled:
+            return await executor.map(self._analyze_single, articles)
+
+        analyses: List[Optional[Dict]] = []
+        batches = self._build_analysis_batches(articles)
+        for batch, batch_results in zip(batches, await executor.map(self._analyze_batch, batches)):
+            analyses.extend(batch_results or [None] * len(batch))
+
+        fallback_positions = [i for i, analysis in enumerate(analyses) if analysis is None]
+        self._count_stat("batch_items", len(articles) - len(fallback_positions))
+        self._count_stat("single_fallbacks", len(fallback_positions))
+        if fallback_positions:
+            fallback_results = await executor.map(self._analyze_single, [articles[i] for i in fallback_positions])
+            for position, analysis in zip(fallback_positions, fallback_results):
+                analyses[position] = analysis
+        return analyses
+
     def process_articles_editorial(self, articles: List[Article]) -> Dict[str, Any]:
+        """Szinkron belépési pont (test_master, régi hívók)."""
+        return run_coroutine_sync(self.process_articles_editorial_async(articles))
+
+    async def process_articles_editorial_async(self, articles: List[Article]) -> Dict[str, Any]:
         """A teljes, új, intelligens előfeldolgozási csővezeték."""
-        if not self.gemini_model:
+        if not self.gemini_provider.available:
             return {"kept": articles, "duplicates": [], "merged": [], "analysis": {}}
 
         print(f"\n📝 STRATEGIC EDITORIAL AI v5.0 PROCESSING (EFFIZIENZ PROTOKOLL)")
@@ -102,9 +370,11 @@ class StrategicEditorialAI:
         # 1. FÁZIS: EGYESÍTETT AI ELEMZÉS MINDEN CIKKRE
         print("🤖 Phase 1: Egyesített AI elemzés futtatása...")
         start_time = time.time()
+        stats_before = dict(self.analysis_stats)
+        cache_hits_before = self.analysis_cache.hits
         
-        for article in articles:
-            analysis = self._get_unified_analysis(article)
+        analyses = await self._analyze_articles_async(articles)
+        for article, analysis in zip(articles, analyses):
             # Az eredményt ideiglenesen az objektumhoz csatoljuk
             article.ai_analysis = analysis if analysis else {
                 "real_category": article.category, "importance_score": 8,
@@ -116,9 +386,11 @@ class StrategicEditorialAI:
             article.importance_score = article.ai_analysis.get("importance_score", 8)
             
             print(f"   📊 {article.source}: {article.category} (score: {article.importance_score})")
-            time.sleep(0.3) # Rate limiting
 
-        print(f"   ✅ Elemzés kész: {time.time() - start_time:.1f}s")
+        run_stats = {key: value - stats_before[key] for key, value in self.analysis_stats.items()}
+        cache_hits = self.analysis_cache.hits - cache_hits_before
+        print(f"   ✅ Elemzés kész: {time.time() - start_time:.1f}s ({cache_hits} cache találat, {run_stats['api_calls']} AI hívás, "
+              f"{run_stats['batch_items']} cikk batch-ben, {run_stats['single_fallbacks']} egyedi visszaesés)")
 
         # 2. FÁZIS: DUPLIKÁTUM-SZŰRÉS AZ AI UJJLENYOMATOK ALAPJÁN
         print("🔍 Phase 2: Duplikátum-szűrés az intelligens ujjlenyomatok alapján...")
@@ -129,35 +401,36 @@ class StrategicEditorialAI:
         # Először rendezzük a cikkeket a kapott fontosság szerint, hogy a fontosabb maradjon meg
         sorted_articles = sorted(articles, key=lambda a: a.importance_score, reverse=True)
 
-        for article in sorted_articles:
-            is_duplicate = False
-            current_fingerprint = article.ai_analysis.get("duplicate_fingerprint", {})
-            
-            for kept_article in kept_articles:
-                # Hasonlósági pontszám számítása a két ujjlenyomat között
-                kept_fingerprint = kept_article.ai_analysis.get("duplicate_fingerprint", {})
-                similarity = self._calculate_fingerprint_similarity(current_fingerprint, kept_fingerprint)
-                
-                # FINOMHANGOLT THRESHOLD: 0.55 (volt: 0.75)
-                if similarity > 0.55:
-                    is_duplicate = True
-                    print(f"   🗑️ Duplikátum (sim: {similarity:.2f}): [{article.source}] '{article.original_title[:40]}...' ~ [{kept_article.source}] '{kept_article.original_title[:40]}...'. Elvetve.")
-                    duplicates.append(article)
-                    break
-
-            if not is_duplicate:
+        # Döntés a választott motorral (mátrix / LSH), mindkettő pontos hasonlósággal erősít meg
+        items = [
+            {"fingerprint": article.ai_analysis.get("duplicate_fingerprint", {}), "title": article.original_title or ""}
+            for article in sorted_articles
+        ]
+        kept_positions, duplicate_matches = self._find_duplicates(items)
+        for position, article in enumerate(sorted_articles):
+            if position in duplicate_matches:
+                kept_position, similarity = duplicate_matches[position]
+                kept_article = sorted_articles[kept_position]
+                print(f"   🗑️ Duplikátum (sim: {similarity:.2f}): [{article.source}] '{article.original_title[:40]}...' ~ [{kept_article.source}] '{kept_article.original_title[:40]}...'. Elvetve.")
+                duplicates.append(article)
+            else:
                 kept_articles.append(article)
                 print(f"   ✅ Megtartva: [{article.source}] '{article.original_title[:40]}...' (score: {article.importance_score})")
         
+        # 2/B FÁZIS: ÖSSZEVETÉS A KORÁBBI FUTÁSOKBAN MÁR LEGENERÁLT SZTORIKKAL
+        kept_articles, linked = self._link_cross_run_duplicates(kept_articles)
+        
         print(f"\n   📊 Szűrés kész:")
         print(f"      ✅ Megtartva: {len(kept_articles)} cikk")
         print(f"      🗑️ Duplikátumok: {len(duplicates)} cikk")
+        print(f"      🔗 Korábbi sztorihoz kötve: {len(linked)} cikk")
         print(f"      📈 Duplikátum arány: {(len(duplicates)/len(articles)*100):.1f}%")
         
         return {
             "kept": kept_articles,
             "duplicates": duplicates,
             "merged": [],
+            "linked": linked,
             "analysis": {
                 "message": "Efficiency Protocol Complete", 
                 "duplicate_rate": len(duplicates)/len(articles) if articles else 0,
@@ -165,55 +438,93 @@ class StrategicEditorialAI:
             }
         }
 
-    def _calculate_fingerprint_similarity(self, fp1: Dict, fp2: Dict) -> float:
-        """Kiszámolja a hasonlóságot két AI által generált ujjlenyomat között."""
-        if not fp1 or not fp2: 
-            return 0.0
+    def _find_duplicates(self, items: List[Dict]):
+        """
+        Mohó duplikátum-szűrés a fontosság szerint rendezett ujjlenyomatokon.
+        `matrix`: NumPy hasonlósági mátrix; `lsh`: MinHash jelölt index. Küszöb: 0.55.
+        """
+        if self.dedup_engine == "lsh":
+            return greedy_dedup(items, use_index=True)
+        return SimilarityMatrixEngine().greedy_dedup(items)
 
-        topic1 = fp1.get("main_topic", "").lower()
-        topic2 = fp2.get("main_topic", "").lower()
-        topic_sim = SequenceMatcher(None, topic1, topic2).ratio()
+    def _link_cross_run_duplicates(self, articles: List[Article]):
+        """
+        A megtartott cikkek összevetése az ablakba eső, már legenerált sztorikkal.
+        Egyezésnél a cikk nem megy generálásra: `duplicate_of_id` a korábbi sztorira mutat.
+        Feldolgozatlan marad (nincs AI tartalma, nem publikálható); a kiválasztó lekérdezések
+        a `duplicate_of_id IS NULL` feltétellel hagyják ki. Visszaad: (megmaradó cikkek, hozzákötött cikkek).
+        """
+        if not CROSS_RUN_DEDUP_ENABLED or not articles:
+            return articles, []
 
-        entities1 = set([e.lower() for e in fp1.get("key_entities", [])])
-        entities2 = set([e.lower() for e in fp2.get("key_entities", [])])
-        
-        if not entities1 and not entities2: 
-            entity_overlap = 0.0
-        elif not entities1 or not entities2: 
-            entity_overlap = 0.0
-        else:
-            intersection = len(entities1.intersection(entities2))
-            union = len(entities1.union(entities2))
-            entity_overlap = intersection / union if union > 0 else 0
+        store = StoryFingerprintStore()
+        try:
+            story_count = store.load()
+        except Exception as e:
+            print(f"   ⚠️ Korábbi sztorik betöltési hiba, futásokon átívelő szűrés kihagyva: {str(e)}")
+            return articles, []
+        if not story_count:
+            return articles, []
 
-        # Weighted combination: 60% topic + 40% entities
-        final_similarity = (topic_sim * 0.6) + (entity_overlap * 0.4)
-        
-        return final_similarity
+        remaining: List[Article] = []
+        linked: List[Article] = []
+        for article in articles:
+            fingerprint = article.ai_analysis.get("duplicate_fingerprint", {})
+            match = store.find_match(fingerprint, article.original_title or "", exclude_article_id=getattr(article, 'id', None))
+            if match is None:
+                remaining.append(article)
+                continue
+            story, similarity = match
+            article.duplicate_of_id = story["article_id"]
+            linked.append(article)
+            print(f"   🔗 Korábbi sztori (sim: {similarity:.2f}): [{article.source}] '{article.original_title[:40]}...' ~ '{story['title'][:40]}...' (ID: {story['article_id']})")
+
+        persisted = [article for article in linked if getattr(article, 'id', None)]
+        if persisted:
+            db = get_db_session()
+            try:
+                for article in persisted:
+                    db.query(Article).filter(Article.id == article.id).update(
+                        {"duplicate_of_id": article.duplicate_of_id},
+                        synchronize_session=False
+                    )
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                print(f"   ⚠️ Duplikátum-kötés mentési hiba: {str(e)}")
+            finally:
+                db.close()
+        return remaining, linked
+
+    def _calculate_fingerprint_similarity(self, fp1: Dict, fp2: Dict) -> float:
+        """Kiszámolja a hasonlóságot két AI által generált ujjlenyomat között."""
+        return fingerprint_similarity(fp1, fp2)
 
     def _clean_content(self, content: str) -> str:
-        """HTML címkék eltávolítása és egyszerűsítés."""
-        if not content: 
-            return ""
-        # HTML tags removal + whitespace cleanup
-        clean = re.sub(r'<[^>]+>', '', content)
-        clean = re.sub(r'\s+', ' ', clean).strip()
-        return clean
+        """HTML címkék eltávolítása és egyszerűsítés (közös text_cleaner)."""
+        return clean_html(content)
 
     def get_session_statistics(self) -> Dict:
         """Enhanced session statistics for v5.0"""
         return {
             "version": "5.0_EFFIZIENZ",
-            "gemini_model": "2.5-flash-preview",
-            "similarity_threshold": 0.55,
+            "gemini_model": self.gemini_provider.model_name,
+            "similarity_threshold": DUPLICATE_SIMILARITY_THRESHOLD,
             "features": [
                 "unified_analysis", 
                 "intelligent_categorization", 
                 "ai_fingerprint_deduplication",
                 "importance_scoring"
             ],
-            "gemini_available": self.gemini_model is not None,
-            "prompt_manager_available": self.prompt_manager is not None
+            "gemini_available": self.gemini_provider.available,
+            "prompt_manager_available": self.prompt_manager is not None,
+            "batch_enabled": self.batch_enabled,
+            "batch_size": self.batch_size,
+            "batch_token_budget": self.batch_token_budget,
+            "max_concurrency": self.max_concurrency,
+            "dedup_engine": self.dedup_engine,
+            "analysis_stats": dict(self.analysis_stats),
+            "analysis_cache": self.analysis_cache.get_statistics()
         }
 
 # Wrapper class a visszamenőleges kompatibilitásért
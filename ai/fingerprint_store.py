@@ -0,0 +1,85 @@
+# ai/fingerprint_store.py - FUTÁSOKON ÁTÍVELŐ DUPLIKÁTUM-SZŰRÉS
+# A legenerált sztorik ujjlenyomata tartósan, az új cikkek egy gördülő ablakkal szemben ellenőrizve
+
+import json
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from config.settings import CROSS_RUN_DEDUP_WINDOW_HOURS
+from database.db import get_db_session
+from database.models import Article, StoryFingerprint
+from ai.dedup_index import FingerprintLSHIndex, fingerprint_similarity, DUPLICATE_SIMILARITY_THRESHOLD
+
+
+def record_story_fingerprint(db: Session, article: Article):
+    """
+    A legenerált cikk ujjlenyomatának felvétele a hívó tranzakciójába.
+    Az ujjlenyomat az editorial AI által az objektumra tett `ai_analysis`-ből jön.
+    """
+    analysis = getattr(article, 'ai_analysis', None) or {}
+    fingerprint = analysis.get('duplicate_fingerprint') or {}
+    if not fingerprint or not getattr(article, 'id', None):
+        return
+    db.add(StoryFingerprint(
+        article_id=article.id,
+        title=(article.original_title or "")[:500],
+        main_topic=str(fingerprint.get('main_topic', ''))[:200],
+        key_entities=json.dumps([str(e) for e in fingerprint.get('key_entities', []) or []], ensure_ascii=False),
+        created_at=datetime.utcnow(),
+    ))
+
+
+class StoryFingerprintStore:
+    """
+    A gördülő ablakba eső (alapból 48 órás) sztori-ujjlenyomatok egy LSH indexben.
+    `find_match()` a legjobban egyező korábbi sztorit adja vissza, ha a hasonlóság
+    átlépi a duplikátum-küszöböt.
+    """
+
+    def __init__(self, window_hours: float = CROSS_RUN_DEDUP_WINDOW_HOURS):
+        self.window_hours = window_hours
+        self.stories: List[Dict] = []
+        self.index = FingerprintLSHIndex()
+
+    def load(self, now: Optional[datetime] = None) -> int:
+        """Az ablakba eső ujjlenyomatok betöltése egyetlen lekérdezéssel (`now` UTC, mint a `created_at`)."""
+        # created_at UTC: a régi, func.now() alapértékkel írt sorokat is UTC-ben tárolta az SQLite
+        cutoff = (now or datetime.utcnow()) - timedelta(hours=self.window_hours)
+        db = get_db_session()
+        try:
+            rows = db.query(
+                StoryFingerprint.article_id, StoryFingerprint.title,
+                StoryFingerprint.main_topic, StoryFingerprint.key_entities
+            ).filter(StoryFingerprint.created_at >= cutoff).order_by(StoryFingerprint.created_at).all()
+        finally:
+            db.close()
+
+        self.stories = []
+        self.index = FingerprintLSHIndex()
+        for article_id, title, main_topic, key_entities in rows:
+            try:
+                entities = json.loads(key_entities) if key_entities else []
+            except ValueError:
+                entities = []
+            story = {
+                "article_id": article_id,
+                "title": title or "",
+                "fingerprint": {"main_topic": main_topic or "", "key_entities": entities},
+            }
+            self.index.add(len(self.stories), story["fingerprint"], story["title"])
+            self.stories.append(story)
+        return len(self.stories)
+
+    def find_match(self, fingerprint: Dict, title: str = "",
+                   exclude_article_id: Optional[int] = None) -> Optional[Tuple[Dict, float]]:
+        best: Optional[Tuple[Dict, float]] = None
+        for position in self.index.candidates(fingerprint, title):
+            story = self.stories[position]
+            if exclude_article_id is not None and story["article_id"] == exclude_article_id:
+                continue
+            similarity = fingerprint_similarity(fingerprint, story["fingerprint"])
+            if similarity > DUPLICATE_SIMILARITY_THRESHOLD and (best is None or similarity > best[1]):
+                best = (story, similarity)
+        return best
@@ -3,6 +3,7 @@
 
 import os
 import json
+import threading
 from typing import Dict, Optional, Any, List
 from pathlib import Path
 from datetime import datetime
@@ -173,6 +174,8 @@ class AIJournalistManager:
         
         # Daily usage tracking
         self.daily_usage = {}
+        self._usage_date = None
+        self._usage_lock = threading.Lock()
         self.reset_daily_usage_if_needed()
         
         print(f"👥 AI Journalist Manager initialized with {len(self.journalist_config)} specialists!")
@@ -715,8 +718,9 @@ JSON VÁLASZ:
         best_match = matching_journalists[0]
         journalist_id = best_match["journalist_id"]
         
-        # Update daily usage
-        self.daily_usage[journalist_id] = self.daily_usage.get(journalist_id, 0) + 1
+        # Update daily usage (blitz és stratégiai csatorna párhuzamosan is választhat)
+        with self._usage_lock:
+            self.daily_usage[journalist_id] = self.daily_usage.get(journalist_id, 0) + 1
         
         print(f"   👤 Kiválasztott újságíró: {best_match['config']['icon']} {best_match['config']['name']}")
         print(f"      📊 Szakértelem: {', '.join(best_match['config']['specialty'])}")
@@ -829,28 +833,37 @@ JSON VÁLASZ:
         return None
     
     def reset_daily_usage_if_needed(self):
-        """Reset daily usage counters if new day"""
+        """Reset daily usage counters if new day (file is read only on first call - never over newer in-memory usage)"""
         current_date = datetime.now().date()
         
         # Simple file-based tracking
         usage_file = "data/journalist_daily_usage.json"
         
-        try:
-            if os.path.exists(usage_file):
-                with open(usage_file, 'r') as f:
-                    data = json.load(f)
-                    stored_date = data.get('date')
-                    
-                if stored_date == str(current_date):
-                    self.daily_usage = data.get('usage', {})
+        with self._usage_lock:
+            usage_date = self._usage_date
+            if usage_date == current_date:
+                return
+            self._usage_date = current_date
+            if usage_date is not None:
+                self.daily_usage = {}
+                return
+            
+            try:
+                if os.path.exists(usage_file):
+                    with open(usage_file, 'r') as f:
+                        data = json.load(f)
+                        stored_date = data.get('date')
+                        
+                    if stored_date == str(current_date):
+                        self.daily_usage = data.get('usage', {})
+                    else:
+                        self.daily_usage = {}
                 else:
                     self.daily_usage = {}
-            else:
+                    
+            except Exception as e:
+                print(f"⚠️ Error loading daily usage: {e}")
                 self.daily_usage = {}
-                
-        except Exception as e:
-            print(f"⚠️ Error loading daily usage: {e}")
-            self.daily_usage = {}
     
     def save_daily_usage(self):
         """Save daily usage counters"""
@@ -5,19 +5,36 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-import openai
-from openai import OpenAI
-import google.generativeai as genai
 from database.db import get_db_session
 from database.models import Article, ProcessingLog
-from config.settings import OPENAI_API_KEY
+from database.quota import DailyQuota
+from config.settings import (
+    AI_MAX_TOKENS,
+    GPT4O_MAX_CONCURRENCY,
+    GEMINI_GENERATION_MAX_CONCURRENCY,
+    GPT4O_RATE_LIMIT_PER_MINUTE,
+    BLITZ_GPT4O_CONCURRENCY,
+    BLITZ_GEMINI_CONCURRENCY,
+    STRATEGIC_GPT4O_CONCURRENCY,
+    STRATEGIC_GEMINI_CONCURRENCY,
+    GPT4O_TOKENS_PER_MINUTE,
+    GPT35_RATE_LIMIT_PER_MINUTE,
+    LLM_STREAMING_ENABLED,
+)
 from config.sources import is_fast_lane_source # Csak a fast-lane ellenőrzés maradt
+from scraper.text_cleaner import clean_html, get_clean_content
+from ai.fingerprint_store import record_story_fingerprint
+from ai.rate_limiter import get_rate_limiter, get_gemini_rate_limiter, call_with_backoff
+from ai.circuit_breaker import get_circuit_breaker, CircuitOpenError
+from ai.response_cache import get_response_cache
+from ai.providers import get_llm_provider
+from ai.stream_json import IncrementalJSONObjectParser, parse_json_object
 import time
 import re
 import json
-import os
 import traceback  # Új import a részletes hibakövetéshez
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from collections import defaultdict
 from typing import List, Dict, Any
 
@@ -47,18 +64,15 @@ class StrategicDualPhaseAIProcessor:
     ✅ Enhanced Error Logging and Diagnostics.
     """
     
-    def __init__(self):
+    def __init__(self, use_response_cache: bool = True):
         print("🧲 Initializing AI Processor v5.0 (BEFEHLSKETTE + FEUERLEITANLAGE)...")
         
-        self.openai_client = OpenAI(api_key=OPENAI_API_KEY)
-        
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
-        if gemini_api_key:
-            genai.configure(api_key=gemini_api_key)
-            self.gemini_model = genai.GenerativeModel('gemini-2.5-flash-preview-05-20')
-            print("✅ Gemini 2.5 Flash connected")
+        # Szolgáltatók (ai/providers.py): élő OpenAI / Gemini, vagy offline fake benchmarkhoz
+        self.openai_provider = get_llm_provider('openai')
+        self.gemini_provider = get_llm_provider('gemini')
+        if self.gemini_provider.available:
+            print(f"✅ Gemini connected ({self.gemini_provider.model_name})")
         else:
-            self.gemini_model = None
             print("⚠️ GEMINI_API_KEY missing!")
         
         self.prompt_manager = get_prompt_manager() if PROMPT_MANAGER_AVAILABLE else None
@@ -71,17 +85,60 @@ class StrategicDualPhaseAIProcessor:
             "standard": 12     # 12-13 = GPT-4o if quota available
         }
         
-        self.daily_premium_count = 0
         self.daily_premium_limit = 15
+        # A napi prémium kvóta az adatbázisban él (database/quota.py): az API, a scheduler és az orchestrator
+        # folyamatai ugyanabból foglalnak, atomikus feltételes UPDATE-tel. A `daily_premium_count` csak az
+        # utoljára látott érték (riportokhoz).
+        self.premium_quota = DailyQuota("gpt4o_premium")
+        self.daily_premium_count = 0
+        # A tervezés (kvóta + újságíró) egy lépésben fut a párhuzamos workerek / csatornák között
+        self._quota_lock = threading.Lock()
+        
+        # Az újságíró-kiosztás napi számlálóit a csatornák párhuzamosan is módosítanák
+        self._planning_lock = threading.Lock()
+        
+        # Csatornánkénti, modellenkénti párhuzamossági keret; a rate limiter viszont közös
+        self.channel_concurrency = {
+            'default': {'gpt4o': GPT4O_MAX_CONCURRENCY, 'gemini': GEMINI_GENERATION_MAX_CONCURRENCY},
+            'blitz': {'gpt4o': BLITZ_GPT4O_CONCURRENCY, 'gemini': BLITZ_GEMINI_CONCURRENCY},
+            'strategic': {'gpt4o': STRATEGIC_GPT4O_CONCURRENCY, 'gemini': STRATEGIC_GEMINI_CONCURRENCY},
+        }
+        self._channel_slots = {
+            channel: {model: threading.BoundedSemaphore(max(1, limit)) for model, limit in limits.items()}
+            for channel, limits in self.channel_concurrency.items()
+        }
+        # Modellenkénti közös, adaptív limiterek: minden LLM hívás ezeken megy át (429 / 503 → lassítás + backoff)
+        self._rate_limiters = {
+            'gpt4o': get_rate_limiter('openai:gpt-4o', GPT4O_RATE_LIMIT_PER_MINUTE, burst=GPT4O_MAX_CONCURRENCY,
+                                      tokens_per_minute=GPT4O_TOKENS_PER_MINUTE),
+            'gpt35': get_rate_limiter('openai:gpt-3.5-turbo', GPT35_RATE_LIMIT_PER_MINUTE),
+            # Az elemzéssel közös Gemini keret (ugyanaz a modell és kulcs)
+            'gemini': get_gemini_rate_limiter(self.gemini_provider.model_name),
+        }
+        
+        # Szolgáltatónkénti áramkör: nyitott áramkörnél a munka azonnal a másik modellre megy, vagy halasztódik
+        self._circuit_breakers = {
+            'openai': get_circuit_breaker('openai'),
+            'gemini': get_circuit_breaker('gemini'),
+        }
+        
+        # Válasz-cache (modell + prompt hash + paraméterek); `use_response_cache=False` = kényszerített újragenerálás
+        self.response_cache = get_response_cache() if use_response_cache else None
+        
+        # Streaming generálás: a mezők a válasz érkezése közben értelmeződnek.
+        # Figyelők: callable(article, mező, érték) - pl. a cím és a kulcsszavak már a törzs előtt használhatók
+        self.streaming_enabled = LLM_STREAMING_ENABLED
+        self.field_listeners = []
         
         # Session statistics
         self.session_stats = defaultdict(int)
         
         print("🎯 AI Processor v5.0 ready for final deployment with enhanced diagnostics!")
         
-    def process_articles_for_generation(self, articles: List[Article]) -> int:
+    def process_articles_for_generation(self, articles: List[Article], channel: str = 'default') -> int:
         """
         FŐ FUNKCIÓ v5.0: Az elő-feldolgozott és szűrt cikkek átvétele és a tartalom-generálás elindítása.
+        A `channel` a párhuzamossági keretet választja ki (default / blitz / strategic).
         
         Az editorial_ai.py v5.0 már elvégezte:
         - Kategorizálást
@@ -106,74 +163,74 @@ class StrategicDualPhaseAIProcessor:
             processed_count = 0
             start_time = time.time()
             
+            # 1. Újságíró és modell kiosztás sorrendben (a kvóta a bemeneti prioritás szerint fogy)
+            assignments = []
             for i, article in enumerate(articles):
                 try:
-                    print(f"\n🎯 Processing {i+1}/{len(articles)}: {article.original_title[:50]}...")
-                    
-                    # A cikk már rendelkezik a `category` és `importance_score` attribútumokkal az editorial_ai-tól.
-                    importance_score = getattr(article, 'importance_score', 8)
-                    category = getattr(article, 'category', 'general')
-                    
-                    print(f"   📊 Category: {category}, Importance: {importance_score}/20")
-                    
-                    # Újságíró kijelölés
-                    journalist_assignment = None
-                    if self.journalist_manager:
-                        journalist_assignment = self.journalist_manager.select_journalist_for_article(
-                            category, importance_score, article.original_content or ""
-                        )
+                    print(f"\n🎯 Planning {i+1}/{len(articles)}: {article.original_title[:50]}...")
+                    assignments.append(self._plan_generation(article))
+                except Exception as e:
+                    print(f"   ❌ Planning error (Article ID: {article.id}): {type(e).__name__}: {str(e)}")
+                    assignments.append(None)
+            
+            # 2. Párhuzamos generálás modellenkénti korláttal; 3. DB írás a bemeneti sorrendben, egy szálon
+            max_workers = self.channel_worker_count(channel)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(self._generate_with_limits, article, plan['model'], plan['journalist_assignment'], channel)
+                    if plan else None
+                    for article, plan in zip(articles, assignments)
+                ]
+                
+                for i, (article, plan, future) in enumerate(zip(articles, assignments, futures)):
+                    if future is None:
+                        self.session_stats['generation_errors'] += 1
+                        continue
+                    journalist_assignment = plan['journalist_assignment']
+                    try:
+                        ai_result = future.result()
+                        model_to_use = ai_result.get('model_used', plan['model'])
+                        
+                        # Adatbázis frissítése a végleges tartalommal
+                        article.ai_summary = ai_result.get('article_body', ai_result.get('summary'))
+                        article.ai_title = ai_result.get('title')
+                        article.sentiment = ai_result.get('sentiment')
+                        article.seo_keywords = ai_result.get('keywords')
+                        article.is_processed = True # A cikk feldolgozása befejeződött
+                        article.processing_model = f"befehlskette_v5.0_{model_to_use}"
                         
                         if journalist_assignment:
-                            print(f"   👤 Journalist: {journalist_assignment['journalist_name']}")
-                            self.session_stats['journalist_assignments'] += 1
-                    
-                    # Model meghatározás
-                    model_to_use = self._determine_model(importance_score, journalist_assignment)
-                    print(f"   🤖 Model: {model_to_use.upper()}")
-                    
-                    # Tartalom generálás
-                    ai_result = self._generate_final_content(article, model_to_use, journalist_assignment)
-
-                    # Adatbázis frissítése a végleges tartalommal
-                    article.ai_summary = ai_result.get('article_body', ai_result.get('summary'))
-                    article.ai_title = ai_result.get('title')
-                    article.sentiment = ai_result.get('sentiment')
-                    article.seo_keywords = ai_result.get('keywords')
-                    article.is_processed = True # A cikk feldolgozása befejeződött
-                    article.processing_model = f"befehlskette_v5.0_{model_to_use}"
-                    
-                    if journalist_assignment:
-                        article.assigned_journalist = journalist_assignment.get('journalist_id')
-                        article.journalist_name = journalist_assignment.get('journalist_name')
+                            article.assigned_journalist = journalist_assignment.get('journalist_id')
+                            article.journalist_name = journalist_assignment.get('journalist_name')
 
-                    db.merge(article)
-                    db.commit()
-                    processed_count += 1
-                    
-                    # Stats tracking
-                    if model_to_use == 'gpt4o':
-                        self.session_stats['gpt4o_used'] += 1
-                    else:
-                        self.session_stats['gemini_used'] += 1
-                    
-                    print(f"   ✅ Content generated successfully")
-                    
-                    # Rate limiting
-                    time.sleep(0.3)
-                    
-                except Exception as e:
-                    print(f"   ❌ Critical error in main processing loop (Article ID: {article.id}):")
-                    print(f"      - Error Type: {type(e).__name__}")
-                    print(f"      - Detailed Message: {str(e)}")
-                    print(f"      - Traceback: \n{traceback.format_exc()}")
-                    db.rollback()
-                    self.session_stats['generation_errors'] += 1
-                    continue
+                        db.merge(article)
+                        record_story_fingerprint(db, article)
+                        db.commit()
+                        processed_count += 1
+                        
+                        # Stats tracking
+                        if model_to_use == 'gpt4o':
+                            self.session_stats['gpt4o_used'] += 1
+                        else:
+                            self.session_stats['gemini_used'] += 1
+                        
+                        print(f"   ✅ [{i+1}/{len(articles)}] Content generated successfully ({model_to_use.upper()}): {article.original_title[:50]}...")
+                        
+                    except CircuitOpenError as e:
+                        print(f"   ⏸️ [{i+1}/{len(articles)}] Deferred (Article ID: {article.id}): {str(e)}")
+                        continue
+                    except Exception as e:
+                        print(f"   ❌ Critical error in main processing loop (Article ID: {article.id}):")
+                        print(f"      - Error Type: {type(e).__name__}")
+                        print(f"      - Detailed Message: {str(e)}")
+                        print(f"      - Traceback: \n{traceback.format_exc()}")
+                        db.rollback()
+                        self.session_stats['generation_errors'] += 1
+                        continue
             
             # Session cleanup
             if self.journalist_manager: 
                 self.journalist_manager.save_daily_usage()
-            self._save_daily_counter()
             
             processing_time = time.time() - start_time
             self._print_generation_report(processed_count, processing_time)
@@ -194,13 +251,204 @@ class StrategicDualPhaseAIProcessor:
         finally:
             db.close()
 
-    def _determine_model(self, importance_score: int, journalist_assignment: Dict = None) -> str:
-        """Meghatározza a használandó modellt a kapott pontszám alapján."""
+    def _plan_generation(self, article: Article) -> Dict[str, Any]:
+        """Újságíró kijelölés és modellválasztás egy cikkre (a prémium kvótát itt foglaljuk)."""
+        # A cikk már rendelkezik a `category` és `importance_score` attribútumokkal az editorial_ai-tól.
+        importance_score = getattr(article, 'importance_score', 8)
+        category = getattr(article, 'category', 'general')
         
+        print(f"   📊 Category: {category}, Importance: {importance_score}/20")
+        
+        # Újságíró kijelölés
+        journalist_assignment = None
+        if self.journalist_manager:
+            with self._planning_lock:
+                journalist_assignment = self.journalist_manager.select_journalist_for_article(
+                    category, importance_score, article.original_content or ""
+                )
+            
+            if journalist_assignment:
+                print(f"   👤 Journalist: {journalist_assignment['journalist_name']}")
+                self.session_stats['journalist_assignments'] += 1
+        
+        # Model meghatározás
+        model_to_use = self._determine_model(importance_score, journalist_assignment)
+        print(f"   🤖 Model: {model_to_use.upper()}")
+        return {'model': model_to_use, 'journalist_assignment': journalist_assignment}
+
+    def channel_worker_count(self, channel: str = 'default') -> int:
+        """A csatorna összes párhuzamos generálási slotja (thread pool méretezéshez)."""
+        return max(1, sum(self.channel_concurrency.get(channel, self.channel_concurrency['default']).values()))
+
+    def _generate_with_limits(self, article: Article, model_to_use: str, journalist_assignment: Dict = None,
+                              channel: str = 'default') -> Dict[str, Any]:
+        """Generálás a csatorna modell-slotján belül (worker szálon fut); a rate limitet az egyes hívások foglalják."""
+        slots = self._channel_slots.get(channel, self._channel_slots['default'])
+        slot_model = model_to_use if model_to_use in slots else 'gemini'
+        with slots[slot_model]:
+            return self._generate_final_content(article, model_to_use, journalist_assignment)
+
+    @staticmethod
+    def _is_cacheable_response(text: str) -> bool:
+        """Csak teljes, érvényes JSON cikk-válasz kerül a cache-be: a csonka / nem JSON válasz nem játszódik vissza."""
+        parsed = parse_json_object(text)
+        return bool(parsed) and bool(parsed.get('article_body') or parsed.get('summary'))
+
+    def _cached_call(self, model: str, prompt: Any, params: Dict, cache_tag: Any, call) -> str:
+        """Válasz a cache-ből, ha van; különben `call()` és az érvényes válasz eltárolása."""
+        if not self.response_cache:
+            return call()
+        key = self.response_cache.make_key(model, prompt, params)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            if self._is_cacheable_response(cached):
+                self.session_stats['response_cache_hits'] += 1
+                return cached
+            # Korábban ellenőrzés nélkül eltárolt hibás válasz: törlés, új hívás
+            self.response_cache.invalidate(key)
+        result = call()
+        if result and self._is_cacheable_response(result):
+            self.response_cache.put(key, model, result, tag=cache_tag)
+        return result
+
+    def _openai_chat(self, model: str, messages: List[Dict], max_tokens: int, temperature: float,
+                     cache_tag: Any = None, stream_parser: IncrementalJSONObjectParser = None) -> str:
+        """
+        OpenAI chat hívás a modell limiterén át; a válasz `x-ratelimit-*` fejlécei igazítják az ütemet.
+        `stream_parser` esetén a tokenek érkezés közben az értelmezőbe mennek.
+        """
+        limiter = self._rate_limiters['gpt4o' if model == 'gpt-4o' else 'gpt35']
+        prompt_chars = sum(len(message.get('content', '')) for message in messages)
+
+        def create():
+            return self._provider_text(self.openai_provider, messages, stream_parser, model=model,
+                                       max_tokens=max_tokens, temperature=temperature,
+                                       on_headers=limiter.update_from_headers)
+
+        def call():
+            estimated_tokens = limiter.estimate_tokens(prompt_chars, max_tokens)
+            text = self._circuit_breakers['openai'].call(
+                call_with_backoff, limiter, create, estimated_tokens=estimated_tokens
+            )
+            limiter.record_usage(estimated_tokens, prompt_chars, len(text))
+            return text.strip()
+
+        return self._cached_call(model, messages, {"max_tokens": max_tokens, "temperature": temperature}, cache_tag, call)
+
+    def _gemini_generate(self, prompt: str, cache_tag: Any = None,
+                         stream_parser: IncrementalJSONObjectParser = None) -> str:
+        """Gemini hívás az áramkörön és a közös limiteren át, 429 / 503 esetén backoff-fal (opcionálisan streamelve)."""
+        if not self.gemini_provider.available:
+            raise CircuitOpenError("Gemini nincs konfigurálva")
+
+        limiter = self._rate_limiters['gemini']
+
+        def call():
+            estimated_tokens = limiter.estimate_tokens(len(prompt), AI_MAX_TOKENS)
+            text = self._circuit_breakers['gemini'].call(
+                call_with_backoff, limiter, self._provider_text,
+                self.gemini_provider, prompt, stream_parser,
+                estimated_tokens=estimated_tokens
+            )
+            limiter.record_usage(estimated_tokens, len(prompt), len(text))
+            return text.strip()
+
+        return self._cached_call(self.gemini_provider.model_name, prompt, {}, cache_tag, call)
+
+    def _provider_text(self, provider, prompt, stream_parser: IncrementalJSONObjectParser = None, **options) -> str:
+        """Egy szolgáltatói hívás; streamelve, ha van értelmező és a streaming engedélyezett."""
+        if stream_parser is None or not self.streaming_enabled:
+            return provider.generate(prompt, **options)
+        # Újrapróbálásnál az értelmező elölről kezdi
+        stream_parser.reset()
+        parts = []
+        for chunk in provider.stream(prompt, **options):
+            parts.append(chunk)
+            stream_parser.feed(chunk)
+        return "".join(parts)
+
+    def _field_parser(self, article: Article) -> IncrementalJSONObjectParser:
+        """Streaming értelmező a cikkhez: minden lezárt mezőt (title, keywords, ...) azonnal továbbad a `field_listeners`-nek."""
+        def on_field(field: str, value: Any):
+            for listener in self.field_listeners:
+                try:
+                    listener(article, field, value)
+                except Exception as e:
+                    print(f"   ⚠️ Mező-figyelő hiba ({field}, ID: {article.id}): {e}")
+
+        return IncrementalJSONObjectParser(on_field)
+
+    def _parse_generation(self, result_text: str, parser: IncrementalJSONObjectParser) -> Dict[str, Any]:
+        """A streamelve már felépült mezők; cache-találatnál egy menetben értelmez, hibánál a robusztus parser jön."""
+        if not parser.text:
+            parser.feed(result_text)
+        if parser.done:
+            self.session_stats['stream_parsed'] += 1
+            return dict(parser.fields)
+        return self._robust_json_parse(result_text)
+
+    def _provider_available(self, model: str) -> bool:
+        if model == 'gpt4o':
+            return self._circuit_breakers['openai'].is_available()
+        return self.gemini_provider.available and self._circuit_breakers['gemini'].is_available()
+
+    def _route_to_available_model(self, model_to_use: str):
+        """A tervezett modell, ha a szolgáltatója elérhető; különben a másik modell; ha egyik sem, None."""
+        if self._provider_available(model_to_use):
+            return model_to_use
+        alternate = 'gemini' if model_to_use == 'gpt4o' else 'gpt4o'
+        if self._provider_available(alternate):
+            return alternate
+        return None
+
+    def generate_and_save_article(self, article: Article, channel: str = 'default') -> bool:
+        """
+        Egyetlen cikk kiosztása, generálása és mentése (streaming pipeline worker szálon).
+        A kvóta, az újságíró-számlálók és a csatorna-slotok ugyanazok, mint a batch útvonalon.
+        """
+        self._reset_daily_counter_if_needed()
+        plan = self._plan_generation(article)
+        ai_result = self._generate_with_limits(article, plan['model'], plan['journalist_assignment'], channel)
+        if not ai_result or not ai_result.get('article_body', ai_result.get('summary')):
+            self.session_stats['generation_errors'] += 1
+            return False
+
+        db = get_db_session()
+        try:
+            article.ai_summary = ai_result.get('article_body', ai_result.get('summary'))
+            article.ai_title = ai_result.get('title')
+            article.sentiment = ai_result.get('sentiment')
+            article.seo_keywords = ai_result.get('keywords')
+            article.is_processed = True
+            article.processing_model = f"stream_{channel}_{ai_result.get('model_used', plan['model'])}"
+
+            journalist_assignment = plan['journalist_assignment']
+            if journalist_assignment:
+                article.assigned_journalist = journalist_assignment.get('journalist_id')
+                article.journalist_name = journalist_assignment.get('journalist_name')
+
+            db.merge(article)
+            record_story_fingerprint(db, article)
+            db.commit()
+        except Exception:
+            db.rollback()
+            self.session_stats['generation_errors'] += 1
+            raise
+        finally:
+            db.close()
+
+        self.session_stats['gpt4o_used' if ai_result.get('model_used', plan['model']) == 'gpt4o' else 'gemini_used'] += 1
+        return True
+
+    def _determine_model(self, importance_score: int, journalist_assignment: Dict = None) -> str:
+        """Meghatározza a használandó modellt a kapott pontszám alapján (atomikus kvóta-foglalással)."""
+        with self._quota_lock:
+            return self._determine_model_locked(importance_score, journalist_assignment)
+
+    def _determine_model_locked(self, importance_score: int, journalist_assignment: Dict = None) -> str:
         # Priority 1: Journalist preference
         if journalist_assignment and journalist_assignment.get('preferred_model') == 'gpt4o':
-            if self.daily_premium_count < self.daily_premium_limit:
-                self.daily_premium_count += 1
+            if self._reserve_premium_slot(self.daily_premium_limit):
                 return 'gpt4o'
             else:
                 print(f"   ⚠️ Journalist requested GPT-4o but quota exceeded, using Gemini")
@@ -208,23 +456,20 @@ class StrategicDualPhaseAIProcessor:
         
         # Priority 2: Importance-based routing
         if importance_score >= self.routing_thresholds["critical"]:  # 16+
-            if self.daily_premium_count < self.daily_premium_limit:
-                self.daily_premium_count += 1
+            if self._reserve_premium_slot(self.daily_premium_limit):
                 return 'gpt4o'
             else:
                 print(f"   ⚠️ Critical article but quota exceeded, using Gemini")
                 return 'gemini'
                 
         elif importance_score >= self.routing_thresholds["important"]:  # 14-15
-            if self.daily_premium_count < self.daily_premium_limit * 0.8:  # 80% quota threshold
-                self.daily_premium_count += 1
+            if self._reserve_premium_slot(self.daily_premium_limit * 0.8):  # 80% quota threshold
                 return 'gpt4o'
             else:
                 return 'gemini'
                 
         elif importance_score >= self.routing_thresholds["standard"]:  # 12-13
-            if self.daily_premium_count < self.daily_premium_limit * 0.6:  # 60% quota threshold
-                self.daily_premium_count += 1
+            if self._reserve_premium_slot(self.daily_premium_limit * 0.6):  # 60% quota threshold
                 return 'gpt4o'
             else:
                 return 'gemini'
@@ -235,14 +480,36 @@ class StrategicDualPhaseAIProcessor:
     def _generate_final_content(self, article: Article, model_to_use: str, journalist_assignment: Dict = None) -> Dict[str, Any]:
         """A tartalom-generálás központi logikája."""
         
+        # Nyitott áramkörnél nem várunk timeoutra: átirányítás a másik modellre, vagy halasztás
+        routed_model = self._route_to_available_model(model_to_use)
+        if routed_model is None:
+            # A már lefoglalt prémium slot visszajár: a halasztott cikket újratervezzük
+            if model_to_use == 'gpt4o':
+                self._release_premium_slot()
+            self.session_stats['deferred'] += 1
+            raise CircuitOpenError("Minden generáló szolgáltató áramköre nyitva - a cikk a következő körre halasztva")
+        if routed_model != model_to_use:
+            if model_to_use == 'gpt4o':
+                self._release_premium_slot()
+            elif not self._reserve_premium_slot(self.daily_premium_limit):
+                # A GPT-4o-ra terelt cikk is a napi prémium kvótából fogy
+                self.session_stats['deferred'] += 1
+                raise CircuitOpenError("Gemini áramkör nyitva és a napi GPT-4o kvóta elfogyott - a cikk halasztva")
+            print(f"   🔀 Failover: {model_to_use.upper()} → {routed_model.upper()} (nyitott áramkör)")
+            self.session_stats['failovers'] += 1
+            model_to_use = routed_model
+        
         if journalist_assignment:
-            return self._generate_with_journalist(article, journalist_assignment, model_to_use)
+            result = self._generate_with_journalist(article, journalist_assignment, model_to_use)
         else:
-            return self._generate_standard_content(article, model_to_use)
+            result = self._generate_standard_content(article, model_to_use)
+        # A ténylegesen használt modell (failover után eltérhet a tervezettől)
+        result['model_used'] = model_to_use
+        return result
 
     def _generate_with_journalist(self, article: Article, journalist_assignment: Dict, model: str) -> Dict[str, Any]:
         """Tartalom generálása a kijelölt újságíró promptjával - Enhanced Error Logging."""
-        clean_content = self._clean_content(article.original_content or "")
+        clean_content = get_clean_content(article)
         
         if not self.journalist_manager:
             return self._generate_fallback_content(article)
@@ -260,23 +527,24 @@ class StrategicDualPhaseAIProcessor:
             print("   ⚠️ Journalist prompt not found, using fallback")
             return self._generate_fallback_content(article)
 
+        parser = self._field_parser(article)
         try:
             if model == 'gpt4o':
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-4o",
+                result_text = self._openai_chat(
+                    "gpt-4o",
                     messages=[
                         {"role": "system", "content": f"Te {journalist_assignment['journalist_name']} vagy, a HírMagnet tapasztalt újságírója."},
                         {"role": "user", "content": prompt}
                     ],
                     max_tokens=4000, 
-                    temperature=0.6
+                    temperature=0.6,
+                    cache_tag=article.id,
+                    stream_parser=parser
                 )
-                result_text = response.choices[0].message.content.strip()
             else: # Gemini
-                response = self.gemini_model.generate_content(prompt)
-                result_text = response.text.strip()
+                result_text = self._gemini_generate(prompt, cache_tag=article.id, stream_parser=parser)
             
-            result = self._robust_json_parse(result_text)
+            result = self._parse_generation(result_text, parser)
             
             # Ensure we have the required fields
             if not result.get('article_body') and not result.get('summary'):
@@ -297,6 +565,8 @@ class StrategicDualPhaseAIProcessor:
             
             return result
             
+        except CircuitOpenError:
+            raise
         except Exception as e:
             print(f"❌ Kritikus hiba az '{journalist_assignment['journalist_name']}' generálása során (ID: {article.id}):")
             print(f"   - Hiba Típusa: {type(e).__name__}")
@@ -306,7 +576,7 @@ class StrategicDualPhaseAIProcessor:
 
     def _generate_standard_content(self, article: Article, model: str) -> Dict[str, Any]:
         """Standard tartalom generálás újságíró nélkül - Enhanced Error Logging."""
-        clean_content = self._clean_content(article.original_content or "")
+        clean_content = get_clean_content(article)
         
         if self.prompt_manager:
             if model == 'gpt4o':
@@ -327,23 +597,24 @@ class StrategicDualPhaseAIProcessor:
         else:
             prompt = self._get_fallback_prompt(article, model, clean_content)
         
+        parser = self._field_parser(article)
         try:
             if model == 'gpt4o':
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-4o",
+                result_text = self._openai_chat(
+                    "gpt-4o",
                     messages=[
                         {"role": "system", "content": "Te egy tapasztalt magyar újságíró vagy."},
                         {"role": "user", "content": prompt}
                     ],
                     max_tokens=3000,
-                    temperature=0.4
+                    temperature=0.4,
+                    cache_tag=article.id,
+                    stream_parser=parser
                 )
-                result_text = response.choices[0].message.content.strip()
             else:
-                response = self.gemini_model.generate_content(prompt)
-                result_text = response.text.strip()
+                result_text = self._gemini_generate(prompt, cache_tag=article.id, stream_parser=parser)
             
-            result = self._robust_json_parse(result_text)
+            result = self._parse_generation(result_text, parser)
             
             # Ensure required fields
             if not result.get('article_body') and not result.get('summary'):
@@ -357,6 +628,8 @@ class StrategicDualPhaseAIProcessor:
             
             return result
             
+        except CircuitOpenError:
+            raise
         except Exception as e:
             if model == 'gpt4o':
                 print(f"❌ Kritikus hiba a standard GPT-4o generálás során (ID: {article.id}):")
@@ -369,7 +642,7 @@ class StrategicDualPhaseAIProcessor:
 
     def _generate_fallback_content(self, article: Article) -> Dict[str, Any]:
         """AI-alapú fallback tartalom generálás minimum 400-600 szóval magyar nyelven."""
-        clean_content = self._clean_content(article.original_content or "")
+        clean_content = get_clean_content(article)
         
         # Load fallback prompt
         fallback_prompt_path = "ai/prompts/processing/fallback_content_generation.txt"
@@ -385,10 +658,10 @@ class StrategicDualPhaseAIProcessor:
             )
             
             # Generate with Gemini (fallback should use fastest model)
-            response = self.gemini_model.generate_content(prompt)
-            result_text = response.text.strip()
+            parser = self._field_parser(article)
+            result_text = self._gemini_generate(prompt, cache_tag=article.id, stream_parser=parser)
             
-            result = self._robust_json_parse(result_text)
+            result = self._parse_generation(result_text, parser)
             
             # Ensure required fields
             if not result.get('article_body'):
@@ -421,17 +694,17 @@ class StrategicDualPhaseAIProcessor:
         
         JSON válasz:
         {{
-            "article_body": "400-600 szavas magyar cikk...",
             "title": "magyar cím",
+            "keywords": "kulcsszó1, kulcsszó2",
             "sentiment": "neutral",
-            "keywords": "kulcsszó1, kulcsszó2"
+            "article_body": "400-600 szavas magyar cikk..."
         }}
         """
         
         try:
-            response = self.gemini_model.generate_content(simple_prompt)
-            result_text = response.text.strip()
-            result = self._robust_json_parse(result_text)
+            parser = self._field_parser(article)
+            result_text = self._gemini_generate(simple_prompt, cache_tag=article.id, stream_parser=parser)
+            result = self._parse_generation(result_text, parser)
             
             if result.get('article_body') and len(result['article_body']) > 200:
                 return result
@@ -459,25 +732,26 @@ class StrategicDualPhaseAIProcessor:
                 
                 JSON válasz:
                 {{
-                    "article_body": "minimum 400-600 szavas magyar cikk...",
                     "title": "optimalizált magyar cím",
+                    "keywords": "magyar kulcsszó1, kulcsszó2, kulcsszó3",
                     "sentiment": "neutral",
-                    "keywords": "magyar kulcsszó1, kulcsszó2, kulcsszó3"
+                    "article_body": "minimum 400-600 szavas magyar cikk..."
                 }}
                 """
                 
-                gpt35_response = self.openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
+                parser = self._field_parser(article)
+                gpt35_result_text = self._openai_chat(
+                    "gpt-3.5-turbo",
                     messages=[
                         {"role": "system", "content": "Te egy tapasztalt magyar újságíró vagy. Minden cikket magyarul írj!"},
                         {"role": "user", "content": gpt35_prompt}
                     ],
                     max_tokens=2000,
-                    temperature=0.3
+                    temperature=0.3,
+                    cache_tag=article.id,
+                    stream_parser=parser
                 )
-                
-                gpt35_result_text = gpt35_response.choices[0].message.content.strip()
-                gpt35_result = self._robust_json_parse(gpt35_result_text)
+                gpt35_result = self._parse_generation(gpt35_result_text, parser)
                 
                 if gpt35_result.get('article_body') and len(gpt35_result['article_body']) > 200:
                     print(f"   ✅ GPT-3.5 Turbo absolute fallback successful!")
@@ -488,6 +762,11 @@ class StrategicDualPhaseAIProcessor:
             except Exception as gpt_error:
                 print(f"   ❌ GPT-3.5 Turbo absolute fallback also failed: {str(gpt_error)}")
             
+            # Ha egyik szolgáltató sem elérhető, a cikk inkább várjon a következő körre
+            if not any(breaker.is_available() for breaker in self._circuit_breakers.values()):
+                self.session_stats['deferred'] += 1
+                raise CircuitOpenError("Minden szolgáltató áramköre nyitva - a cikk a következő körre halasztva")
+            
             # Ultimate last resort - hardcoded Hungarian content
             base_content = f"""
             {article.original_title}
@@ -520,10 +799,10 @@ class StrategicDualPhaseAIProcessor:
             if text.strip().startswith('{') and text.strip().endswith('}'):
                 return json.loads(text.strip())
             
-            # Second try: Find JSON in text
-            json_match = re.search(r'\{.*\}', text, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(0))
+            # Second try: the first complete object in the text (fences / intro text), one pass, no regex scan
+            parsed = parse_json_object(text)
+            if parsed is not None:
+                return parsed
                 
         except json.JSONDecodeError:
             pass
@@ -559,49 +838,24 @@ class StrategicDualPhaseAIProcessor:
             return {}
 
     def _clean_content(self, html_content: str) -> str:
-        """HTML címkék eltávolítása."""
-        if not html_content: 
-            return ""
-        
-        # Remove HTML tags
-        clean = re.sub(r'<[^>]+>', '', html_content)
-        # Clean whitespace
-        clean = re.sub(r'\s+', ' ', clean).strip()
-        
-        return clean
+        """HTML címkék eltávolítása (közös text_cleaner)."""
+        return clean_html(html_content)
 
     def _reset_daily_counter_if_needed(self):
-        """Napi számláló reset ha új nap"""
-        current_date = datetime.now().date()
-        
-        counter_file = "data/daily_premium_counter.txt"
-        
-        try:
-            if os.path.exists(counter_file):
-                with open(counter_file, 'r') as f:
-                    stored_date, stored_count = f.read().strip().split(',')
-                    
-                if stored_date == str(current_date):
-                    self.daily_premium_count = int(stored_count)
-                else:
-                    self.daily_premium_count = 0
-            else:
-                self.daily_premium_count = 0
-                
-        except:
-            self.daily_premium_count = 0
-    
-    def _save_daily_counter(self):
-        """Napi számláló mentése"""
-        counter_file = "data/daily_premium_counter.txt"
-        current_date = datetime.now().date()
-        
-        try:
-            os.makedirs("data", exist_ok=True)
-            with open(counter_file, 'w') as f:
-                f.write(f"{current_date},{self.daily_premium_count}")
-        except:
-            pass
+        """A mai prémium kvóta-használat frissítése az adatbázisból (napváltáskor a számláló magától nulláról indul)."""
+        self.daily_premium_count = self.premium_quota.used()
+
+    def _reserve_premium_slot(self, limit: float) -> bool:
+        """Egy GPT-4o slot foglalása, ha a mai (összes folyamatra vett) használat `limit` alatt van."""
+        count = self.premium_quota.try_reserve(limit)
+        if count is None:
+            return False
+        self.daily_premium_count = count
+        return True
+
+    def _release_premium_slot(self):
+        """Lefoglalt, de fel nem használt GPT-4o slot visszaadása."""
+        self.daily_premium_count = self.premium_quota.release()
 
     def _create_session_summary(self) -> str:
         """Create session summary for logging"""
@@ -647,10 +901,10 @@ class StrategicDualPhaseAIProcessor:
 
             JSON válasz:
             {{
-                "article_body": "minimum 800-1200 szavas részletes MAGYAR cikk...",
                 "title": "optimalizált magyar cím",
+                "keywords": "magyar kulcsszó1, kulcsszó2, kulcsszó3, kulcsszó4",
                 "sentiment": "positive/negative/neutral",
-                "keywords": "magyar kulcsszó1, kulcsszó2, kulcsszó3, kulcsszó4"
+                "article_body": "minimum 800-1200 szavas részletes MAGYAR cikk..."
             }}
             """
         else:
@@ -671,10 +925,10 @@ class StrategicDualPhaseAIProcessor:
 
             JSON válasz:
             {{
-                "article_body": "minimum 600-800 szavas MAGYAR cikk...",
                 "title": "optimalizált magyar cím",
+                "keywords": "magyar kulcsszó1, kulcsszó2, kulcsszó3, kulcsszó4",
                 "sentiment": "positive/negative/neutral",
-                "keywords": "magyar kulcsszó1, kulcsszó2, kulcsszó3, kulcsszó4"
+                "article_body": "minimum 600-800 szavas MAGYAR cikk..."
             }}
             """
 
@@ -692,7 +946,8 @@ class StrategicDualPhaseAIProcessor:
         db = get_db_session()
         try:
             unprocessed = db.query(Article).filter(
-                Article.is_processed == False
+                Article.is_processed == False,
+                Article.duplicate_of_id.is_(None)
             ).limit(20).all()
             
             if not unprocessed:
@@ -716,7 +971,9 @@ IntegratedDualPhaseAIProcessor = StrategicDualPhaseAIProcessor
 
 def main():
     """Fő AI feldolgozás - BEFEHLSKETTE v5.0 + FEUERLEITANLAGE"""
-    processor = StrategicDualPhaseAIProcessor()
+    import sys
+    # --no-cache: kényszerített újragenerálás, a válasz-cache kihagyásával
+    processor = StrategicDualPhaseAIProcessor(use_response_cache='--no-cache' not in sys.argv)
     try:
         # Use backward compatibility method for now
         processed = processor.process_unprocessed_articles()
@@ -120,10 +120,10 @@ FELADATOK:
 
 JSON VÁLASZ:
 {{
-    "summary": "teljes 800-1200 szavas cikk...",
     "title": "optimalizált cím",
+    "keywords": "kulcsszó1, kulcsszó2, kulcsszó3, kulcsszó4, kulcsszó5",
     "sentiment": "positive/negative/neutral",
-    "keywords": "kulcsszó1, kulcsszó2, kulcsszó3, kulcsszó4, kulcsszó5"
+    "summary": "teljes 800-1200 szavas cikk..."
 }}""",
 
             # GEMINI CONTENT GENERATION
@@ -144,10 +144,10 @@ FELADATOK:
 
 JSON-ban válaszolj:
 {{
-    "summary": "800-1200 szavas részletes cikk...",
     "title": "optimalizált cím",
+    "keywords": "kulcsszó1, kulcsszó2, kulcsszó3, kulcsszó4, kulcsszó5",
     "sentiment": "positive/negative/neutral",
-    "keywords": "kulcsszó1, kulcsszó2, kulcsszó3, kulcsszó4, kulcsszó5"
+    "summary": "800-1200 szavas részletes cikk..."
 }}"""
         }
         
@@ -0,0 +1,320 @@
+# ai/providers.py - LLM / TTS SZOLGÁLTATÓ RÉTEG
+# Egységes interfész az OpenAI és Gemini hívásokhoz, determinisztikus offline fake-kel benchmarkhoz és teszthez
+
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from config.settings import (
+    OPENAI_API_KEY,
+    AI_MAX_TOKENS,
+    LLM_REQUEST_TIMEOUT_SECONDS,
+    LLM_PROVIDER_MODE,
+    FAKE_LLM_LATENCY_MS,
+    FAKE_LLM_JITTER_MS,
+    FAKE_LLM_ERROR_RATE,
+    FAKE_LLM_SEED,
+    FAKE_LLM_BODY_WORDS,
+)
+
+GEMINI_MODEL_NAME = 'gemini-2.5-flash-preview-05-20'
+
+# Prompt: egyetlen szöveg vagy OpenAI formátumú üzenetlista
+Prompt = Union[str, List[Dict[str, str]]]
+
+
+def _as_messages(prompt: Prompt) -> List[Dict[str, str]]:
+    return [{"role": "user", "content": prompt}] if isinstance(prompt, str) else prompt
+
+
+def _as_text(prompt: Prompt) -> str:
+    if isinstance(prompt, str):
+        return prompt
+    return "\n\n".join(message.get('content', '') for message in prompt)
+
+
+class LLMProvider:
+    """
+    Szolgáltató-interfész a generáló, elemző, szerkesztő és TTS hívásokhoz.
+
+    - `generate()`: teljes válasz szövegként; `on_headers` a válasz HTTP fejléceit kapja (rate limit igazítás).
+    - `stream()`: a válasz darabjai érkezés közben.
+    - `agenerate()`: async változat (alapból szálon futó `generate()`).
+    - `synthesize_speech()`: hangfájl bájtjai (csak TTS-képes szolgáltatónál).
+
+    Rate limitet, backoffot és circuit breakert a hívó ad köré - a szolgáltató csak a nyers hívás.
+    """
+
+    name = "base"
+    model_name = ""
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def generate(self, prompt: Prompt, model: Optional[str] = None, max_tokens: int = AI_MAX_TOKENS,
+                 temperature: float = 0.7, on_headers: Optional[Callable] = None) -> str:
+        raise NotImplementedError
+
+    def stream(self, prompt: Prompt, model: Optional[str] = None, max_tokens: int = AI_MAX_TOKENS,
+               temperature: float = 0.7, on_headers: Optional[Callable] = None) -> Iterator[str]:
+        yield self.generate(prompt, model=model, max_tokens=max_tokens, temperature=temperature, on_headers=on_headers)
+
+    async def agenerate(self, prompt: Prompt, model: Optional[str] = None, max_tokens: int = AI_MAX_TOKENS,
+                        temperature: float = 0.7, on_headers: Optional[Callable] = None) -> str:
+        return await asyncio.to_thread(self.generate, prompt, model, max_tokens, temperature, on_headers)
+
+    def synthesize_speech(self, text: str, voice: str, speed: float = 1.0, model: str = "tts-1") -> bytes:
+        raise NotImplementedError(f"{self.name}: nincs TTS támogatás")
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI chat + TTS a hivatalos kliensen át (`with_raw_response`, hogy a rate limit fejlécek elérhetők legyenek)."""
+
+    name = "openai"
+    model_name = "gpt-4o"
+
+    def __init__(self, api_key: str = OPENAI_API_KEY, timeout: float = LLM_REQUEST_TIMEOUT_SECONDS):
+        from openai import OpenAI
+        self.client = OpenAI(api_key=api_key, timeout=timeout)
+
+    def _create(self, prompt: Prompt, model: Optional[str], max_tokens: int, temperature: float,
+                on_headers: Optional[Callable], stream: bool):
+        raw_response = self.client.chat.completions.with_raw_response.create(
+            model=model or self.model_name, messages=_as_messages(prompt),
+            max_tokens=max_tokens, temperature=temperature, stream=stream
+        )
+        if on_headers:
+            on_headers(raw_response.headers)
+        return raw_response.parse()
+
+    def generate(self, prompt, model=None, max_tokens=AI_MAX_TOKENS, temperature=0.7, on_headers=None) -> str:
+        response = self._create(prompt, model, max_tokens, temperature, on_headers, stream=False)
+        return response.choices[0].message.content or ""
+
+    def stream(self, prompt, model=None, max_tokens=AI_MAX_TOKENS, temperature=0.7, on_headers=None) -> Iterator[str]:
+        for chunk in self._create(prompt, model, max_tokens, temperature, on_headers, stream=True):
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                yield delta
+
+    def synthesize_speech(self, text: str, voice: str, speed: float = 1.0, model: str = "tts-1") -> bytes:
+        return self.client.audio.speech.create(model=model, voice=voice, input=text, speed=speed).content
+
+
+class GeminiProvider(LLMProvider):
+    """Gemini generálás; kulcs nélkül `available = False`. A max_tokens / temperature itt nem kerül átadásra."""
+
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str] = None, model_name: str = GEMINI_MODEL_NAME,
+                 timeout: float = LLM_REQUEST_TIMEOUT_SECONDS):
+        import google.generativeai as genai
+        api_key = api_key or os.getenv("GEMINI_API_KEY")
+        self.model_name = model_name
+        self.timeout = timeout
+        self.model = None
+        if api_key:
+            genai.configure(api_key=api_key)
+            self.model = genai.GenerativeModel(model_name)
+
+    @property
+    def available(self) -> bool:
+        return self.model is not None
+
+    def generate(self, prompt, model=None, max_tokens=AI_MAX_TOKENS, temperature=0.7, on_headers=None) -> str:
+        response = self.model.generate_content(_as_text(prompt), request_options={"timeout": self.timeout})
+        return response.text
+
+    def stream(self, prompt, model=None, max_tokens=AI_MAX_TOKENS, temperature=0.7, on_headers=None) -> Iterator[str]:
+        response = self.model.generate_content(_as_text(prompt), stream=True, request_options={"timeout": self.timeout})
+        for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Tartalom nélküli darab (pl. csak finish_reason)
+                continue
+            if text:
+                yield text
+
+
+# === OFFLINE FAKE ===
+
+class FakeProviderError(Exception):
+    """Injektált szolgáltatói hiba; a `status_code` alapján a rate limiter 429 / 503-nak ismeri fel."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+_EDITORIAL_CATEGORIES = ["politics", "economy", "tech", "sport", "entertainment", "foreign", "lifestyle", "cars", "general"]
+_FILLER_WORDS = ("a", "kormány", "szerint", "hétfőn", "bejelentette", "hogy", "az", "új", "szabályozás",
+                 "jelentős", "változást", "hoz", "piacon", "elemzők", "várakozásai", "alapján", "és", "fejlemények")
+_TITLE_PATTERN = re.compile(r'^\s*(?:CÍM|Cím|CIKK CÍME|Eredeti cím|TITLE|Title)\s*:\s*(.+)$', re.MULTILINE)
+_BATCH_ITEM_PATTERN = re.compile(r'\[CIKK (\d+)\]\s*\nCÍM:\s*(.*)')
+
+
+class FakeLLMProvider(LLMProvider):
+    """
+    Determinisztikus, hálózat nélküli szolgáltató.
+
+    - A válasz a prompt hash-éből készül: ugyanarra a promptra mindig ugyanaz.
+    - A prompt alakja szerint editorial batch (JSON tömb), egyedi elemzés vagy cikk-generálás (JSON objektum).
+      Az ujjlenyomat a címből jön, így az azonos című cikkek duplikátumként szűrődnek.
+    - `latency_ms` ± `jitter_ms` késleltetés; `error_rate` valószínűséggel 429 vagy 503 hiba.
+      A késleltetés és a hibák a `seed`-ből induló sorozatból jönnek (azonos hívássorrendnél reprodukálható).
+    """
+
+    def __init__(self, name: str = "fake", model_name: str = "fake-llm",
+                 latency_ms: float = FAKE_LLM_LATENCY_MS, jitter_ms: float = FAKE_LLM_JITTER_MS,
+                 error_rate: float = FAKE_LLM_ERROR_RATE, seed: int = FAKE_LLM_SEED,
+                 body_words: int = FAKE_LLM_BODY_WORDS):
+        self.name = name
+        self.model_name = model_name
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.body_words = body_words
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "errors": 0, "speech_calls": 0}
+        self.latencies: List[float] = []
+
+    def _next_call(self) -> float:
+        """A hívás késleltetése másodpercben; injektált hibánál kivétel."""
+        with self._lock:
+            self.stats["calls"] += 1
+            delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            fail = self._random.random() < self.error_rate
+            status = self._random.choice((429, 503))
+        if fail:
+            time.sleep(delay / 4)
+            with self._lock:
+                self.stats["errors"] += 1
+            raise FakeProviderError(status, f"fake {self.name}: injektált {status} hiba")
+        return delay
+
+    @staticmethod
+    def _digest(text: str) -> int:
+        return int(hashlib.sha256(text.encode('utf-8')).hexdigest()[:12], 16)
+
+    @staticmethod
+    def _fingerprint(title: str) -> Dict[str, Any]:
+        words = re.findall(r"\w+", title.lower())
+        entities = [word for word in re.findall(r"\w+", title) if word[:1].isupper()][:4]
+        return {"main_topic": " ".join(words[:3]) or "általános hír", "key_entities": entities}
+
+    def _analysis(self, title: str) -> Dict[str, Any]:
+        digest = self._digest(title)
+        return {
+            "real_category": _EDITORIAL_CATEGORIES[digest % len(_EDITORIAL_CATEGORIES)],
+            "importance_score": 6 + digest % 13,
+            "duplicate_fingerprint": self._fingerprint(title),
+            "reasoning": "Offline fake elemzés.",
+        }
+
+    def _article(self, prompt: str) -> Dict[str, Any]:
+        match = _TITLE_PATTERN.search(prompt)
+        title = match.group(1).strip() if match else f"Hír {self._digest(prompt) % 100000}"
+        rng = random.Random(self._digest(prompt))
+        body = " ".join(rng.choice(_FILLER_WORDS) for _ in range(self.body_words))
+        return {
+            "title": f"{title} - összefoglaló",
+            "keywords": ", ".join(self._fingerprint(title)["key_entities"] or ["hírek"]),
+            "sentiment": ("neutral", "positive", "negative")[self._digest(title) % 3],
+            "article_body": body.capitalize() + ".",
+        }
+
+    def render(self, prompt: Prompt) -> str:
+        """A prompthoz tartozó determinisztikus válasz (késleltetés és hiba nélkül)."""
+        text = _as_text(prompt)
+        batch_items = _BATCH_ITEM_PATTERN.findall(text)
+        if batch_items:
+            payload: Any = [{"id": int(index), **self._analysis(title.strip())} for index, title in batch_items]
+        elif "duplicate_fingerprint" in text:
+            match = _TITLE_PATTERN.search(text)
+            payload = self._analysis(match.group(1).strip() if match else text[:80])
+        else:
+            payload = self._article(text)
+        return "```json\n" + json.dumps(payload, ensure_ascii=False, indent=2) + "\n```"
+
+    def generate(self, prompt, model=None, max_tokens=AI_MAX_TOKENS, temperature=0.7, on_headers=None) -> str:
+        started = time.monotonic()
+        time.sleep(self._next_call())
+        self.latencies.append(time.monotonic() - started)
+        return self.render(prompt)
+
+    def stream(self, prompt, model=None, max_tokens=AI_MAX_TOKENS, temperature=0.7, on_headers=None) -> Iterator[str]:
+        started = time.monotonic()
+        delay = self._next_call()
+        text = self.render(prompt)
+        chunks = [text[i:i + 40] for i in range(0, len(text), 40)]
+        # Az első token a késleltetés harmadánál, a többi egyenletesen elosztva
+        time.sleep(delay / 3)
+        for chunk in chunks:
+            time.sleep(delay * 2 / 3 / len(chunks))
+            yield chunk
+        self.latencies.append(time.monotonic() - started)
+
+    def synthesize_speech(self, text: str, voice: str, speed: float = 1.0, model: str = "tts-1") -> bytes:
+        time.sleep(self._next_call())
+        with self._lock:
+            self.stats["speech_calls"] += 1
+        # Méret a szöveg hosszával arányos (a hossz-becslés ~1KB / másodperc)
+        return b"ID3" + hashlib.sha256(text.encode('utf-8')).digest() * max(1, len(text) // 2)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        return {
+            **self.stats,
+            "avg_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+        }
+
+
+# === KÖZÖS SZOLGÁLTATÓK ===
+# Nevenként ("openai", "gemini") egy példány; `LLM_PROVIDER_MODE = "fake"` esetén mind offline
+
+_providers: Dict[str, LLMProvider] = {}
+_registry_lock = threading.Lock()
+
+
+def _create_provider(name: str) -> LLMProvider:
+    if LLM_PROVIDER_MODE == "fake":
+        return FakeLLMProvider(name=name, model_name=f"fake-{name}")
+    if name == "openai":
+        return OpenAIProvider()
+    if name == "gemini":
+        return GeminiProvider()
+    raise ValueError(f"Ismeretlen szolgáltató: {name}")
+
+
+def get_llm_provider(name: str) -> LLMProvider:
+    with _registry_lock:
+        provider = _providers.get(name)
+        if provider is None:
+            provider = _create_provider(name)
+            _providers[name] = provider
+        return provider
+
+
+def set_llm_provider(name: str, provider: LLMProvider):
+    """Szolgáltató cseréje; a komponensek létrehozásuk előtt kell, mert a példányt az __init__ veszi át."""
+    with _registry_lock:
+        _providers[name] = provider
+
+
+def use_fake_providers(**options) -> Dict[str, FakeLLMProvider]:
+    """Minden szolgáltató lecserélése offline fake-re (opciók: latency_ms, jitter_ms, error_rate, seed, body_words)."""
+    fakes = {}
+    for index, name in enumerate(("openai", "gemini")):
+        seed = options.get("seed", FAKE_LLM_SEED) + index
+        fakes[name] = FakeLLMProvider(name=name, model_name=f"fake-{name}", **{**options, "seed": seed})
+        set_llm_provider(name, fakes[name])
+    return fakes
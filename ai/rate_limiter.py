@@ -0,0 +1,403 @@
+# ai/rate_limiter.py - TOKEN BUCKET RATE LIMITER
+# Fix sleep-ek helyett: percenkénti keret + burst, szálbiztos szinkron és aszinkron várakozással.
+# Szolgáltatónként / modellenként közös kérés- és token-keret, 429/503-ra adaptív lassítás és backoff.
+
+import time
+import random
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from config.settings import (
+    RATE_LIMIT_MAX_RETRIES,
+    RATE_LIMIT_BACKOFF_BASE_SECONDS,
+    RATE_LIMIT_BACKOFF_MAX_SECONDS,
+    RATE_LIMIT_MIN_RATE_FRACTION,
+    RATE_LIMIT_RECOVERY_SUCCESSES,
+    RATE_LIMIT_EXPECTED_OUTPUT_TOKENS,
+    GEMINI_RATE_LIMIT_PER_MINUTE,
+    GEMINI_RATE_LIMIT_BURST,
+    GEMINI_TOKENS_PER_MINUTE,
+)
+
+# Karakter / token arány a becsléshez (magyar és angol szövegre óvatos)
+CHARS_PER_TOKEN = 3
+# A mért kimenet-méret mozgóátlagának súlya
+OUTPUT_TOKENS_SMOOTHING = 0.2
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    - `rate_per_minute`: hosszú távú átlagos kérés/perc.
+    - `burst`: ennyi kérés mehet ki azonnal egy pihenő után.
+    - A foglalás sorban áll (a tokenek negatívba mehetnek), így a várakozók
+      érkezési sorrendben és egyenletes ütemben kapnak helyet.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: Optional[int] = None):
+        self.rate = max(rate_per_minute, 0.001) / 60.0
+        self.capacity = float(max(1, burst if burst is not None else 1))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float = 1.0) -> float:
+        """Tokenek lefoglalása; visszaadja, hány másodpercet kell várni a felhasználásig."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def set_rate(self, rate_per_minute: float):
+        """Az ütem módosítása; az eddig felhalmozott tokenek a régi ütem szerint számolódnak."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.rate = max(rate_per_minute, 0.001) / 60.0
+
+    def set_capacity(self, rate_per_minute: float, capacity: float):
+        """Ütem és kapacitás együttes átállítása (pl. a szolgáltató által közölt valós token keretre)."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.rate = max(rate_per_minute, 0.001) / 60.0
+            self.capacity = float(max(1, capacity))
+
+    def adjust(self, tokens: float):
+        """Utólagos korrekció várakozás nélkül: pozitív = visszatérítés, negatív = pótlólagos terhelés."""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + tokens)
+
+    def cap_level(self, tokens: float):
+        """A rendelkezésre álló tokenek csökkentése a megadott szintre (emelni nem emel)."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate, tokens)
+            self.updated_at = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Blokkoló várakozás (szálakból). Visszaadja a várt időt."""
+        wait_time = self._reserve(tokens)
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return wait_time
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """Aszinkron várakozás (event loopból). Visszaadja a várt időt."""
+        wait_time = self._reserve(tokens)
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+        return wait_time
+
+
+# === ADAPTÍV LIMITER ===
+
+class RateLimitError(Exception):
+    """A szolgáltató a backoff után is 429 / 503 választ adott."""
+
+
+class AdaptiveRateLimiter:
+    """
+    Egy szolgáltató / modell közös kerete.
+
+    - Kérés-bucket (`rate_per_minute`, `burst`) és opcionális token-bucket (`tokens_per_minute`);
+      a hívó a becsült token-számot adja meg: `estimate_tokens()` = prompt + várható (mért átlag) kimenet,
+      a `max_tokens` csak felső korlát. A válasz után `record_usage()` a tényleges méretre korrigál.
+    - 429 / 503 esetén a kérés-ütem felére esik (legfeljebb `RATE_LIMIT_MIN_RATE_FRACTION`-ig),
+      és a `retry-after` idejéig minden hívó vár; `RATE_LIMIT_RECOVERY_SUCCESSES` sikeres hívás
+      után az ütem fokozatosan visszaáll a beállított (vagy a fejlécből olvasott) plafonra.
+    - `update_from_headers()` az `x-ratelimit-*` fejlécekből olvas: plafon, valós token keret,
+      megmaradt tokenek és kimerült keret.
+    """
+
+    def __init__(self, name: str, rate_per_minute: float, burst: Optional[int] = None,
+                 tokens_per_minute: Optional[float] = None):
+        self.name = name
+        self.ceiling = float(rate_per_minute)
+        self.current_rate = float(rate_per_minute)
+        self.requests = TokenBucket(rate_per_minute, burst=burst)
+        self.tokens = TokenBucket(tokens_per_minute, burst=int(tokens_per_minute)) if tokens_per_minute else None
+        self.stats = {"calls": 0, "rate_limited": 0, "retries": 0, "waited_seconds": 0.0}
+        self.expected_output_tokens = float(RATE_LIMIT_EXPECTED_OUTPUT_TOKENS)
+        self._paused_until = 0.0
+        self._success_streak = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self, estimated_tokens: int = 0) -> float:
+        wait_time = max(0.0, self._paused_until - time.monotonic())
+        wait_time = max(wait_time, self.requests._reserve())
+        if self.tokens and estimated_tokens > 0:
+            wait_time = max(wait_time, self.tokens._reserve(estimated_tokens))
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["waited_seconds"] += wait_time
+        return wait_time
+
+    def acquire(self, estimated_tokens: int = 0) -> float:
+        wait_time = self._reserve(estimated_tokens)
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return wait_time
+
+    async def acquire_async(self, estimated_tokens: int = 0) -> float:
+        wait_time = self._reserve(estimated_tokens)
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+        return wait_time
+
+    def estimate_tokens(self, prompt_chars: int, max_tokens: int) -> int:
+        """Becsült token-szám: prompt + a mért átlagos kimenet (legfeljebb `max_tokens`)."""
+        return prompt_chars // CHARS_PER_TOKEN + int(min(max_tokens, self.expected_output_tokens))
+
+    def record_usage(self, estimated_tokens: int, prompt_chars: int, output_chars: int):
+        """A becslés korrekciója a tényleges válaszméretre; a különbség visszakerül (vagy levonódik) a token keretből."""
+        output_tokens = output_chars // CHARS_PER_TOKEN
+        with self._lock:
+            self.expected_output_tokens += OUTPUT_TOKENS_SMOOTHING * (output_tokens - self.expected_output_tokens)
+        if self.tokens and estimated_tokens > 0:
+            self.tokens.adjust(estimated_tokens - (prompt_chars // CHARS_PER_TOKEN + output_tokens))
+
+    def on_success(self):
+        with self._lock:
+            if self.current_rate >= self.ceiling:
+                return
+            self._success_streak += 1
+            if self._success_streak < RATE_LIMIT_RECOVERY_SUCCESSES:
+                return
+            self._success_streak = 0
+            self.current_rate = min(self.ceiling, self.current_rate * 1.25)
+            rate = self.current_rate
+        self.requests.set_rate(rate)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None):
+        with self._lock:
+            self.stats["rate_limited"] += 1
+            self._success_streak = 0
+            self.current_rate = max(self.ceiling * RATE_LIMIT_MIN_RATE_FRACTION, self.current_rate * 0.5)
+            if retry_after:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            rate = self.current_rate
+        self.requests.set_rate(rate)
+        print(f"   🐢 Rate limit ({self.name}): ütem {rate:.1f}/perc"
+              + (f", szünet {retry_after:.1f}s" if retry_after else ""))
+
+    def set_ceiling(self, rate_per_minute: float, tokens_per_minute: Optional[float] = None):
+        """A plafon (és a jelenlegi ütem) átállítása, pl. magasabb szolgáltatói keretnél vagy benchmarkhoz."""
+        with self._lock:
+            self.ceiling = float(rate_per_minute)
+            self.current_rate = float(rate_per_minute)
+            self._success_streak = 0
+        self.requests.set_rate(rate_per_minute)
+        if self.tokens and tokens_per_minute:
+            self.tokens.set_rate(tokens_per_minute)
+
+    def update_from_headers(self, headers: Optional[Mapping[str, str]]):
+        """OpenAI-stílusú `x-ratelimit-*` fejlécek feldolgozása."""
+        if not headers:
+            return
+        limit = _to_float(headers.get("x-ratelimit-limit-requests"))
+        if limit and limit < self.ceiling:
+            with self._lock:
+                self.ceiling = limit
+                self.current_rate = min(self.current_rate, limit)
+                rate = self.current_rate
+            self.requests.set_rate(rate)
+        if self.tokens:
+            # A fiók valós token kerete (tier) felülírja a beállított becslést, mindkét irányban
+            token_limit = _to_float(headers.get("x-ratelimit-limit-tokens"))
+            if token_limit and abs(token_limit - self.tokens.capacity) >= 1:
+                self.tokens.set_capacity(token_limit, token_limit)
+        remaining = _to_float(headers.get("x-ratelimit-remaining-requests"))
+        remaining_tokens = _to_float(headers.get("x-ratelimit-remaining-tokens"))
+        if self.tokens and remaining_tokens is not None:
+            # Más folyamatok / kulcshasználók fogyasztása: a helyi keret nem lehet több a szolgáltatónál maradtnál
+            self.tokens.cap_level(remaining_tokens)
+        if remaining == 0 or remaining_tokens == 0:
+            reset_header = "x-ratelimit-reset-requests" if remaining == 0 else "x-ratelimit-reset-tokens"
+            reset = _parse_duration(headers.get(reset_header))
+            if reset:
+                with self._lock:
+                    self._paused_until = max(self._paused_until, time.monotonic() + reset)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "rate_per_minute": round(self.current_rate, 2),
+            "ceiling_per_minute": round(self.ceiling, 2),
+            "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 2),
+            "expected_output_tokens": round(self.expected_output_tokens),
+            **self.stats,
+        }
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_duration(value: Optional[str]) -> Optional[float]:
+    """'1.5', '20ms', '6m0s', '1h2m3s' → másodperc."""
+    if not value:
+        return None
+    number = _to_float(value)
+    if number is not None:
+        return number
+    total, digits = 0.0, ""
+    text = str(value).strip()
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch.isdigit() or ch == ".":
+            digits += ch
+        elif text[i:i + 2] == "ms":
+            total += float(digits or 0) / 1000
+            digits = ""
+            i += 1
+        elif ch in "hms":
+            total += float(digits or 0) * {"h": 3600, "m": 60, "s": 1}[ch]
+            digits = ""
+        i += 1
+    return total or None
+
+
+# === HIBA-OSZTÁLYOZÁS ÉS BACKOFF ===
+
+RETRYABLE_STATUS_CODES = {429, 503}
+
+
+def rate_limit_status(error: Exception) -> Optional[int]:
+    """429 / 503 hiba felismerése (OpenAI `status_code`, Google API core `code`, vagy az üzenet)."""
+    for attribute in ("status_code", "code", "http_status"):
+        status = getattr(error, attribute, None)
+        try:
+            status = int(status)
+        except (TypeError, ValueError):
+            continue
+        if status in RETRYABLE_STATUS_CODES:
+            return status
+    if type(error).__name__ in ("RateLimitError", "ResourceExhausted", "TooManyRequests"):
+        return 429
+    if type(error).__name__ == "ServiceUnavailable":
+        return 503
+    return None
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    retry_after = _parse_duration(headers.get("retry-after"))
+    if retry_after is None:
+        milliseconds = _to_float(headers.get("retry-after-ms"))
+        retry_after = milliseconds / 1000 if milliseconds else None
+    return retry_after
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Exponenciális backoff teljes jitterrel; a `retry-after` az alsó korlát."""
+    ceiling = min(RATE_LIMIT_BACKOFF_MAX_SECONDS, RATE_LIMIT_BACKOFF_BASE_SECONDS * (2 ** attempt))
+    return max(retry_after or 0.0, random.uniform(0, ceiling))
+
+
+def call_with_backoff(limiter: Optional[AdaptiveRateLimiter], func: Callable, *args,
+                      estimated_tokens: int = 0, max_retries: int = RATE_LIMIT_MAX_RETRIES, **kwargs):
+    """
+    Szinkron hívás a limiter keretén belül. 429 / 503 esetén a limiter lassít, és
+    jitteres exponenciális backoff után újrapróbál; más hibák változatlanul továbbmennek.
+    """
+    for attempt in range(max_retries + 1):
+        if limiter:
+            limiter.acquire(estimated_tokens)
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            status = rate_limit_status(e)
+            if status is None:
+                raise
+            retry_after = retry_after_seconds(e)
+            if limiter:
+                limiter.on_rate_limited(retry_after)
+            if attempt >= max_retries:
+                raise RateLimitError(f"{getattr(limiter, 'name', 'provider')}: HTTP {status} a(z) {attempt + 1}. próbálkozás után") from e
+            if limiter:
+                limiter.stats["retries"] += 1
+            time.sleep(backoff_delay(attempt, retry_after))
+            continue
+        if limiter:
+            limiter.on_success()
+        return result
+
+
+async def call_with_backoff_async(limiter: Optional[AdaptiveRateLimiter], make_call: Callable,
+                                  estimated_tokens: int = 0, max_retries: int = RATE_LIMIT_MAX_RETRIES):
+    """`call_with_backoff` aszinkron párja; `make_call()` minden próbálkozásnál új awaitable-t ad."""
+    for attempt in range(max_retries + 1):
+        if limiter:
+            await limiter.acquire_async(estimated_tokens)
+        try:
+            result = await make_call()
+        except Exception as e:
+            status = rate_limit_status(e)
+            if status is None:
+                raise
+            retry_after = retry_after_seconds(e)
+            if limiter:
+                limiter.on_rate_limited(retry_after)
+            if attempt >= max_retries:
+                raise RateLimitError(f"{getattr(limiter, 'name', 'provider')}: HTTP {status} a(z) {attempt + 1}. próbálkozás után") from e
+            if limiter:
+                limiter.stats["retries"] += 1
+            await asyncio.sleep(backoff_delay(attempt, retry_after))
+            continue
+        if limiter:
+            limiter.on_success()
+        return result
+
+
+# === KÖZÖS LIMITEREK ===
+# Egy szolgáltatóhoz / modellhez egy limiter tartozik, amit minden worker és modul megoszt
+
+_rate_limiters: Dict[str, AdaptiveRateLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, rate_per_minute: float, burst: Optional[int] = None,
+                     tokens_per_minute: Optional[float] = None) -> AdaptiveRateLimiter:
+    """Névvel (`szolgáltató:modell`) azonosított, folyamaton belül közös limiter (az első hívás paraméterei érvényesek)."""
+    with _registry_lock:
+        limiter = _rate_limiters.get(name)
+        if limiter is None:
+            limiter = AdaptiveRateLimiter(name, rate_per_minute, burst=burst, tokens_per_minute=tokens_per_minute)
+            _rate_limiters[name] = limiter
+        return limiter
+
+
+def get_gemini_rate_limiter(model_name: str) -> AdaptiveRateLimiter:
+    """A Gemini modell egyetlen közös limitere: minden hívó (elemzés, generálás, API) ugyanabból a keretből fogy."""
+    return get_rate_limiter(f"gemini:{model_name}", GEMINI_RATE_LIMIT_PER_MINUTE, burst=GEMINI_RATE_LIMIT_BURST,
+                            tokens_per_minute=GEMINI_TOKENS_PER_MINUTE)
+
+
+def scale_rate_limits(factor: float):
+    """Minden regisztrált limiter plafonjának szorzása (benchmark: nagyobb szolgáltatói keret szimulálása)."""
+    with _registry_lock:
+        limiters = list(_rate_limiters.values())
+    for limiter in limiters:
+        tokens_per_minute = limiter.tokens.rate * 60 * factor if limiter.tokens else None
+        limiter.set_ceiling(limiter.ceiling * factor, tokens_per_minute)
+
+
+def get_rate_limiter_status() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        return {name: limiter.get_status() for name, limiter in _rate_limiters.items()}
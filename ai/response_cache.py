@@ -0,0 +1,163 @@
+# ai/response_cache.py - LLM VÁLASZ CACHE
+# Azonos (modell, prompt, paraméterek) hívásra a korábbi válasz jön vissza - újrafeldolgozásnál és benchmarknál ingyenes
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+from config.settings import (
+    LLM_RESPONSE_CACHE_ENABLED,
+    LLM_RESPONSE_CACHE_FILE,
+    LLM_RESPONSE_CACHE_MAX_ENTRIES,
+    LLM_RESPONSE_CACHE_MAX_MB,
+    LLM_RESPONSE_CACHE_MAX_AGE_DAYS,
+)
+
+# Ennyi írásonként fut kilakoltatás
+EVICT_EVERY_PUTS = 50
+
+
+class LLMResponseCache:
+    """
+    Lemezen tárolt válasz-cache külön SQLite fájlban (a fő adatbázis zárait nem terheli).
+
+    - Kulcs: sha256(modell + prompt / üzenetek + paraméterek), kanonikus JSON-ból.
+    - `tag`: a cikk ID-ja, hogy egy cikk bejegyzései kényszerített újragenerálásnál törölhetők legyenek.
+    - Kilakoltatás: `max_age_days`-nél régebbi bejegyzések, majd a legrégebben használtak
+      `max_entries` darab és `max_mb` méret fölött.
+    """
+
+    def __init__(self, path: str = LLM_RESPONSE_CACHE_FILE,
+                 max_entries: int = LLM_RESPONSE_CACHE_MAX_ENTRIES,
+                 max_mb: float = LLM_RESPONSE_CACHE_MAX_MB,
+                 max_age_days: float = LLM_RESPONSE_CACHE_MAX_AGE_DAYS):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                tag TEXT,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_responses_last_used ON llm_responses (last_used)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_responses_tag ON llm_responses (tag)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, prompt: Any, params: Optional[Dict] = None) -> str:
+        payload = json.dumps({"model": model, "prompt": prompt, "params": params or {}},
+                             ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_responses SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model: str, response: str, tag: Optional[Any] = None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, model, tag, response, size, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, str(tag) if tag is not None else None, response,
+                 len(response.encode('utf-8')), now, now)
+            )
+            self._conn.commit()
+            self._puts += 1
+            if self._puts % EVICT_EVERY_PUTS == 0:
+                self._evict_locked()
+
+    def invalidate(self, key: str) -> bool:
+        """Egy bejegyzés törlése (pl. utólag érvénytelennek bizonyult válasz)."""
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,)).rowcount
+            self._conn.commit()
+            return deleted > 0
+
+    def invalidate_tag(self, tag: Any) -> int:
+        """Egy cikk összes cache-elt válaszának törlése (kényszerített újragenerálás)."""
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM llm_responses WHERE tag = ?", (str(tag),)).rowcount
+            self._conn.commit()
+            return deleted
+
+    def evict(self):
+        with self._lock:
+            self._evict_locked()
+
+    def _evict_locked(self):
+        self._conn.execute("DELETE FROM llm_responses WHERE created_at < ?", (time.time() - self.max_age_seconds,))
+        count, total_size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses").fetchone()
+        if count > self.max_entries or total_size > self.max_bytes:
+            # A legrégebben használt bejegyzések törlése, amíg mindkét korlát alá nem érünk
+            rows = self._conn.execute("SELECT key, size FROM llm_responses ORDER BY last_used").fetchall()
+            doomed = []
+            for key, size in rows:
+                if count <= self.max_entries and total_size <= self.max_bytes:
+                    break
+                doomed.append((key,))
+                count -= 1
+                total_size -= size
+            self._conn.executemany("DELETE FROM llm_responses WHERE key = ?", doomed)
+        self._conn.commit()
+
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            count, total_size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": count,
+            "size_mb": round(total_size / 1024 / 1024, 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0,
+        }
+
+
+_response_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[LLMResponseCache]:
+    """A folyamat közös válasz-cache-e; `LLM_RESPONSE_CACHE_ENABLED = False` esetén None."""
+    global _response_cache
+    if not LLM_RESPONSE_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _response_cache is None:
+            try:
+                _response_cache = LLMResponseCache()
+            except Exception as e:
+                print(f"⚠️ LLM válasz cache nem elérhető: {e}")
+                return None
+        return _response_cache
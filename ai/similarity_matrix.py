@@ -0,0 +1,153 @@
+# ai/similarity_matrix.py - VEKTORIZÁLT HASONLÓSÁGI MÁTRIX
+# Teljes téma/entitás hasonlósági mátrix egy NumPy menetben, mohó megtartás/elvetés a mátrixon
+
+import zlib
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from ai.dedup_index import fingerprint_similarity, DUPLICATE_SIMILARITY_THRESHOLD
+
+# Téma: hash-elt karakter n-gram gyakoriság-vektor (koszinusz hasonlóság)
+TOPIC_NGRAM_SIZE = 2
+TOPIC_VECTOR_DIM = 4096
+# Entitás: hash-elt bitset (a metszet a bitsetek skaláris szorzata)
+ENTITY_BITSET_DIM = 1024
+# Pontos megerősítésnél ennyivel a küszöb alatti mátrix-értékek is jelöltek.
+# Heurisztika, nem korlát: a hash-elt n-gram koszinusz és a pontos téma-hasonlóság eltérése nincs felülről becsülve,
+# ezért egy a margón kívül eső valódi duplikátum elveszhet (lásd EDITORIAL_DEDUP_ENGINE)
+CANDIDATE_MARGIN = 0.2
+
+
+def _bucket(token: str, dim: int) -> int:
+    return zlib.crc32(token.encode('utf-8')) % dim
+
+
+class SimilarityMatrixEngine:
+    """
+    NumPy alapú batch hasonlóság az AI ujjlenyomatokra.
+
+    - Téma: karakter n-gram vektorok, L2 normálva → koszinusz mátrix egy mátrixszorzással.
+    - Entitás: bitset mátrix → metszet = E·Eᵀ, unió = |A| + |B| - metszet → Jaccard mátrix.
+    - Súlyozás a meglévő szabály szerint: 0.6 téma + 0.4 entitás.
+
+    A koszinusz a SequenceMatcher arány közelítése, ezért `exact_confirm=True` esetén a mátrix
+    csak jelöltet ad (küszöb - `CANDIDATE_MARGIN` fölött), a döntést a pontos hasonlóság hozza.
+    """
+
+    def __init__(self, threshold: float = DUPLICATE_SIMILARITY_THRESHOLD, exact_confirm: bool = True,
+                 candidate_margin: float = CANDIDATE_MARGIN):
+        self.threshold = threshold
+        self.exact_confirm = exact_confirm
+        self.candidate_margin = candidate_margin
+
+    @staticmethod
+    def encode_topics(fingerprints: List[Dict]) -> np.ndarray:
+        matrix = np.zeros((len(fingerprints), TOPIC_VECTOR_DIM), dtype=np.float32)
+        for row, fingerprint in enumerate(fingerprints):
+            topic = str((fingerprint or {}).get("main_topic", "") or "").lower()
+            if not topic:
+                continue
+            if len(topic) < TOPIC_NGRAM_SIZE:
+                matrix[row, _bucket(topic, TOPIC_VECTOR_DIM)] += 1
+                continue
+            for i in range(len(topic) - TOPIC_NGRAM_SIZE + 1):
+                matrix[row, _bucket(topic[i:i + TOPIC_NGRAM_SIZE], TOPIC_VECTOR_DIM)] += 1
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    @staticmethod
+    def encode_entities(fingerprints: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        bitsets = np.zeros((len(fingerprints), ENTITY_BITSET_DIM), dtype=np.float32)
+        sizes = np.zeros(len(fingerprints), dtype=np.float32)
+        for row, fingerprint in enumerate(fingerprints):
+            entities = {str(e).lower() for e in (fingerprint or {}).get("key_entities", []) or []}
+            sizes[row] = len(entities)
+            for entity in entities:
+                bitsets[row, _bucket(entity, ENTITY_BITSET_DIM)] = 1.0
+        return bitsets, sizes
+
+    def similarity_matrix(self, fingerprints: List[Dict]) -> np.ndarray:
+        """A teljes n x n hasonlósági mátrix (0.6 téma koszinusz + 0.4 entitás Jaccard)."""
+        topics = self.encode_topics(fingerprints)
+        topic_sim = topics @ topics.T
+
+        bitsets, sizes = self.encode_entities(fingerprints)
+        intersection = bitsets @ bitsets.T
+        union = sizes[:, None] + sizes[None, :] - intersection
+        entity_sim = np.zeros_like(intersection)
+        # Üres entitás-halmaz mellett az átfedés 0, mint a pontos számításban
+        np.divide(intersection, union, out=entity_sim, where=(union > 0) & (sizes[:, None] > 0) & (sizes[None, :] > 0))
+
+        return 0.6 * topic_sim + 0.4 * entity_sim
+
+    def greedy_dedup(self, items: List[Dict]) -> Tuple[List[int], Dict[int, Tuple[int, float]]]:
+        """
+        Mohó megtartás/elvetés a (fontosság szerint rendezett) `items` sorrendjében a mátrixon.
+        Visszatérés a `dedup_index.greedy_dedup` formátumában.
+        """
+        fingerprints = [item.get("fingerprint") or {} for item in items]
+        if not fingerprints:
+            return [], {}
+        matrix = self.similarity_matrix(fingerprints)
+        cutoff = self.threshold - self.candidate_margin if self.exact_confirm else self.threshold
+
+        kept: List[int] = []
+        kept_mask = np.zeros(len(items), dtype=bool)
+        duplicates: Dict[int, Tuple[int, float]] = {}
+        for position in range(len(items)):
+            # A megtartott elemek sorrendje = pozíció sorrend, így az első egyező ugyanaz, mint a ciklusban
+            candidates = np.flatnonzero(kept_mask & (matrix[position] > cutoff))
+            match = None
+            for kept_position in candidates:
+                if self.exact_confirm:
+                    similarity = fingerprint_similarity(fingerprints[position], fingerprints[kept_position])
+                else:
+                    similarity = float(matrix[position, kept_position])
+                if similarity > self.threshold:
+                    match = (int(kept_position), similarity)
+                    break
+            if match is not None:
+                duplicates[position] = match
+            else:
+                kept.append(position)
+                kept_mask[position] = True
+        return kept, duplicates
+
+
+# === BENCHMARK ===
+
+def main():
+    import argparse
+    import time
+    from config.settings import EDITORIAL_ANALYSIS_CACHE_FILE
+    from ai.dedup_index import greedy_dedup, load_regression_corpus
+
+    parser = argparse.ArgumentParser(description="Duplikátum-szűrő motorok benchmarkja")
+    parser.add_argument('--corpus', type=str, default=EDITORIAL_ANALYSIS_CACHE_FILE,
+                        help="Elemzés cache fájl vagy JSON lista ujjlenyomatokkal")
+    args = parser.parse_args()
+
+    items = load_regression_corpus(args.corpus)
+    print(f"🧪 Korpusz: {len(items)} ujjlenyomat ({args.corpus})")
+
+    engines = {
+        "python_loop": lambda: greedy_dedup(items, use_index=False),
+        "lsh_index": lambda: greedy_dedup(items, use_index=True),
+        "matrix_exact_confirm": lambda: SimilarityMatrixEngine(exact_confirm=True).greedy_dedup(items),
+        "matrix_only": lambda: SimilarityMatrixEngine(exact_confirm=False).greedy_dedup(items),
+    }
+    reference = None
+    for name, run in engines.items():
+        start_time = time.perf_counter()
+        kept, duplicates = run()
+        elapsed = time.perf_counter() - start_time
+        if reference is None:
+            reference = set(kept)
+        agreement = 1 - len(reference ^ set(kept)) / max(1, len(items))
+        print(f"   {name:<22} {elapsed * 1000:9.1f} ms | megtartva {len(kept):5d} | egyezés a ciklussal: {agreement * 100:6.2f}%")
+
+
+if __name__ == "__main__":
+    main()
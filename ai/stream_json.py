@@ -0,0 +1,193 @@
+# ai/stream_json.py - INKREMENTÁLIS JSON OBJEKTUM ÉRTELMEZŐ
+# A modell válaszát darabonként olvassa; a felső szintű mezők (title, keywords, ...) már a lezárásukkor elérhetők
+
+import json
+from typing import Any, Callable, Dict, Optional
+
+_WHITESPACE = " \t\r\n"
+_SCALAR_END = ",}] \t\r\n"
+
+
+class IncrementalJSONObjectParser:
+    """
+    Egyetlen felső szintű JSON objektum folyamatos értelmezése.
+
+    - A `{` előtti szöveget (pl. ```json kerítés, bevezető mondat) átugorja.
+    - Minden felső szintű mező a saját értékének lezárásakor kerül a `fields`-be,
+      és ekkor hívódik az `on_field(név, érték)` callback.
+    - A félbemaradt tokent a következő darabnál onnan folytatja, ahol abbahagyta,
+      így a teljes szövegen nincs ismételt regex-keresés.
+    - A nyers sortörést a sztringekben elfogadja (`strict=False`), mert a modellek gyakran így írnak.
+
+    `done` a záró `}` után igaz; `failed` szintaktikai hibánál (a hívó ekkor visszaeshet).
+    """
+
+    def __init__(self, on_field: Optional[Callable[[str, Any], None]] = None):
+        self.on_field = on_field
+        self.reset()
+
+    def reset(self):
+        """Újrakezdés (pl. újrapróbált streaming hívás előtt)."""
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self.failed = False
+        self._buffer = ""
+        self._pos = 0
+        self._state = "seek"
+        self._key: Optional[str] = None
+        # Félbemaradt token folytatásához
+        self._scan: Optional[int] = None
+        self._escaped = False
+        self._in_string = False
+        self._depth = 0
+
+    def feed(self, chunk: str) -> "IncrementalJSONObjectParser":
+        if chunk and not (self.done or self.failed):
+            self._buffer += chunk
+            self._parse()
+        return self
+
+    @property
+    def text(self) -> str:
+        return self._buffer
+
+    def _reset_scan(self):
+        self._scan = None
+        self._escaped = False
+        self._in_string = False
+        self._depth = 0
+
+    def _scan_string(self) -> Optional[int]:
+        """A sztring záró idézőjelének indexe; a keresés C-ben fut (`str.find`), nem karakterenként."""
+        buf = self._buffer
+        i = self._scan if self._scan is not None else self._pos + 1
+        while True:
+            end = buf.find('"', i)
+            if end < 0:
+                self._scan = len(buf)
+                return None
+            # Páratlan számú megelőző backslash = escape-elt idézőjel
+            backslashes = 0
+            while buf[end - 1 - backslashes] == "\\":
+                backslashes += 1
+            if backslashes % 2 == 0:
+                self._reset_scan()
+                return end
+            i = end + 1
+
+    def _scan_composite(self) -> Optional[int]:
+        buf = self._buffer
+        if self._scan is None:
+            i, depth, in_string, escaped = self._pos, 0, False, False
+        else:
+            i, depth, in_string, escaped = self._scan, self._depth, self._in_string, self._escaped
+        while i < len(buf):
+            ch = buf[i]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch in "{[":
+                depth += 1
+            elif ch in "}]":
+                depth -= 1
+                if depth == 0:
+                    self._reset_scan()
+                    return i
+            i += 1
+        self._scan, self._depth, self._in_string, self._escaped = i, depth, in_string, escaped
+        return None
+
+    def _scan_scalar(self) -> Optional[int]:
+        buf = self._buffer
+        i = self._scan if self._scan is not None else self._pos
+        while i < len(buf):
+            if buf[i] in _SCALAR_END:
+                self._reset_scan()
+                return i - 1
+            i += 1
+        self._scan = i
+        return None
+
+    def _set_field(self, key: str, value: Any):
+        self.fields[key] = value
+        if self.on_field:
+            self.on_field(key, value)
+
+    def _parse(self):
+        buf = self._buffer
+        while not (self.done or self.failed):
+            if self._scan is None:
+                while self._pos < len(buf) and buf[self._pos] in _WHITESPACE:
+                    self._pos += 1
+            if self._pos >= len(buf):
+                return
+            ch = buf[self._pos]
+
+            if self._state == "seek":
+                start = buf.find("{", self._pos)
+                if start < 0:
+                    self._pos = len(buf)
+                    return
+                self._pos = start + 1
+                self._state = "key"
+
+            elif self._state == "key":
+                if ch == "}":
+                    self._pos += 1
+                    self.done = True
+                elif ch != '"':
+                    self.failed = True
+                else:
+                    end = self._scan_string()
+                    if end is None:
+                        return
+                    self._key = json.loads(buf[self._pos:end + 1], strict=False)
+                    self._pos = end + 1
+                    self._state = "colon"
+
+            elif self._state == "colon":
+                if ch != ":":
+                    self.failed = True
+                else:
+                    self._pos += 1
+                    self._state = "value"
+
+            elif self._state == "value":
+                if ch == '"':
+                    end = self._scan_string()
+                elif ch in "{[":
+                    end = self._scan_composite()
+                else:
+                    end = self._scan_scalar()
+                if end is None:
+                    return
+                try:
+                    value = json.loads(buf[self._pos:end + 1], strict=False)
+                except ValueError:
+                    self.failed = True
+                    return
+                self._pos = end + 1
+                self._state = "after_value"
+                self._set_field(self._key, value)
+
+            elif self._state == "after_value":
+                if ch == ",":
+                    self._pos += 1
+                    self._state = "key"
+                elif ch == "}":
+                    self._pos += 1
+                    self.done = True
+                else:
+                    self.failed = True
+
+
+def parse_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Egy menetes értelmezés teljes szövegre; None, ha nincs teljes, érvényes objektum."""
+    parser = IncrementalJSONObjectParser().feed(text or "")
+    return parser.fields if parser.done else None
@@ -1,16 +1,18 @@
-import openai
-from openai import OpenAI
 from database.db import get_db_session
 from database.models import Article, ProcessingLog
-from config.settings import OPENAI_API_KEY, TTS_VOICE, TTS_SPEED, AUDIO_DIR
+from config.settings import TTS_VOICE, TTS_SPEED, AUDIO_DIR, TTS_RATE_LIMIT_PER_MINUTE
+from ai.rate_limiter import get_rate_limiter, call_with_backoff
+from ai.providers import get_llm_provider
 import os
 import time
 import hashlib
 
 class TTSGenerator:
     def __init__(self):
-        # A proxies paramétert nem használjuk az új OpenAI API-val
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        # OpenAI TTS a szolgáltató rétegen át (offline fake-kel is futtatható)
+        self.provider = get_llm_provider('openai')
+        # Közös limiter a fix sleep helyett (429 / 503 esetén lassítás + backoff)
+        self.rate_limiter = get_rate_limiter('openai:tts-1', TTS_RATE_LIMIT_PER_MINUTE)
         
         # Audio könyvtár létrehozása
         os.makedirs(AUDIO_DIR, exist_ok=True)
@@ -51,9 +53,6 @@ class TTSGenerator:
                         
                         print(f"✅ Audio generálva: {audio_filename}")
                     
-                    # Rate limiting (OpenAI TTS API)
-                    time.sleep(1)
-                    
                 except Exception as e:
                     print(f"❌ TTS generálási hiba: {str(e)}")
                     db.rollback()
@@ -80,6 +79,32 @@ class TTSGenerator:
         finally:
             db.close()
     
+    def generate_audio_for_article(self, article_id: int) -> bool:
+        """Hangfájl egyetlen, már legenerált cikkhez (streaming pipeline)"""
+        db = get_db_session()
+        try:
+            article = db.query(Article).filter(Article.id == article_id).first()
+            if not article or not article.is_processed or article.has_audio:
+                return False
+            
+            audio_filename = self._generate_single_audio(article)
+            if not audio_filename:
+                return False
+            
+            article.has_audio = True
+            article.audio_filename = audio_filename
+            article.audio_duration = self._get_audio_duration(audio_filename)
+            db.commit()
+            print(f"✅ Audio generálva: {audio_filename}")
+            return True
+            
+        except Exception as e:
+            print(f"❌ TTS generálási hiba: {str(e)}")
+            db.rollback()
+            return False
+        finally:
+            db.close()
+    
     def _generate_single_audio(self, article: Article):
         """Egy cikkhez hangfájl generálás"""
         try:
@@ -100,16 +125,18 @@ class TTSGenerator:
                 return audio_filename
             
             # OpenAI TTS API hívás
-            response = self.client.audio.speech.create(
-                model="tts-1",  # tts-1 vagy tts-1-hd (drágább de jobb minőség)
+            audio_bytes = call_with_backoff(
+                self.rate_limiter,
+                self.provider.synthesize_speech,
+                text_to_speak,
                 voice=TTS_VOICE,
-                input=text_to_speak,
-                speed=TTS_SPEED
+                speed=TTS_SPEED,
+                model="tts-1"  # tts-1 vagy tts-1-hd (drágább de jobb minőség)
             )
             
             # Hangfájl mentése
             with open(audio_path, 'wb') as f:
-                f.write(response.content)
+                f.write(audio_bytes)
             
             return audio_filename
             
@@ -9,6 +9,7 @@ import asyncio
 import time
 import json
 import traceback  # Enhanced error logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Tuple, Any
 from datetime import datetime, timedelta
 import os
@@ -30,6 +31,7 @@ from database.models import Article, ProcessingLog
 # A hadtest végrehajtó egységeinek importálása
 from ai.processor import StrategicDualPhaseAIProcessor
 from ai.editorial_ai import StrategicEditorialAI
+from ai.fingerprint_store import record_story_fingerprint
 try:
     from ai.journalists import get_journalist_manager
     JOURNALIST_MANAGER_AVAILABLE = True
@@ -158,6 +160,7 @@ class ChimeraDualChannelOrchestrator:
                 gtp_score
             ).select_from(Article).add_columns(fpp_case, fbp_case).filter(
                 Article.is_processed == False,
+                Article.duplicate_of_id.is_(None),
                 Article.published_at >= cutoff_time
             ).order_by(
                 gtp_score.desc()
@@ -167,6 +170,7 @@ class ChimeraDualChannelOrchestrator:
             
             old_unprocessed = db.query(Article).filter(
                 Article.is_processed == False,
+                Article.duplicate_of_id.is_(None),
                 Article.published_at < cutoff_time
             ).count()
             
@@ -227,8 +231,9 @@ class ChimeraDualChannelOrchestrator:
             for article in articles:
                 print(f"   🚄 Blitz article: {article.original_title[:40]}... (score: {getattr(article, 'importance_score', 0)})")
             
-            # Process all articles in batch
-            processed_count = self.processor.process_articles_for_generation(articles)
+            # Process all articles in batch - külön szálon, a saját (blitz) párhuzamossági keretével,
+            # így nem blokkolja az event loopot és átfedésben fut a stratégiai csatornával
+            processed_count = await asyncio.to_thread(self.processor.process_articles_for_generation, articles, 'blitz')
             
             processing_time = time.time() - start_time
             print(f"🚄 BLITZ CHANNEL COMPLETE: {processed_count} articles in {processing_time:.1f}s")
@@ -252,6 +257,11 @@ class ChimeraDualChannelOrchestrator:
         if not articles:
             return {"processed": 0, "time": 0, "results": []}
 
+        # A blokkoló generálás külön szálon fut, így a blitz csatornával valóban párhuzamos
+        return await asyncio.to_thread(self._run_strategic_channel, articles)
+
+    def _run_strategic_channel(self, articles: List[Article]) -> Dict[str, Any]:
+        """A stratégiai csatorna szinkron végrehajtása: sorrendi kiosztás, párhuzamos generálás, sorrendi mentés."""
         print(f"🎯 STRATEGIC CHANNEL START: {len(articles)} articles processing...")
         start_time = time.time()
         
@@ -259,75 +269,76 @@ class ChimeraDualChannelOrchestrator:
         successful_articles = []
         
         try:
+            # Újságíró kijelölés és modellválasztás sorrendben (a prémium kvóta atomikusan fogy)
+            plans = []
             for i, article in enumerate(articles):
                 try:
-                    print(f"\n   🎯 Processing {i+1}/{len(articles)}: {article.original_title[:50]}...")
-                    print(f"      📊 Category: {getattr(article, 'category', 'general')}, Importance: {getattr(article, 'importance_score', 0)}/20")
-                    
-                    # Újságíró kijelölés enhanced logging-gal
-                    journalist_assignment = None
-                    if self.journalist_manager:
-                        journalist_assignment = self.journalist_manager.select_journalist_for_article(
-                            getattr(article, 'category', 'general'),
-                            getattr(article, 'importance_score', 8),
-                            getattr(article, 'original_content', '') or ''
-                        )
-                        
-                        if journalist_assignment:
-                            print(f"      👤 Journalist: {journalist_assignment['journalist_name']}")
-                            print(f"         📊 Expertise: {', '.join(journalist_assignment.get('expertise', []))}")
-                            print(f"         🎯 Score: {journalist_assignment.get('score', 0):.2f}")
-                    
-                    # Model selection
-                    model_to_use = self.processor._determine_model(
-                        getattr(article, 'importance_score', 8), 
-                        journalist_assignment
-                    )
-                    print(f"      🤖 Model: {model_to_use.upper()}")
-                    
-                    # Content generation with enhanced error handling
-                    content_result = self.processor._generate_final_content(article, model_to_use, journalist_assignment)
-                    
-                    if content_result and content_result.get('article_body'):
-                        # Successful generation - update database
-                        db = get_db_session()
-                        try:
-                            article.ai_summary = content_result.get('article_body')
-                            article.ai_title = content_result.get('title')
-                            article.sentiment = content_result.get('sentiment')
-                            article.seo_keywords = content_result.get('keywords')
-                            article.is_processed = True
-                            article.processing_model = f"strategic_{model_to_use}"
-                            
-                            if journalist_assignment:
-                                article.assigned_journalist = journalist_assignment.get('journalist_id')
-                                article.journalist_name = journalist_assignment.get('journalist_name')
-                            
-                            db.merge(article)
-                            db.commit()
-                            processed_count += 1
-                            successful_articles.append(article)
-                            
-                            print(f"      ✅ Content generated successfully (ID: {article.id})")
-                            
-                        except Exception as db_error:
-                            print(f"      ❌ Database error for article {article.id}: {type(db_error).__name__}: {str(db_error)}")
-                            db.rollback()
-                            self.performance_metrics["generation_errors"] += 1
-                        finally:
-                            db.close()
-                    else:
-                        print(f"      ⚠️ Content generation failed - no valid content returned")
-                        self.performance_metrics["generation_errors"] += 1
-                
+                    print(f"\n   🎯 Planning {i+1}/{len(articles)}: {article.original_title[:50]}...")
+                    plan = self.processor._plan_generation(article)
+                    journalist_assignment = plan['journalist_assignment']
+                    if journalist_assignment:
+                        print(f"         📊 Expertise: {', '.join(journalist_assignment.get('expertise', []))}")
+                        print(f"         🎯 Score: {journalist_assignment.get('score', 0):.2f}")
+                    plans.append(plan)
                 except Exception as article_error:
-                    print(f"      ❌ Article processing error (ID: {getattr(article, 'id', 'unknown')}): {type(article_error).__name__}: {str(article_error)}")
-                    print(f"         Traceback: \n{traceback.format_exc()}")
+                    print(f"      ❌ Article planning error (ID: {getattr(article, 'id', 'unknown')}): {type(article_error).__name__}: {str(article_error)}")
                     self.performance_metrics["generation_errors"] += 1
-                    continue
+                    plans.append(None)
+            
+            # Content generation with enhanced error handling - a stratégiai csatorna saját keretével
+            with ThreadPoolExecutor(max_workers=self.processor.channel_worker_count('strategic')) as executor:
+                futures = [
+                    executor.submit(self.processor._generate_with_limits, article, plan['model'],
+                                    plan['journalist_assignment'], 'strategic') if plan else None
+                    for article, plan in zip(articles, plans)
+                ]
+                
+                for article, plan, future in zip(articles, plans, futures):
+                    if future is None:
+                        continue
+                    journalist_assignment = plan['journalist_assignment']
+                    try:
+                        content_result = future.result()
+                        model_to_use = (content_result or {}).get('model_used', plan['model'])
+                        
+                        if content_result and content_result.get('article_body'):
+                            # Successful generation - update database
+                            db = get_db_session()
+                            try:
+                                article.ai_summary = content_result.get('article_body')
+                                article.ai_title = content_result.get('title')
+                                article.sentiment = content_result.get('sentiment')
+                                article.seo_keywords = content_result.get('keywords')
+                                article.is_processed = True
+                                article.processing_model = f"strategic_{model_to_use}"
+                                
+                                if journalist_assignment:
+                                    article.assigned_journalist = journalist_assignment.get('journalist_id')
+                                    article.journalist_name = journalist_assignment.get('journalist_name')
+                                
+                                db.merge(article)
+                                record_story_fingerprint(db, article)
+                                db.commit()
+                                processed_count += 1
+                                successful_articles.append(article)
+                                
+                                print(f"      ✅ Content generated successfully (ID: {article.id}, {model_to_use.upper()})")
+                                
+                            except Exception as db_error:
+                                print(f"      ❌ Database error for article {article.id}: {type(db_error).__name__}: {str(db_error)}")
+                                db.rollback()
+                                self.performance_metrics["generation_errors"] += 1
+                            finally:
+                                db.close()
+                        else:
+                            print(f"      ⚠️ Content generation failed - no valid content returned (ID: {getattr(article, 'id', 'unknown')})")
+                            self.performance_metrics["generation_errors"] += 1
                     
-                # Rate limiting
-                await asyncio.sleep(0.3)
+                    except Exception as article_error:
+                        print(f"      ❌ Article processing error (ID: {getattr(article, 'id', 'unknown')}): {type(article_error).__name__}: {str(article_error)}")
+                        print(f"         Traceback: \n{traceback.format_exc()}")
+                        self.performance_metrics["generation_errors"] += 1
+                        continue
         
         except Exception as channel_error:
             print(f"❌ STRATEGIC CHANNEL CRITICAL ERROR: {type(channel_error).__name__}: {str(channel_error)}")
@@ -381,7 +392,7 @@ class ChimeraDualChannelOrchestrator:
             print("📝 Phase 2: Editorial AI preprocessing...")
             editorial_start = time.time()
             
-            editorial_results = self.editorial_ai.process_articles_editorial(articles)
+            editorial_results = await self.editorial_ai.process_articles_editorial_async(articles)
             articles_to_process = editorial_results.get("kept", [])
             duplicates_removed = editorial_results.get("duplicates", [])
             
@@ -390,6 +401,7 @@ class ChimeraDualChannelOrchestrator:
             print(f"   ✅ Editorial processing complete: {editorial_time:.1f}s")
             print(f"   📊 Kept: {len(articles_to_process)} articles")
             print(f"   🗑️ Duplicates removed: {len(duplicates_removed)} articles")
+            print(f"   🔗 Linked to earlier stories: {len(editorial_results.get('linked', []))} articles")
             
             self.performance_metrics["editorial_processed"] = len(articles)
             self.performance_metrics["duplicates_removed"] = len(duplicates_removed)
@@ -408,7 +420,10 @@ class ChimeraDualChannelOrchestrator:
             
             # === PHASE 4: PARALLEL CONTENT GENERATION ===
             print("🚀 Phase 4: Dual channel parallel processing...")
-            
+            # Napi kvóta-forduló egyszer, a párhuzamos csatornák indulása előtt (a csatornákon belüli
+            # hívás ezután no-op; mindkettő a zár alatt, ugyanabból a memóriabeli számlálóból foglal)
+            self.processor._reset_daily_counter_if_needed()
+
             blitz_task = self.process_blitz_channel(channels.get("blitz", []))
             strategic_task = self.process_strategic_channel(channels.get("strategic", []))
             
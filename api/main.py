@@ -11,8 +11,9 @@ import os
 import json
 
 # Database imports
-from database.db import get_db, create_tables, SessionLocal
+from database.db import get_read_db, create_tables, ReadSessionLocal
 from database.models import Article, User, SocialPost, SiteStats, ProcessingLog
+from database.engagement_buffer import get_engagement_buffer
 
 # ROUTES IMPORT ÉS INCLUDE
 from api.routes import router as api_router
@@ -87,7 +88,7 @@ app.include_router(api_router, prefix="/api")
 
 # === DIRECT ARTICLE TEST ROUTE ===
 @app.get("/direct-article")
-async def direct_article(id: int = Query(...), db: Session = Depends(get_db)):
+async def direct_article(id: int = Query(...), db: Session = Depends(get_read_db)):
     """Direct article loader - bypasses static files"""
     try:
         # Get article from database
@@ -96,9 +97,10 @@ async def direct_article(id: int = Query(...), db: Session = Depends(get_db)):
         if not article:
             raise HTTPException(status_code=404, detail="Cikk nem található")
         
-        # Increment view count
-        article.view_count += 1
-        db.commit()
+        # Increment view count - write-behind puffer, nincs író tranzakció oldalmegtekintésenként
+        engagement = get_engagement_buffer()
+        engagement.increment(article.id, "view_count")
+        view_count = engagement.merged(article, "view_count")
         
         # Return HTML with article data
         html_content = f"""
@@ -147,7 +149,7 @@ async def direct_article(id: int = Query(...), db: Session = Depends(get_db)):
             <strong>🆔 Article ID:</strong> {article.id}<br>
             <strong>📰 Forrás:</strong> {article.source}<br>
             <strong>📂 Kategória:</strong> {article.category}<br>
-            <strong>👁️ Megtekintések:</strong> {article.view_count}<br>
+            <strong>👁️ Megtekintések:</strong> {view_count}<br>
             <strong>📅 Publikálva:</strong> {article.published_at or 'N/A'}<br>
             <strong>🤖 AI feldolgozva:</strong> {article.created_at}
         </div>
@@ -311,7 +313,7 @@ async def index_html():
 
 # === HEALTH CHECK ===
 @app.get("/health")
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: Session = Depends(get_read_db)):
     """Rendszer állapot ellenőrzés"""
     try:
         # Database check
@@ -347,7 +349,7 @@ async def health_check():
     """Health check endpoint for monitoring"""
     try:
         # Test database connection
-        db = SessionLocal()
+        db = ReadSessionLocal()
         db.execute(text("SELECT 1"))
         db.close()
         db_status = "connected"
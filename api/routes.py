@@ -5,8 +5,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, func, text
-from database.db import get_db
+from database.db import get_db, get_read_db
 from database.models import Article
+from database.search import apply_article_search
+from database.pagination import InvalidCursorError, keyset_page
+from database.counters import article_count, grouped_counts
+from database.engagement_buffer import get_engagement_buffer
+from scraper.text_cleaner import clean_html
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
 import json
@@ -63,8 +68,15 @@ def log_performance(func):
 from pydantic import BaseModel
 
 # AI imports
-import openai
-import google.generativeai as genai
+from ai.providers import get_llm_provider
+from ai.rate_limiter import get_rate_limiter, get_gemini_rate_limiter, get_rate_limiter_status, call_with_backoff_async
+from ai.circuit_breaker import get_circuit_breaker_status
+from ai.response_cache import get_response_cache
+from config.settings import (
+    GPT4O_MAX_CONCURRENCY,
+    GPT4O_RATE_LIMIT_PER_MINUTE,
+    GPT4O_TOKENS_PER_MINUTE,
+)
 
 # DataCollector import
 from hirmagnet_data_collector import DataCollector
@@ -96,14 +108,10 @@ class ProcessingState:
 
 @contextmanager  
 def get_db_with_timeout(timeout=10):
-    """Database connection with timeout protection - RENDER OPTIMIZED"""
+    """Read-only database session with error protection (WAL / busy_timeout: database/db.py connect hook)"""
     session = None
     try:
-        session = next(get_db())
-        # RENDER FIX: Increased timeout and better error handling
-        session.execute(text(f"PRAGMA busy_timeout = {timeout * 1000}"))
-        session.execute(text("PRAGMA journal_mode = WAL"))  # Better concurrency
-        session.execute(text("PRAGMA synchronous = NORMAL"))  # Performance optimization
+        session = next(get_read_db())
         yield session
     except Exception as e:
         if session:
@@ -202,6 +210,9 @@ async def get_production_status():
         except Exception as e:
             status["database"] = {"connected": False, "error": str(e)}
         
+        # LLM szolgáltatók áramkörei (részletek: /provider-status)
+        status["providers"] = {name: breaker["state"] for name, breaker in get_circuit_breaker_status().items()}
+        
         # File system check
         status["filesystem"] = {
             "test_master_exists": os.path.exists("test_master.py"),
@@ -218,9 +229,18 @@ async def get_production_status():
             "status": "critical_error"
         }
 
-# ===== AI CONFIGURATION =====
-openai.api_key = os.getenv('OPENAI_API_KEY')
-genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
+@router.get("/provider-status")
+async def get_provider_status():
+    """LLM szolgáltatók állapota: circuit breaker és rate limiter (ebben a folyamatban)"""
+    import datetime
+
+    circuit_breakers = get_circuit_breaker_status()
+    return {
+        "timestamp": datetime.datetime.now().isoformat(),
+        "healthy": all(breaker["state"] == "closed" for breaker in circuit_breakers.values()),
+        "circuit_breakers": circuit_breakers,
+        "rate_limiters": get_rate_limiter_status(),
+    }
 
 # ===== PYDANTIC MODELS =====
 
@@ -287,7 +307,17 @@ class AIEditorService:
     
     def __init__(self):
         self.openai_model = "gpt-4o"
-        self.gemini_model = genai.GenerativeModel('gemini-2.5-flash-preview-05-20')
+        # Ugyanazok a szolgáltatók, mint a generálásnál (élő vagy offline fake, ai/providers.py)
+        self.providers = {
+            "openai": get_llm_provider('openai'),
+            "gemini": get_llm_provider('gemini'),
+        }
+        # Ugyanazok a közös limiterek, mint a generálásnál (a szolgáltatói keret is közös)
+        self.rate_limiters = {
+            "openai": get_rate_limiter('openai:gpt-4o', GPT4O_RATE_LIMIT_PER_MINUTE, burst=GPT4O_MAX_CONCURRENCY,
+                                       tokens_per_minute=GPT4O_TOKENS_PER_MINUTE),
+            "gemini": get_gemini_rate_limiter(self.providers["gemini"].model_name),
+        }
         
     async def process_command(
         self, 
@@ -359,18 +389,27 @@ class AIEditorService:
         system_prompt = self._build_system_prompt(style, audience, brand_voice)
         user_prompt = self._build_user_prompt(command, article)
         
+        limiter = self.rate_limiters["openai"]
+        prompt_chars = len(system_prompt) + len(user_prompt)
+        estimated_tokens = limiter.estimate_tokens(prompt_chars, 1000)
         try:
-            response = await openai.ChatCompletion.acreate(
-                model=self.openai_model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1000
+            response_text = await call_with_backoff_async(
+                limiter,
+                lambda: self.providers["openai"].agenerate(
+                    [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    model=self.openai_model,
+                    temperature=0.7,
+                    max_tokens=1000,
+                    on_headers=limiter.update_from_headers
+                ),
+                estimated_tokens=estimated_tokens
             )
+            limiter.record_usage(estimated_tokens, prompt_chars, len(response_text))
             
-            result = response.choices[0].message.content.strip()
+            result = response_text.strip()
             return self._parse_ai_response(result, article['id'])
             
         except Exception as e:
@@ -392,12 +431,17 @@ class AIEditorService:
         
         full_prompt = f"{system_prompt}\n\n{user_prompt}"
         
+        limiter = self.rate_limiters["gemini"]
+        estimated_tokens = limiter.estimate_tokens(len(full_prompt), 1000)
         try:
-            response = await asyncio.to_thread(
-                self.gemini_model.generate_content, full_prompt
+            response_text = await call_with_backoff_async(
+                limiter,
+                lambda: self.providers["gemini"].agenerate(full_prompt, max_tokens=1000),
+                estimated_tokens=estimated_tokens
             )
+            limiter.record_usage(estimated_tokens, len(full_prompt), len(response_text))
             
-            result = response.text.strip()
+            result = response_text.strip()
             return self._parse_ai_response(result, article['id'])
             
         except Exception as e:
@@ -553,17 +597,16 @@ def verify_admin_access():
 async def get_articles(
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Az előző oldal next_cursor értéke (keyset lapozás)"),
     category: Optional[str] = None,
     source: Optional[str] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """🎖️ HERR CLAUS NON-BLOCKING Articles endpoint with timeout protection"""
     try:
-        # CRITICAL: Database timeout protection
-        db.execute(text("PRAGMA busy_timeout = 10000"))  # 10 second timeout
-        
         query = db.query(Article).filter(Article.is_processed == True)
+        category_filter = None
         
         if category:
             if category.strip().lower() not in ["all", "minden", "összes", "🔥 legfrissebb hírek"]:
@@ -592,25 +635,37 @@ async def get_articles(
                                 category_code = code
                                 break
                 
-                if category_code:
-                    query = query.filter(Article.category == category_code)
-                else:
-                    query = query.filter(Article.category == category)
+                category_filter = category_code or category
+                query = query.filter(Article.category == category_filter)
         
         if source:
             query = query.filter(Article.source == source)
             
+        rank = None
         if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                (Article.title.ilike(search_term)) |
-                (Article.ai_summary.ilike(search_term))
-            )
-        
-        # CRITICAL: Execute with timeout protection
-        articles = query.order_by(desc(Article.created_at)).offset(offset).limit(limit).all()
-        total_count = query.count()
+            # FTS5 + BM25 (database/search.py); FTS index nélkül ILIKE
+            query, rank = apply_article_search(query, db, search, [Article.title, Article.ai_summary])
+        
+        # Darabszám a számlálótáblából (database/counters.py); keresésnél / kombinált szűrésnél COUNT(*)
+        total_count = None if search else article_count(db, True, category_filter, source)
+        if total_count is None:
+            total_count = query.count()
+        
+        next_cursor = None
+        if rank is not None:
+            # Relevancia szerinti találatok: offset lapozás
+            articles = query.order_by(rank, desc(Article.created_at)).offset(offset).limit(limit).all()
+            has_more = (offset + limit) < total_count
+        elif offset and not cursor:
+            # Régi kliensek: offset lapozás
+            articles = query.order_by(desc(Article.created_at), desc(Article.id)).offset(offset).limit(limit).all()
+            has_more = (offset + limit) < total_count
+        else:
+            # Keyset lapozás (created_at, id) szerint - a mély oldalak is egy index-keresések
+            articles, next_cursor = keyset_page(query, limit, cursor)
+            has_more = next_cursor is not None
         
+        engagement = get_engagement_buffer()
         article_list = []
         for article in articles:
             article_data = {
@@ -627,8 +682,8 @@ async def get_articles(
                 "audio_filename": article.audio_filename,
                 "audio_duration": article.audio_duration,
                 "sentiment": article.sentiment,
-                "view_count": article.view_count,
-                "audio_play_count": article.audio_play_count
+                "view_count": engagement.merged(article, "view_count"),
+                "audio_play_count": engagement.merged(article, "audio_play_count")
             }
             article_list.append(article_data)
         
@@ -637,11 +692,14 @@ async def get_articles(
             "total": total_count,
             "limit": limit,
             "offset": offset,
-            "has_more": (offset + limit) < total_count,
+            "has_more": has_more,
+            "next_cursor": next_cursor,
             "server_time": datetime.now().isoformat(),
             "processing_status": "processing" if background_processor.is_processing else "normal"
         }
         
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"❌ Articles API error: {e}")
         raise HTTPException(
@@ -651,18 +709,17 @@ async def get_articles(
 
 @router.get("/articles/{article_id}")
 @log_performance
-async def get_article(article_id: int, db: Session = Depends(get_db)):
+async def get_article(article_id: int, db: Session = Depends(get_read_db)):
     """🎖️ HERR CLAUS NON-BLOCKING Article detail with timeout protection"""
     try:
-        db.execute(text("PRAGMA busy_timeout = 15000"))  # 15s timeout  # 2 second timeout
-        
         article = db.query(Article).filter(Article.id == article_id).first()
         
         if not article:
             raise HTTPException(status_code=404, detail="Cikk nem található")
         
-        article.view_count += 1
-        db.commit()
+        # Write-behind számláló (database/engagement_buffer.py)
+        engagement = get_engagement_buffer()
+        engagement.increment(article.id, "view_count")
         
         return {
             "id": article.id,
@@ -680,8 +737,8 @@ async def get_article(article_id: int, db: Session = Depends(get_db)):
             "audio_duration": article.audio_duration,
             "sentiment": article.sentiment,
             "seo_keywords": article.seo_keywords,
-            "view_count": article.view_count,
-            "audio_play_count": article.audio_play_count,
+            "view_count": engagement.merged(article, "view_count"),
+            "audio_play_count": engagement.merged(article, "audio_play_count"),
             "processing_status": "processing" if background_processor.is_processing else "normal"
         }
         
@@ -699,12 +756,10 @@ async def get_article(article_id: int, db: Session = Depends(get_db)):
 async def get_trending_articles(
     hours: int = Query(24, ge=1, le=168),
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """🎖️ HERR CLAUS NON-BLOCKING Trending with timeout protection"""
     try:
-        db.execute(text("PRAGMA busy_timeout = 10000"))  # 10 second timeout
-        
         since = datetime.now() - timedelta(hours=hours)
         
         trending = db.query(Article).filter(
@@ -714,16 +769,19 @@ async def get_trending_articles(
             desc(Article.view_count + Article.audio_play_count * 2)
         ).limit(limit).all()
         
+        engagement = get_engagement_buffer()
         trending_list = []
         for article in trending:
+            view_count = engagement.merged(article, "view_count")
+            audio_play_count = engagement.merged(article, "audio_play_count")
             trending_list.append({
                 "id": article.id,
                 "title": article.ai_title or article.title,
                 "source": article.source,
                 "category": article.category,
-                "view_count": article.view_count,
-                "audio_play_count": article.audio_play_count,
-                "engagement_score": article.view_count + article.audio_play_count * 2,
+                "view_count": view_count,
+                "audio_play_count": audio_play_count,
+                "engagement_score": view_count + audio_play_count * 2,
                 "has_audio": article.has_audio,
                 "created_at": article.created_at.isoformat()
             })
@@ -745,12 +803,10 @@ async def get_trending_articles(
 async def get_latest_articles(
     limit: int = Query(20, ge=1, le=100),
     category: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """🎖️ HERR CLAUS NON-BLOCKING Latest articles with timeout protection"""
     try:
-        db.execute(text("PRAGMA busy_timeout = 10000"))  # 10 second timeout
-        
         query = db.query(Article).filter(Article.is_processed == True)
         
         if category:
@@ -905,18 +961,18 @@ async def trigger_background_processing():
 # ===== REST OF ORIGINAL ENDPOINTS (unchanged for backward compatibility) =====
 
 @router.post("/articles/{article_id}/play")
-async def track_audio_play(article_id: int, db: Session = Depends(get_db)):
-    """Hanglejátszás számláló"""
+async def track_audio_play(article_id: int, db: Session = Depends(get_read_db)):
+    """Hanglejátszás számláló (write-behind puffer, időszakos kiírás)"""
     try:
         article = db.query(Article).filter(Article.id == article_id).first()
         
         if not article:
             raise HTTPException(status_code=404, detail="Cikk nem található")
         
-        article.audio_play_count += 1
-        db.commit()
+        engagement = get_engagement_buffer()
+        engagement.increment(article.id, "audio_play_count")
         
-        return {"success": True, "play_count": article.audio_play_count}
+        return {"success": True, "play_count": engagement.merged(article, "audio_play_count")}
         
     except HTTPException:
         raise
@@ -924,22 +980,24 @@ async def track_audio_play(article_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Play tracking hiba: {str(e)}")
 
 @router.get("/categories")
-async def get_categories(db: Session = Depends(get_db)):
+async def get_categories(db: Session = Depends(get_read_db)):
     """Elérhető kategóriák listája cikkszámokkal"""
     try:
-        categories = db.query(
-            Article.category,
-            func.count(Article.id).label('count')
-        ).filter(
-            Article.is_processed == True
-        ).group_by(Article.category).order_by(
-            func.count(Article.id).desc()
-        ).all()
-        
-        category_list = [
-            {"name": cat[0], "count": cat[1]}
-            for cat in categories
-        ]
+        category_list = grouped_counts(db, "category")
+        if category_list is None:
+            categories = db.query(
+                Article.category,
+                func.count(Article.id).label('count')
+            ).filter(
+                Article.is_processed == True
+            ).group_by(Article.category).order_by(
+                func.count(Article.id).desc()
+            ).all()
+            
+            category_list = [
+                {"name": cat[0], "count": cat[1]}
+                for cat in categories
+            ]
         
         return {"categories": category_list}
         
@@ -947,22 +1005,24 @@ async def get_categories(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Kategóriák lekérdezési hiba: {str(e)}")
 
 @router.get("/sources")
-async def get_sources(db: Session = Depends(get_db)):
+async def get_sources(db: Session = Depends(get_read_db)):
     """Elérhető források listája cikkszámokkal"""
     try:
-        sources = db.query(
-            Article.source,
-            func.count(Article.id).label('count')
-        ).filter(
-            Article.is_processed == True
-        ).group_by(Article.source).order_by(
-            func.count(Article.id).desc()
-        ).all()
-        
-        source_list = [
-            {"name": src[0], "count": src[1]}
-            for src in sources
-        ]
+        source_list = grouped_counts(db, "source")
+        if source_list is None:
+            sources = db.query(
+                Article.source,
+                func.count(Article.id).label('count')
+            ).filter(
+                Article.is_processed == True
+            ).group_by(Article.source).order_by(
+                func.count(Article.id).desc()
+            ).all()
+            
+            source_list = [
+                {"name": src[0], "count": src[1]}
+                for src in sources
+            ]
         
         return {"sources": source_list}
         
@@ -1088,6 +1148,9 @@ async def update_article(
         if 'summary' in update_data:
             article.ai_summary = update_data['summary']
         
+        if update_data.get('original_content') is not None:
+            article.clean_content = clean_html(article.original_content)
+        
         article.is_processed = True
         
         db.commit()
@@ -1131,6 +1194,7 @@ async def create_article(
             summary=article_data.summary,
             ai_summary=article_data.summary,
             original_content=article_data.original_content,
+            clean_content=clean_html(article_data.original_content),
             source=article_data.source,
             category=article_data.category,
             url=article_data.url,
@@ -1205,7 +1269,7 @@ async def delete_article(
         raise HTTPException(status_code=500, detail=f"Deletion failed: {str(e)}")
 
 @router.get("/admin/stats")
-async def get_admin_stats(db: Session = Depends(get_db)):
+async def get_admin_stats(db: Session = Depends(get_read_db)):
     """Get detailed admin statistics"""
     try:
         if not verify_admin_access():
@@ -1280,7 +1344,7 @@ async def admin_search_articles(
     source: Optional[str] = Query(None, description="Source filter"),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Advanced article search for admin - includes unprocessed articles"""
     try:
@@ -1289,15 +1353,11 @@ async def admin_search_articles(
         
         query = db.query(Article)
         
+        rank = None
         if q:
-            search_term = f"%{q}%"
-            query = query.filter(
-                (Article.title.ilike(search_term)) |
-                (Article.ai_title.ilike(search_term)) |
-                (Article.summary.ilike(search_term)) |
-                (Article.ai_summary.ilike(search_term)) |
-                (Article.source.ilike(search_term))
-            )
+            query, rank = apply_article_search(query, db, q, [
+                Article.title, Article.ai_title, Article.summary, Article.ai_summary, Article.source
+            ])
         
         if category:
             query = query.filter(Article.category == category)
@@ -1305,10 +1365,15 @@ async def admin_search_articles(
         if source:
             query = query.filter(Article.source.ilike(f"%{source}%"))
         
-        total_count = query.count()
+        # Csak kategória szűrésnél (vagy szűrés nélkül) pontos a számláló; egyébként COUNT(*)
+        total_count = None if (q or source) else article_count(db, None, category)
+        if total_count is None:
+            total_count = query.count()
         
-        articles = query.order_by(desc(Article.created_at)).offset(offset).limit(limit).all()
+        ordering = [rank, desc(Article.created_at)] if rank is not None else [desc(Article.created_at)]
+        articles = query.order_by(*ordering).offset(offset).limit(limit).all()
         
+        engagement = get_engagement_buffer()
         article_list = []
         for article in articles:
             article_data = {
@@ -1323,8 +1388,8 @@ async def admin_search_articles(
                 "created_at": article.created_at.isoformat(),
                 "is_processed": article.is_processed,
                 "has_audio": article.has_audio,
-                "view_count": article.view_count,
-                "audio_play_count": article.audio_play_count,
+                "view_count": engagement.merged(article, "view_count"),
+                "audio_play_count": engagement.merged(article, "audio_play_count"),
                 "sentiment": article.sentiment,
                 "seo_keywords": article.seo_keywords
             }
@@ -1352,6 +1417,7 @@ async def admin_search_articles(
 @router.post("/admin/articles/{article_id}/reprocess")
 async def reprocess_article(
     article_id: int,
+    force: bool = Query(False, description="A cache-elt AI válaszok eldobása (valódi újragenerálás)"),
     db: Session = Depends(get_db)
 ):
     """Mark article for reprocessing - Admin only"""
@@ -1368,10 +1434,17 @@ async def reprocess_article(
         
         db.commit()
         
+        # Alapból a változatlan promptokra a cache-elt válasz jön vissza; force=True esetén újragenerálás
+        invalidated = 0
+        response_cache = get_response_cache() if force else None
+        if response_cache:
+            invalidated = response_cache.invalidate_tag(article_id)
+        
         return {
             "success": True,
             "message": f"Article {article_id} marked for reprocessing",
-            "article_id": article_id
+            "article_id": article_id,
+            "cached_responses_invalidated": invalidated
         }
         
     except HTTPException:
@@ -1624,6 +1697,9 @@ async def apply_ai_suggestions(
                 elif field == 'summary':
                     article.summary = suggested_value
                     article.ai_summary = suggested_value
+                elif field == 'original_content':
+                    article.original_content = suggested_value
+                    article.clean_content = clean_html(suggested_value)
                 else:
                     setattr(article, field, suggested_value)
                 
@@ -1685,7 +1761,7 @@ async def health_check():
     """🎖️ HERR CLAUS System health check endpoint"""
     try:
         # Check database connection
-        db = next(get_db())
+        db = next(get_read_db())
         try:
             db.execute(text("SELECT 1"))
             db_status = "connected"
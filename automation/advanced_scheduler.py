@@ -13,6 +13,8 @@ from scraper.news_scraper import NewsScraper
 from ai.processor import AIProcessor
 from ai.tts import TTSGenerator
 from automation.cleanup import cleanup_old_data
+from automation.stream_pipeline import StreamingPipeline
+from config.settings import FEED_SCHEDULER_TICK_MINUTES
 
 # Social Media Publishers
 from social.spotify_publisher import create_spotify_podcast
@@ -24,6 +26,7 @@ class AdvancedAutomationScheduler:
         self.scraper = NewsScraper()
         self.ai_processor = AIProcessor()
         self.tts_generator = TTSGenerator()
+        self.stream_pipeline = None
         self.is_running = False
         
         # Social media flags
@@ -37,7 +40,7 @@ class AdvancedAutomationScheduler:
         """Enhanced hírgyűjtés futtatása"""
         print(f"\n🕐 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - 🔍 SCRAPING OPERATION")
         try:
-            new_articles = self.scraper.scrape_all_sources()
+            new_articles = self.scraper.scrape_due_sources()  # Adaptív, feedenkénti ütemezés
             
             if new_articles > 0:
                 print(f"✅ Hírgyűjtés: {new_articles} új cikk")
@@ -155,17 +158,14 @@ class AdvancedAutomationScheduler:
         print(f"\n🚀 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - FULL PIPELINE START")
         print("=" * 60)
         
-        # 1. Hírgyűjtés
-        self.run_news_scraping()
-        time.sleep(2)
-        
-        # 2. AI feldolgozás
-        self.run_ai_processing()
-        time.sleep(2)  # Reduced coordination pause
-        
-        # 3. TTS generálás
-        self.run_tts_generation()
-        time.sleep(2)  # Reduced coordination pause
+        # 1-3. Hírgyűjtés → AI → TTS cikkenként folyó szakaszokkal (csak az adaptív ütemező szerint esedékes feedek)
+        try:
+            if self.stream_pipeline is None:
+                self.stream_pipeline = StreamingPipeline(scraper=self.scraper, tts_generator=self.tts_generator)
+            statistics = asyncio.run(self.stream_pipeline.run_once(only_due=True))
+            self.stream_pipeline.print_report(statistics)
+        except Exception as e:
+            print(f"❌ Streaming pipeline hiba: {str(e)}")
         
         # 4. Social media (ha van új tartalom)
         self.run_social_media_publishing()
@@ -220,8 +220,8 @@ class AdvancedAutomationScheduler:
         schedule.every().day.at("18:00").do(self.run_evening_operations)
         
         # === FREQUENT UPDATES ===
-        # Gyors hírgyűjtés minden 30 percben (breaking news)
-        schedule.every(30).minutes.do(self.run_news_scraping)
+        # Adaptív hírgyűjtés: pár percenként csak az esedékes feedek (breaking news)
+        schedule.every(FEED_SCHEDULER_TICK_MINUTES).minutes.do(self.run_news_scraping)
         
         # AI + TTS óránként (friss tartalom)
         schedule.every().hour.at(":15").do(self.run_ai_processing)
@@ -238,7 +238,7 @@ class AdvancedAutomationScheduler:
         print("✅ Production schedules configured:")
         print("   🌅 Morning ops: 06:00 (full + YouTube)")
         print("   🌆 Evening ops: 18:00 (full + YouTube)")
-        print("   🔍 Scraping: every 30 min")
+        print(f"   🔍 Scraping: every {FEED_SCHEDULER_TICK_MINUTES} min (due feeds only, adaptive)")
         print("   🤖 AI/TTS: hourly")
         print("   📱 Social: every 6h")
         print("   🗑️ Cleanup: 03:00")
@@ -0,0 +1,434 @@
+# automation/benchmark.py - PIPELINE BENCHMARK
+# Rögzített cikk- vagy feed-korpusz visszajátszása az orchestratoron át, offline fake LLM-mel: cikk/s, szakasz-percentilisek, DB idő
+
+import sys
+import os
+import gzip
+import json
+import time
+import random
+import asyncio
+import argparse
+import functools
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+# Projekt gyökér könyvtár hozzáadása a sys.path-hoz
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# A benchmark saját adatbázison fut; az URL-t a config / adatbázis modul importja ELŐTT kell beállítani
+BENCHMARK_DATABASE_URL = "sqlite:///./data/benchmark/benchmark.db"
+BENCHMARK_CORPUS_FILE = "data/benchmark/corpus.jsonl.gz"
+BENCHMARK_AUDIO_DIR = "data/benchmark/audio"
+INSERT_BATCH_SIZE = 50
+
+_TITLE_WORDS = ["kormány", "parlament", "jegybank", "infláció", "forint", "árvíz", "választás", "kampány", "tőzsde", "bank",
+                "egészségügy", "kórház", "oktatás", "tanárok", "sztrájk", "energia", "gázár", "villamos", "vasút", "MÁV",
+                "Budapest", "Debrecen", "Szeged", "Brüsszel", "Berlin", "Washington", "Kijev", "NATO", "Apple", "Google",
+                "bajnokság", "válogatott", "Forma-1", "olimpia", "film", "koncert", "fesztivál", "autópiac", "villanyautó", "adó"]
+_TOPICS = ["kormányinfó bejelentés", "jegybanki kamatdöntés", "új iPhone modell", "Forma-1 időmérő", "árvízvédelmi készültség",
+           "uniós költségvetési vita", "energiaár-emelés", "választási kampány", "tőzsdei zuhanás", "mesterséges intelligencia szabályozás"]
+_ENTITIES = ["Budapest", "Brüsszel", "MNB", "Apple", "Orbán Viktor", "Európai Bizottság", "OTP", "NATO", "Verstappen", "Google"]
+
+
+# === KORPUSZ ===
+
+def load_corpus(path: str) -> List[Dict]:
+    """Cikk-rekordok egy gzip-elt JSONL korpuszból (soronként egy cikk)."""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_corpus(records: List[Dict], path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def export_corpus_from_db(path: str, limit: int = 500) -> int:
+    """A jelenlegi (éles) adatbázis legfrissebb cikkeinek rögzítése korpuszként."""
+    from database.db import get_db_session
+    from database.models import Article
+
+    db = get_db_session()
+    try:
+        articles = db.query(Article).order_by(Article.created_at.desc()).limit(limit).all()
+        records = [{
+            "source": article.source,
+            "category": article.category,
+            "original_title": article.original_title or article.title,
+            "original_content": article.original_content or "",
+            "url": article.url,
+            "published_at": article.published_at.isoformat() if article.published_at else None,
+        } for article in articles]
+    finally:
+        db.close()
+    save_corpus(records, path)
+    return len(records)
+
+
+def synthetic_corpus(count: int, duplicate_rate: float = 0.15, seed: int = 42) -> List[Dict]:
+    """Determinisztikus szintetikus korpusz; `duplicate_rate` arányban ugyanaz a sztori más forrásból."""
+    from config.sources import NEWS_SOURCES
+
+    rng = random.Random(seed)
+    sources = [source for source in NEWS_SOURCES if source.get('active', True)]
+    base_time = datetime(2025, 1, 1, 6, 0)
+    records = []
+    for index in range(count):
+        if records and rng.random() < duplicate_rate:
+            title = rng.choice(records)["original_title"]
+        else:
+            words = rng.sample(_TITLE_WORDS, 6)
+            title = " ".join([words[0][:1].upper() + words[0][1:]] + words[1:])
+        source = rng.choice(sources)
+        sentences = [f"{title}. A {rng.choice(_ENTITIES)} szerint a fejlemények {rng.choice(_TOPICS)} ügyében "
+                     f"jelentős hatással lehetnek a következő hetekre." for _ in range(8)]
+        records.append({
+            "source": source['name'],
+            "category": source.get('category', 'general'),
+            "original_title": title,
+            "original_content": " ".join(sentences),
+            "url": f"https://benchmark.invalid/{seed}/{index}",
+            "published_at": (base_time + timedelta(minutes=index)).isoformat(),
+        })
+    return records
+
+
+# === MÉRÉS ===
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Legközelebbi rang szerinti percentilis egy rendezett listából."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+class StageTimer:
+    """Szakaszonkénti időmérés; a `wrap` egy példány metódusát cseréli mért változatra."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self.samples[stage].append(seconds)
+
+    def wrap(self, obj, method_name: str, stage: str):
+        original = getattr(obj, method_name)
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - started)
+
+        setattr(obj, method_name, timed)
+
+    def attach_to_engine(self, engine):
+        """SQL utasításonkénti idő a `db` szakaszba (SQLAlchemy cursor események)."""
+        from sqlalchemy import event
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('benchmark_query_start', []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            started = conn.info['benchmark_query_start'].pop()
+            verb = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else "other"
+            elapsed = time.perf_counter() - started
+            self.record("db", elapsed)
+            self.record(f"db_{verb}", elapsed)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            samples = {stage: sorted(values) for stage, values in self.samples.items()}
+        return {
+            stage: {
+                "count": len(values),
+                "total": sum(values),
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "p99": percentile(values, 0.99),
+                "max": values[-1],
+            }
+            for stage, values in samples.items() if values
+        }
+
+
+# === FUTTATÁS ===
+
+def _insert_corpus(records: List[Dict], timer: StageTimer):
+    """A korpusz beírása batch-enként; a visszaadott cikkek leválasztottak, minden oszlopuk betöltve."""
+    from database.db import get_db_session
+    from database.models import Article
+
+    db = get_db_session()
+    try:
+        article_ids = []
+        for start in range(0, len(records), INSERT_BATCH_SIZE):
+            started = time.perf_counter()
+            batch = []
+            for record in records[start:start + INSERT_BATCH_SIZE]:
+                published_at = record.get("published_at")
+                batch.append(Article(
+                    title=record["original_title"],
+                    original_title=record["original_title"],
+                    original_content=record.get("original_content", ""),
+                    url=record["url"],
+                    source=record["source"],
+                    category=record.get("category") or "general",
+                    published_at=datetime.fromisoformat(published_at) if published_at else None,
+                ))
+            db.add_all(batch)
+            db.commit()
+            timer.record("insert_batch", time.perf_counter() - started)
+            article_ids.extend(article.id for article in batch)
+        articles = db.query(Article).filter(Article.id.in_(article_ids)).all()
+        db.expunge_all()
+        return articles
+    finally:
+        db.close()
+
+
+def _scrape_feed_corpus(corpus_path: str, speed: float, timer: StageTimer):
+    """Feed korpusz visszajátszása a NewsScraper-en át (letöltés → parse → beírás); az új cikkek leválasztva."""
+    from scraper.feed_corpus import configure_feed_transport, get_feed_replay
+    from scraper.news_scraper import NewsScraper
+    from database.db import get_db_session
+    from database.models import Article
+
+    configure_feed_transport("replay", corpus_path, speed)
+    scraper = NewsScraper()
+    timer.wrap(scraper, '_process_feed_content', 'feed_parse')
+    started = time.perf_counter()
+    scraper.scrape_all_sources()
+    timer.record("scrape", time.perf_counter() - started)
+    print(f"📼 Visszajátszás: {get_feed_replay().stats}")
+
+    db = get_db_session()
+    try:
+        articles = db.query(Article).all()
+        db.expunge_all()
+        return articles
+    finally:
+        db.close()
+
+
+def _isolate_orchestrator(orchestrator, use_response_cache: bool):
+    """Hideg, megismételhető futás: üres cache-ek, nulla napi kvóta-használat, az éles számlálók érintetlenek."""
+    from ai.analysis_cache import EditorialAnalysisCache
+
+    processor = orchestrator.processor
+    if not use_response_cache:
+        processor.response_cache = None
+    orchestrator.editorial_ai.analysis_cache = EditorialAnalysisCache(path=None)
+    # A napi kvóta a benchmark (futásonként törölt) adatbázisában él, így nulláról indul
+    processor.daily_premium_count = 0
+    for manager in {id(m): m for m in (processor.journalist_manager, orchestrator.journalist_manager) if m}.values():
+        manager.daily_usage = {}
+        manager.reset_daily_usage_if_needed = lambda: None
+        manager.save_daily_usage = lambda: None
+
+
+def _prepare_tts():
+    """A TTS limiter regisztrálása a rate-skálázás előtt; a benchmark hangfájljai ne keveredjenek az élesekkel."""
+    import ai.tts
+    ai.tts.AUDIO_DIR = BENCHMARK_AUDIO_DIR
+    return ai.tts.TTSGenerator()
+
+
+def _generate_audio(article_ids: List[int], timer: StageTimer) -> int:
+    tts = _prepare_tts()
+    generated = 0
+    for article_id in article_ids:
+        started = time.perf_counter()
+        if tts.generate_audio_for_article(article_id):
+            generated += 1
+        timer.record("tts", time.perf_counter() - started)
+    return generated
+
+
+def run_benchmark(records: Optional[List[Dict]], fake_options: Optional[Dict] = None, use_response_cache: bool = False,
+                  with_tts: bool = False, rate_scale: float = 1.0, feed_corpus: Optional[str] = None,
+                  replay_speed: float = 0.0) -> Dict:
+    """
+    A korpusz végigvitele: beírás → editorial → csatorna-routing → generálás (→ TTS).
+    `feed_corpus` megadásakor a beírás helyett a rögzített feedek scrape-elése a bemenet.
+    """
+    from ai.providers import use_fake_providers
+    fakes = use_fake_providers(**fake_options) if fake_options is not None else {}
+
+    from database.db import engine, create_tables, get_db_session
+    from database.models import Article
+    from ai.v5_orchestrator import ChimeraDualChannelOrchestrator
+
+    create_tables()
+    timer = StageTimer()
+    timer.attach_to_engine(engine)
+
+    orchestrator = ChimeraDualChannelOrchestrator()
+    _isolate_orchestrator(orchestrator, use_response_cache)
+    if with_tts:
+        _prepare_tts()
+    if rate_scale != 1.0:
+        from ai.rate_limiter import scale_rate_limits
+        scale_rate_limits(rate_scale)
+    timer.wrap(orchestrator.editorial_ai, '_analyze_batch', 'editorial_call')
+    timer.wrap(orchestrator.editorial_ai, '_analyze_single', 'editorial_call')
+    timer.wrap(orchestrator.processor, '_generate_with_limits', 'generation')
+
+    run_start = time.perf_counter()
+    ready_at: List[float] = []
+    original_generate = orchestrator.processor._generate_with_limits
+
+    def generate_and_mark(*args, **kwargs):
+        result = original_generate(*args, **kwargs)
+        ready_at.append(time.perf_counter() - run_start)
+        return result
+
+    orchestrator.processor._generate_with_limits = generate_and_mark
+
+    if feed_corpus:
+        articles = _scrape_feed_corpus(feed_corpus, replay_speed, timer)
+    else:
+        articles = _insert_corpus(records, timer)
+    insert_done = time.perf_counter() - run_start
+    asyncio.run(orchestrator.run_full_process(articles))
+    pipeline_done = time.perf_counter() - run_start
+
+    db = get_db_session()
+    try:
+        article_ids = [article.id for article in articles]
+        generated_ids = [row.id for row in db.query(Article.id).filter(
+            Article.id.in_(article_ids), Article.is_processed == True
+        )]
+        linked = db.query(Article.id).filter(Article.id.in_(article_ids), Article.duplicate_of_id.isnot(None)).count()
+    finally:
+        db.close()
+
+    audio_generated = _generate_audio(generated_ids, timer) if with_tts else 0
+    elapsed = time.perf_counter() - run_start
+
+    for seconds in ready_at:
+        timer.record("article_ready", seconds)
+    stages = timer.summary()
+    return {
+        "articles_in": len(articles),
+        "articles_generated": len(generated_ids),
+        "duplicates_removed": orchestrator.performance_metrics.get("duplicates_removed", 0),
+        "linked_duplicates": linked,
+        "audio_generated": audio_generated,
+        "elapsed": elapsed,
+        "insert_seconds": insert_done,
+        "pipeline_seconds": pipeline_done - insert_done,
+        "articles_per_second": len(generated_ids) / (pipeline_done - insert_done) if pipeline_done > insert_done else 0.0,
+        "ingest_per_second": len(articles) / insert_done if insert_done else 0.0,
+        "db_seconds": stages.get("db", {}).get("total", 0.0),
+        "db_statements": stages.get("db", {}).get("count", 0),
+        "stages": stages,
+        "providers": {name: fake.get_statistics() for name, fake in fakes.items()},
+    }
+
+
+def print_report(results: Dict):
+    print("\n" + "=" * 90)
+    print(f"{'⏱️ PIPELINE BENCHMARK':^90}")
+    print("=" * 90)
+    print(f"Korpusz: {results['articles_in']} cikk | generálva: {results['articles_generated']} | "
+          f"duplikátum: {results['duplicates_removed']} kiszűrve, {results['linked_duplicates']} összekötve | "
+          f"audio: {results['audio_generated']}")
+    print(f"Beírás: {results['insert_seconds']:.2f}s ({results['ingest_per_second']:.0f} cikk/s) | "
+          f"pipeline: {results['pipeline_seconds']:.2f}s ({results['articles_per_second']:.2f} cikk/s) | "
+          f"összesen: {results['elapsed']:.2f}s")
+    share = results['db_seconds'] / results['elapsed'] * 100 if results['elapsed'] else 0
+    print(f"DB idő: {results['db_seconds']:.2f}s ({results['db_statements']} utasítás, a futásidő {share:.1f}%-a)")
+
+    print(f"\n| {'Szakasz':<16} | {'db':>6} | {'p50 (ms)':>9} | {'p95 (ms)':>9} | {'p99 (ms)':>9} | {'max (ms)':>9} | {'össz (s)':>8} |")
+    print(f"|{'-'*18}|{'-'*8}|{'-'*11}|{'-'*11}|{'-'*11}|{'-'*11}|{'-'*10}|")
+    for stage, stats in sorted(results['stages'].items()):
+        print(f"| {stage:<16} | {stats['count']:>6} | {stats['p50']*1000:>9.1f} | {stats['p95']*1000:>9.1f} | "
+              f"{stats['p99']*1000:>9.1f} | {stats['max']*1000:>9.1f} | {stats['total']:>8.2f} |")
+
+    for name, stats in results['providers'].items():
+        print(f"Fake {name}: {stats['calls']} hívás, {stats['errors']} injektált hiba, átlag {stats['avg_latency']*1000:.0f}ms")
+    print("=" * 90)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HírMagnet pipeline benchmark (offline fake LLM)")
+    parser.add_argument('--corpus', default=BENCHMARK_CORPUS_FILE, help="Gzip-elt JSONL cikk-korpusz")
+    parser.add_argument('--export', type=int, metavar='N', help="Az éles adatbázis utolsó N cikkének rögzítése korpuszként, majd kilépés")
+    parser.add_argument('--feed-corpus', metavar='FILE', help="Rögzített feed korpusz (scraper/feed_corpus.py) scrape-elése a cikk-korpusz helyett")
+    parser.add_argument('--replay-speed', type=float, default=0.0, help="Feed visszajátszási sebesség (0 = késleltetés nélkül)")
+    parser.add_argument('--synthetic', type=int, metavar='N', help="N cikkes szintetikus korpusz a rögzített helyett")
+    parser.add_argument('--limit', type=int, help="A korpusz első N cikke")
+    parser.add_argument('--database', default=BENCHMARK_DATABASE_URL, help="A benchmark adatbázisa (minden futás előtt törlődik)")
+    parser.add_argument('--latency-ms', type=float, help="Fake LLM késleltetés")
+    parser.add_argument('--jitter-ms', type=float, help="Fake LLM késleltetés szórása")
+    parser.add_argument('--error-rate', type=float, help="Injektált 429 / 503 hibák aránya")
+    parser.add_argument('--seed', type=int, help="Fake LLM és szintetikus korpusz seed")
+    parser.add_argument('--live', action='store_true', help="Élő szolgáltatók a fake helyett (költséges!)")
+    parser.add_argument('--rate-scale', type=float, default=1.0, help="A rate limit plafonok szorzója (1 = éles keretek)")
+    parser.add_argument('--warm-cache', action='store_true', help="LLM válasz-cache bekapcsolva")
+    parser.add_argument('--tts', action='store_true', help="TTS szakasz is (hangfájlok: data/benchmark/audio)")
+    parser.add_argument('--json', metavar='FILE', help="Eredmények mentése JSON-ba")
+    args = parser.parse_args()
+
+    if args.export:
+        count = export_corpus_from_db(args.corpus, args.export)
+        print(f"💾 {count} cikk rögzítve: {args.corpus}")
+        return
+
+    # Az első config import előtt: a settings és az adatbázis modul már a benchmark adatbázisát látja
+    os.environ["HIRMAGNET_DATABASE_URL"] = args.database
+    from config.settings import DEFAULT_DATABASE_URL
+    if args.database == DEFAULT_DATABASE_URL:
+        print("❌ A benchmark nem futhat az éles adatbázison")
+        return
+    if args.database.startswith("sqlite:///"):
+        db_path = args.database[len("sqlite:///"):]
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+    if args.feed_corpus:
+        records = None
+    elif args.synthetic:
+        records = synthetic_corpus(args.synthetic, seed=args.seed if args.seed is not None else 42)
+    elif os.path.exists(args.corpus):
+        records = load_corpus(args.corpus)
+    else:
+        print(f"❌ Nincs korpusz: {args.corpus} (rögzítés: --export N, vagy --synthetic N)")
+        return
+    if args.limit and records:
+        records = records[:args.limit]
+
+    fake_options = None
+    if not args.live:
+        fake_options = {key: value for key, value in {
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "error_rate": args.error_rate,
+            "seed": args.seed,
+        }.items() if value is not None}
+
+    results = run_benchmark(records, fake_options, use_response_cache=args.warm_cache, with_tts=args.tts,
+                            rate_scale=args.rate_scale, feed_corpus=args.feed_corpus, replay_speed=args.replay_speed)
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 import schedule
 import time
+import asyncio
+import threading
 import sys
 import os
 from datetime import datetime
@@ -11,19 +13,22 @@ from scraper.news_scraper import NewsScraper
 from ai.processor import AIProcessor
 from ai.tts import TTSGenerator
 from automation.cleanup import cleanup_old_data
+from automation.stream_pipeline import StreamingPipeline
+from config.settings import FEED_SCHEDULER_TICK_MINUTES
 
 class AutomationScheduler:
     def __init__(self):
         self.scraper = NewsScraper()
         self.ai_processor = AIProcessor()
         self.tts_generator = TTSGenerator()
+        self.stream_pipeline = None
         self.is_running = False
         
     def run_news_scraping(self):
         """Hírgyűjtés futtatása"""
         print(f"\n🕐 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Hírgyűjtés indítása")
         try:
-            new_articles = self.scraper.scrape_all_sources()
+            new_articles = self.scraper.scrape_due_sources()  # Adaptív, feedenkénti ütemezés
             print(f"✅ Hírgyűjtés befejezve: {new_articles} új cikk")
         except Exception as e:
             print(f"❌ Hírgyűjtési hiba: {str(e)}")
@@ -55,22 +60,49 @@ class AutomationScheduler:
         except Exception as e:
             print(f"❌ Cleanup hiba: {str(e)}")
     
+    def _get_stream_pipeline(self):
+        if self.stream_pipeline is None:
+            self.stream_pipeline = StreamingPipeline(scraper=self.scraper, tts_generator=self.tts_generator)
+        return self.stream_pipeline
+    
     def run_full_pipeline(self):
-        """Teljes pipeline futtatása (scraping -> AI -> TTS)"""
+        """Teljes pipeline futtatása (scraping -> AI -> TTS), cikkenként folyó szakaszokkal"""
         print(f"\n🚀 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Teljes pipeline indítása")
         
-        # 1. Hírgyűjtés
-        self.run_news_scraping()
-        time.sleep(2)  # 30 sec szünet
+        # A scrape közben érkező cikkek már elemzés / generálás / TTS alatt vannak.
+        # Csak az esedékes feedek: az óránkénti futás sem írhatja felül az adaptív lekérdezési időközöket
+        try:
+            pipeline = self._get_stream_pipeline()
+            statistics = asyncio.run(pipeline.run_once(only_due=True))
+            pipeline.print_report(statistics)
+        except Exception as e:
+            print(f"❌ Pipeline hiba: {str(e)}")
+            return
         
-        # 2. AI feldolgozás
-        self.run_ai_processing()
-        time.sleep(2)  # Reduced coordination pause
+        print("🎉 Teljes pipeline befejezve!")
+    
+    def start_streaming(self):
+        """Folyamatos streaming üzem: az esedékes feedek cikkei azonnal végigmennek a láncon"""
+        pipeline = self._get_stream_pipeline()
         
-        # 3. TTS generálás
-        self.run_tts_generation()
+        # A napi cleanup külön szálon, a schedule-lal marad
+        schedule.every().day.at("03:00").do(self.run_cleanup)
+        self.is_running = True
         
-        print("🎉 Teljes pipeline befejezve!")
+        def run_schedule():
+            while self.is_running:
+                schedule.run_pending()
+                time.sleep(60)
+        
+        threading.Thread(target=run_schedule, daemon=True).start()
+        print("📡 HírMagnet streaming pipeline elindítva! Press Ctrl+C to stop...")
+        try:
+            statistics = asyncio.run(pipeline.run_forever())
+            pipeline.print_report(statistics)
+        except KeyboardInterrupt:
+            print("\n\n🛑 Streaming pipeline leállítása...")
+        finally:
+            self.is_running = False
     
     def setup_schedules(self):
         """Ütemezések beállítása"""
@@ -80,8 +112,8 @@ class AutomationScheduler:
         # Teljes pipeline óránként (fő folyamat)
         schedule.every().hour.at(":05").do(self.run_full_pipeline)
         
-        # Gyors hírgyűjtés 30 percenként (breaking news-hez)
-        schedule.every(30).minutes.do(self.run_news_scraping)
+        # Adaptív hírgyűjtés: pár percenként csak az esedékes feedek (breaking news-hez)
+        schedule.every(FEED_SCHEDULER_TICK_MINUTES).minutes.do(self.run_news_scraping)
         
         # AI feldolgozás 20 percenként (ha van feldolgozatlan)
         schedule.every(20).minutes.do(self.run_ai_processing)
@@ -103,7 +135,7 @@ class AutomationScheduler:
         
         print("📅 Ütemezések beállítva:")
         print("   - Teljes pipeline: óránként")
-        print("   - Hírgyűjtés: 30 percenként")
+        print(f"   - Hírgyűjtés: {FEED_SCHEDULER_TICK_MINUTES} percenként az esedékes feedek (adaptív)")
         print("   - AI feldolgozás: 20 percenként") 
         print("   - TTS generálás: 15 percenként")
         print("   - Cleanup: naponta hajnali 3-kor")
@@ -140,12 +172,17 @@ class AutomationScheduler:
     def stop(self):
         """Scheduler leállítása"""
         self.is_running = False
+        if self.stream_pipeline:
+            self.stream_pipeline.stop()
         print("🛑 Scheduler leállítva")
 
 def main():
     """Fő belépési pont"""
     scheduler = AutomationScheduler()
-    scheduler.start()
+    if '--streaming' in sys.argv:
+        scheduler.start_streaming()
+    else:
+        scheduler.start()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
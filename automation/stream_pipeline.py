@@ -0,0 +1,384 @@
+# automation/stream_pipeline.py - STREAMING PIPELINE
+# Scrape → editorial → generálás → TTS cikkenként, korlátos sorokkal összekötött worker poolokon
+
+import sys
+import os
+import time
+import asyncio
+import traceback
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Set
+
+# Projekt gyökér könyvtár hozzáadása a sys.path-hoz
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import (
+    FEED_SCHEDULER_TICK_MINUTES,
+    STREAM_QUEUE_SIZE,
+    STREAM_EDITORIAL_MAX_BATCH,
+    STREAM_EDITORIAL_MAX_WAIT_SECONDS,
+    STREAM_TTS_WORKERS,
+    STREAM_BACKLOG_HOURS,
+    STREAM_MAX_GENERATION_ATTEMPTS,
+)
+from database.db import get_db_session
+from database.models import Article
+from ai.circuit_breaker import CircuitOpenError
+
+# Sor-lezáró jel: a szakasz workerei ennek hatására állnak le
+_STOP = object()
+
+
+class StreamingPipeline:
+    """
+    Sorokkal összekötött, folyamatos feldolgozási lánc.
+
+    - Scrape: forrásonként a commit után az új cikk ID-k azonnal az editorial sorba kerülnek.
+    - Editorial: kis batch-ek (legfeljebb `editorial_max_batch` cikk vagy `editorial_max_wait`
+      másodperc), így a batch prompt és a duplikátum-szűrés is megmarad.
+    - Generálás: csatornánkénti worker pool; a modell-slotokat és a rate limitet a processor adja.
+    - TTS: külön worker pool a sikeresen legenerált cikkekre.
+    - Újrafelvétel: minden kör (és `run_forever` minden tickje) elején a friss, feldolgozatlan, éppen
+      nem futó cikkek (halasztott / sikertelen generálás) újra az editorial sorba kerülnek;
+      `max_generation_attempts` sikertelen generálás után egy cikk kimarad.
+
+    Minden sor korlátos (`queue_size`): ha egy lassabb szakasz lemarad, az előtte lévő
+    szakasz (végső soron a scraper szál) a `put`-on várakozik - ez a back-pressure.
+    """
+
+    def __init__(self, scraper=None, orchestrator=None, tts_generator=None,
+                 queue_size: int = STREAM_QUEUE_SIZE,
+                 editorial_max_batch: int = STREAM_EDITORIAL_MAX_BATCH,
+                 editorial_max_wait: float = STREAM_EDITORIAL_MAX_WAIT_SECONDS,
+                 tts_workers: int = STREAM_TTS_WORKERS,
+                 backlog_hours: float = STREAM_BACKLOG_HOURS,
+                 max_generation_attempts: int = STREAM_MAX_GENERATION_ATTEMPTS,
+                 enable_tts: bool = True):
+        if scraper is None:
+            from scraper.news_scraper import NewsScraper
+            scraper = NewsScraper()
+        if orchestrator is None:
+            from ai.v5_orchestrator import ChimeraDualChannelOrchestrator
+            orchestrator = ChimeraDualChannelOrchestrator()
+        if tts_generator is None and enable_tts:
+            from ai.tts import TTSGenerator
+            tts_generator = TTSGenerator()
+
+        self.scraper = scraper
+        self.orchestrator = orchestrator
+        self.processor = orchestrator.processor
+        self.editorial_ai = orchestrator.editorial_ai
+        self.tts_generator = tts_generator if enable_tts else None
+
+        self.queue_size = queue_size
+        self.editorial_max_batch = max(1, editorial_max_batch)
+        self.editorial_max_wait = editorial_max_wait
+        self.generation_workers = {
+            'blitz': self.processor.channel_worker_count('blitz'),
+            'strategic': self.processor.channel_worker_count('strategic'),
+        }
+        self.tts_workers = max(1, tts_workers) if self.tts_generator else 0
+        self.backlog_hours = backlog_hours
+        self.max_generation_attempts = max(1, max_generation_attempts)
+
+        # Saját szálkészlet: az alapértelmezett executor mérete a CPU-k számától függ
+        self._executor = ThreadPoolExecutor(
+            max_workers=sum(self.generation_workers.values()) + self.tts_workers + 2,
+            thread_name_prefix="stream"
+        )
+        # A láncban éppen futó cikkek (ID → sorba állítás ideje); kikerül generálás, halasztás, hiba vagy kiszűrés után
+        self._enqueued_at: Dict[int, float] = {}
+        self._title_ready: Dict[int, float] = {}
+        # Sikertelen generálások cikkenként - körökön át megmarad
+        self._generation_failures: Dict[int, int] = defaultdict(int)
+        self._reset_statistics()
+        self.is_running = False
+
+        # Streaming generálásnál a cím már a törzs előtt megérkezik - ezt mérjük
+        self.processor.field_listeners.append(self._on_generated_field)
+
+    def _reset_statistics(self):
+        self.stats = defaultdict(int)
+        self.latencies: List[float] = []
+        self.title_latencies: List[float] = []
+
+    def _release(self, article_id: int):
+        """A cikk kikerül a futók közül (a következő kör újrafelvétele már láthatja)."""
+        self._enqueued_at.pop(article_id, None)
+        self._title_ready.pop(article_id, None)
+
+    # === SZAKASZOK ===
+
+    def _on_generated_field(self, article: Article, field: str, value):
+        """Processor mező-figyelő (worker szálon): a generált cím megérkezésének ideje."""
+        if field != 'title' or article.id in self._title_ready:
+            return
+        enqueued_at = self._enqueued_at.get(article.id)
+        if enqueued_at is not None:
+            self._title_ready[article.id] = time.monotonic()
+            self.title_latencies.append(self._title_ready[article.id] - enqueued_at)
+
+    async def _run_blocking(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def _scrape(self, only_due: bool):
+        """Egy scrape kör; az új ID-k forrásonként, blokkoló put-tal mennek az editorial sorba."""
+        loop = asyncio.get_running_loop()
+
+        def on_new_articles(article_ids: List[int]):
+            for article_id in article_ids:
+                self._enqueued_at[article_id] = time.monotonic()
+                asyncio.run_coroutine_threadsafe(self.editorial_queue.put(article_id), loop).result()
+            self.stats['scraped'] += len(article_ids)
+
+        try:
+            if only_due:
+                await self._run_blocking(self.scraper.scrape_due_sources, on_new_articles)
+            else:
+                await self._run_blocking(lambda: self.scraper.scrape_all_sources(on_new_articles=on_new_articles))
+        except Exception as e:
+            print(f"❌ Stream scrape hiba: {type(e).__name__}: {str(e)}")
+
+    def _load_backlog_ids(self, exclude_ids: Set[int]) -> List[int]:
+        """Friss, feldolgozatlan, nem duplikátum cikkek, amelyek nem futnak és nem merítették ki a próbálkozásaikat."""
+        exhausted = {article_id for article_id, failures in self._generation_failures.items()
+                     if failures >= self.max_generation_attempts}
+        cutoff_time = datetime.now() - timedelta(hours=self.backlog_hours)
+        db = get_db_session()
+        try:
+            rows = db.query(Article.id).filter(
+                Article.is_processed == False,
+                Article.duplicate_of_id.is_(None),
+                Article.created_at >= cutoff_time
+            ).order_by(Article.created_at.desc()).limit(self.queue_size + len(exclude_ids) + len(exhausted)).all()
+        finally:
+            db.close()
+        skipped = exclude_ids | exhausted
+        return [article_id for article_id, in rows if article_id not in skipped][:self.queue_size]
+
+    async def _enqueue_backlog(self):
+        """Halasztott / sikertelen cikkek újra sorba állítása az editorial szakasz elé."""
+        try:
+            article_ids = await self._run_blocking(self._load_backlog_ids, set(self._enqueued_at))
+        except Exception as e:
+            print(f"❌ Stream újrafelvételi hiba: {type(e).__name__}: {str(e)}")
+            return
+        for article_id in article_ids:
+            self._enqueued_at[article_id] = time.monotonic()
+            await self.editorial_queue.put(article_id)
+        self.stats['requeued'] += len(article_ids)
+
+    async def _collect_editorial_batch(self):
+        """Az első cikkre korlát nélkül vár, utána legfeljebb `editorial_max_wait` másodpercig gyűjt."""
+        first = await self.editorial_queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.editorial_max_wait
+        while len(batch) < self.editorial_max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.editorial_queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    @staticmethod
+    def _load_articles(article_ids: List[int]) -> List[Article]:
+        db = get_db_session()
+        try:
+            return db.query(Article).filter(
+                Article.id.in_(article_ids),
+                Article.is_processed == False,
+                Article.duplicate_of_id.is_(None)
+            ).all()
+        finally:
+            db.close()
+
+    async def _editorial_stage(self):
+        stopped = False
+        while not stopped:
+            article_ids, stopped = await self._collect_editorial_batch()
+            if not article_ids:
+                continue
+            try:
+                articles = await self._run_blocking(self._load_articles, article_ids)
+                if not articles:
+                    for article_id in article_ids:
+                        self._release(article_id)
+                    continue
+                results = await self.editorial_ai.process_articles_editorial_async(articles)
+                kept = results.get("kept", [])
+                self.stats['analyzed'] += len(articles)
+                self.stats['duplicates'] += len(results.get("duplicates", []))
+                kept_ids = {article.id for article in kept}
+                for article_id in article_ids:
+                    if article_id not in kept_ids:
+                        self._release(article_id)
+                channels = self.orchestrator.categorize_articles_by_channel(kept)
+                for channel in ('strategic', 'blitz'):
+                    for article in channels.get(channel, []):
+                        await self.generation_queues[channel].put(article)
+            except Exception as e:
+                for article_id in article_ids:
+                    self._release(article_id)
+                self.stats['editorial_errors'] += 1
+                print(f"❌ Stream editorial hiba: {type(e).__name__}: {str(e)}")
+                print(f"   Traceback: \n{traceback.format_exc()}")
+
+        for channel, worker_count in self.generation_workers.items():
+            for _ in range(worker_count):
+                await self.generation_queues[channel].put(_STOP)
+
+    async def _generation_worker(self, channel: str):
+        queue = self.generation_queues[channel]
+        while True:
+            article = await queue.get()
+            if article is _STOP:
+                return
+            try:
+                generated = await self._run_blocking(self.processor.generate_and_save_article, article, channel)
+            except CircuitOpenError as e:
+                # A cikk feldolgozatlan marad, a következő kör / tick újrafelvétele visszahozza (nem számít próbálkozásnak)
+                self.stats['deferred'] += 1
+                self._release(article.id)
+                print(f"⏸️ Stream generálás halasztva (ID: {article.id}): {str(e)}")
+                continue
+            except Exception as e:
+                print(f"❌ Stream generálási hiba (ID: {article.id}): {type(e).__name__}: {str(e)}")
+                generated = False
+            if not generated:
+                self.stats['generation_errors'] += 1
+                self._generation_failures[article.id] += 1
+                self._release(article.id)
+                continue
+
+            self.stats[f'{channel}_generated'] += 1
+            self._generation_failures.pop(article.id, None)
+            enqueued_at = self._enqueued_at.get(article.id)
+            self._release(article.id)
+            if enqueued_at is not None:
+                self.latencies.append(time.monotonic() - enqueued_at)
+            print(f"   ✅ Élesítve ({channel}): {(article.original_title or '')[:50]}...")
+            if self.tts_generator:
+                await self.tts_queue.put(article.id)
+
+    async def _tts_worker(self):
+        while True:
+            article_id = await self.tts_queue.get()
+            if article_id is _STOP:
+                return
+            if await self._run_blocking(self.tts_generator.generate_audio_for_article, article_id):
+                self.stats['audio_generated'] += 1
+
+    # === VEZÉRLÉS ===
+
+    def _create_queues(self):
+        self.editorial_queue = asyncio.Queue(maxsize=self.queue_size)
+        self.generation_queues = {channel: asyncio.Queue(maxsize=self.queue_size) for channel in self.generation_workers}
+        self.tts_queue = asyncio.Queue(maxsize=self.queue_size)
+
+    async def _run(self, producer) -> Dict:
+        """A szakaszok elindítása, a termelő lefutása után a sorok kiürítése és leállítás."""
+        self._create_queues()
+        self._reset_statistics()
+        start_time = time.time()
+
+        editorial_task = asyncio.create_task(self._editorial_stage())
+        generation_tasks = [
+            asyncio.create_task(self._generation_worker(channel))
+            for channel, worker_count in self.generation_workers.items()
+            for _ in range(worker_count)
+        ]
+        tts_tasks = [asyncio.create_task(self._tts_worker()) for _ in range(self.tts_workers)]
+
+        try:
+            await producer()
+        finally:
+            await self.editorial_queue.put(_STOP)
+            await editorial_task
+            await asyncio.gather(*generation_tasks)
+            for _ in tts_tasks:
+                await self.tts_queue.put(_STOP)
+            await asyncio.gather(*tts_tasks)
+            if self.processor.journalist_manager:
+                self.processor.journalist_manager.save_daily_usage()
+
+        return self.get_statistics(time.time() - start_time)
+
+    async def run_once(self, only_due: bool = False) -> Dict:
+        """Korábbi halasztott / sikertelen cikkek és egy scrape kör végigvitele a teljes láncon."""
+        async def producer():
+            await self._enqueue_backlog()
+            await self._scrape(only_due)
+
+        return await self._run(producer)
+
+    async def run_forever(self, tick_seconds: float = FEED_SCHEDULER_TICK_MINUTES * 60) -> Dict:
+        """Folyamatos üzem: `tick_seconds`-onként az esedékes feedek, a lánc közben végig fut."""
+        self.is_running = True
+
+        async def producer():
+            while self.is_running:
+                tick_start = time.monotonic()
+                await self._enqueue_backlog()
+                await self._scrape(only_due=True)
+                await asyncio.sleep(max(0.0, tick_seconds - (time.monotonic() - tick_start)))
+
+        return await self._run(producer)
+
+    def stop(self):
+        self.is_running = False
+
+    def get_statistics(self, elapsed: float = 0.0) -> Dict:
+        latencies = sorted(self.latencies)
+        return {
+            **self.stats,
+            "elapsed": elapsed,
+            "avg_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+            "max_latency": latencies[-1] if latencies else 0.0,
+            "avg_title_latency": sum(self.title_latencies) / len(self.title_latencies) if self.title_latencies else 0.0,
+        }
+
+    def print_report(self, statistics: Dict):
+        print("\n📡 STREAMING PIPELINE REPORT")
+        print(f"   Új cikk: {statistics.get('scraped', 0)} | újrafelvett: {statistics.get('requeued', 0)} | "
+              f"elemezve: {statistics.get('analyzed', 0)} | duplikátum: {statistics.get('duplicates', 0)}")
+        print(f"   Élesítve: blitz {statistics.get('blitz_generated', 0)}, strategic {statistics.get('strategic_generated', 0)} | "
+              f"hiba: {statistics.get('generation_errors', 0)} | halasztva: {statistics.get('deferred', 0)} | audio: {statistics.get('audio_generated', 0)}")
+        print(f"   Scrape → élő cikk: átlag {statistics['avg_latency']:.1f}s, max {statistics['max_latency']:.1f}s "
+              f"({statistics['elapsed']:.1f}s összesen)")
+        if statistics.get('avg_title_latency'):
+            print(f"   Scrape → generált cím (streaming): átlag {statistics['avg_title_latency']:.1f}s")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="HírMagnet streaming pipeline")
+    parser.add_argument('--once', action='store_true', help="Egy scrape kör, majd a sorok kiürítése")
+    parser.add_argument('--all-sources', action='store_true', help="Minden aktív forrás (nem csak az esedékesek)")
+    parser.add_argument('--no-tts', action='store_true', help="TTS szakasz kikapcsolása")
+    args = parser.parse_args()
+
+    pipeline = StreamingPipeline(enable_tts=not args.no_tts)
+    try:
+        if args.once:
+            statistics = asyncio.run(pipeline.run_once(only_due=not args.all_sources))
+        else:
+            statistics = asyncio.run(pipeline.run_forever())
+    except KeyboardInterrupt:
+        print("\n🛑 Streaming pipeline leállítva")
+        return
+    pipeline.print_report(statistics)
+
+
+if __name__ == "__main__":
+    main()
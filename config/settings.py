@@ -7,7 +7,21 @@ load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "your-openai-api-key-here")
 
 # Database
-DATABASE_URL = "sqlite:///./data/hirmagnet.db"
+DEFAULT_DATABASE_URL = "sqlite:///./data/hirmagnet.db"
+DATABASE_URL = os.getenv("HIRMAGNET_DATABASE_URL", DEFAULT_DATABASE_URL)  # Benchmark külön adatbázison fut
+# SQLite kapcsolatkezelés (database/db.py): WAL, külön író / olvasó pool, PRAGMA-k kapcsolatonként egyszer
+SQLITE_WRITER_POOL_SIZE = 2        # Író kapcsolatok (scraper, generálás, admin) - SQLite-ban úgyis egy író fut egyszerre
+SQLITE_WRITER_MAX_OVERFLOW = 4
+SQLITE_READER_POOL_SIZE = 8        # Olvasó kapcsolatok (API) - WAL mellett nem várnak az íróra
+SQLITE_READER_MAX_OVERFLOW = 8
+SQLITE_POOL_TIMEOUT = 30           # Várakozás szabad kapcsolatra (mp)
+SQLITE_BUSY_TIMEOUT_MS = 15000     # Zárolt adatbázisnál ennyit vár a SQLite hiba előtt
+SQLITE_CACHE_SIZE_KB = 65536       # Page cache kapcsolatonként (64 MB)
+SQLITE_MMAP_SIZE = 268435456       # Memóriába képzett olvasás (256 MB)
+# Megtekintés / lejátszás számlálók write-behind puffere (database/engagement_buffer.py)
+ENGAGEMENT_FLUSH_SECONDS = 5                        # Ennyi időnként egy tranzakcióban íródnak ki
+ENGAGEMENT_FLUSH_MAX_PENDING = 500                  # Ennyi függő cikknél azonnali kiírás
+ENGAGEMENT_LOG_FILE = "data/engagement_pending.log" # Append napló: összeomlás után a ki nem írt lépések visszatöltődnek
 
 # Server settings
 HOST = "0.0.0.0"
@@ -19,10 +33,103 @@ MAX_SUMMARY_LENGTH = 1500  # JAVÍTOTT - hosszú cikkekhez
 TTS_VOICE = "alloy"  # OpenAI TTS hangok: alloy, echo, fable, onyx, nova, shimmer
 TTS_SPEED = 1.0
 
+# Tartalom-generálás párhuzamossága (modellenkénti korlát + közös rate limit)
+GPT4O_MAX_CONCURRENCY = 3              # Egyszerre futó GPT-4o generálások
+GEMINI_GENERATION_MAX_CONCURRENCY = 6  # Egyszerre futó Gemini generálások
+GPT4O_RATE_LIMIT_PER_MINUTE = 30
+# Csatornánkénti független párhuzamossági keret (a rate limit közös marad)
+BLITZ_GPT4O_CONCURRENCY = 1
+BLITZ_GEMINI_CONCURRENCY = 4
+STRATEGIC_GPT4O_CONCURRENCY = 3
+STRATEGIC_GEMINI_CONCURRENCY = 2
+
+# Közös rate limit alrendszer (ai/rate_limiter.py): 429 / 503 esetén adaptív lassítás + backoff
+RATE_LIMIT_MAX_RETRIES = 4             # Újrapróbálások száma 429 / 503 után
+RATE_LIMIT_BACKOFF_BASE_SECONDS = 1.0  # Exponenciális backoff alapja (teljes jitterrel)
+RATE_LIMIT_BACKOFF_MAX_SECONDS = 60.0
+RATE_LIMIT_MIN_RATE_FRACTION = 0.1     # Ennyi a beállított ütemnek a legkisebb lassított értéke
+RATE_LIMIT_RECOVERY_SUCCESSES = 10     # Ennyi sikeres hívásonként gyorsul vissza az ütem
+GPT4O_TOKENS_PER_MINUTE = 30000        # Token keret percenként; a válasz x-ratelimit-limit-tokens fejléce a valós tier-re állítja
+RATE_LIMIT_EXPECTED_OUTPUT_TOKENS = 800  # Várható kimenet hívásonként, amíg nincs mért átlag (a max_tokens csak felső korlát)
+GPT35_RATE_LIMIT_PER_MINUTE = 60       # Végső fallback modell
+GEMINI_TOKENS_PER_MINUTE = 1000000
+# A Gemini modell EGY közös kerete (elemzés + generálás + API asszisztens: ugyanaz a kulcs és modell);
+# a hívók közti megosztást a saját párhuzamossági korlátjuk (EDITORIAL_MAX_CONCURRENCY, ...) adja
+GEMINI_RATE_LIMIT_PER_MINUTE = 60
+GEMINI_RATE_LIMIT_BURST = 6            # Ennyi hívás mehet ki azonnal pihenő után
+TTS_RATE_LIMIT_PER_MINUTE = 50         # OpenAI tts-1 kérés / perc
+
+# Szolgáltatónkénti circuit breaker (ai/circuit_breaker.py) és hívás-timeout
+LLM_REQUEST_TIMEOUT_SECONDS = 60       # Egy LLM hívás felső időkorlátja
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5  # Ennyi egymást követő hiba után nyílik az áramkör
+CIRCUIT_BREAKER_RECOVERY_SECONDS = 60  # Ennyi után mehet próbahívás (félig nyitott állapot)
+CIRCUIT_BREAKER_HALF_OPEN_PROBES = 1   # Egyszerre futó próbahívások félig nyitott állapotban
+
+# LLM válasz-cache a generáló hívásokra (ai/response_cache.py)
+LLM_RESPONSE_CACHE_ENABLED = True
+LLM_RESPONSE_CACHE_FILE = "data/llm_response_cache.db"  # Külön SQLite fájl
+LLM_RESPONSE_CACHE_MAX_ENTRIES = 5000
+LLM_RESPONSE_CACHE_MAX_MB = 200
+LLM_RESPONSE_CACHE_MAX_AGE_DAYS = 7
+
+# LLM / TTS szolgáltatók (ai/providers.py): "live" = OpenAI + Gemini, "fake" = determinisztikus offline szolgáltató
+LLM_PROVIDER_MODE = os.getenv("HIRMAGNET_LLM_PROVIDER", "live")
+FAKE_LLM_LATENCY_MS = 800              # Fake hívás átlagos késleltetése
+FAKE_LLM_JITTER_MS = 400               # ± szórás
+FAKE_LLM_ERROR_RATE = 0.0              # Injektált 429 / 503 hibák aránya
+FAKE_LLM_SEED = 42
+FAKE_LLM_BODY_WORDS = 450              # A generált cikktörzs hossza szóban
+
+# Streaming generálás: a JSON mezők (title, keywords, ...) már a válasz érkezése közben értelmeződnek (ai/stream_json.py)
+LLM_STREAMING_ENABLED = True
+
+# Editorial AI batch elemzés (több cikk egy Gemini hívásban)
+EDITORIAL_BATCH_ENABLED = True
+EDITORIAL_BATCH_MAX_ARTICLES = 10      # Cikkek száma egy batch promptban (felső korlát)
+EDITORIAL_BATCH_TOKEN_BUDGET = 12000   # Becsült input token keret egy batch promptra
+EDITORIAL_BATCH_CONTENT_CHARS = 1500   # Cikkenkénti tartalom-részlet hossza batch módban
+EDITORIAL_MAX_CONCURRENCY = 4          # Egyszerre futó elemző hívások száma
+EDITORIAL_ANALYSIS_CACHE_FILE = "data/editorial_analysis_cache.json"  # Tartalom-hash → elemzés
+EDITORIAL_ANALYSIS_CACHE_MAX_ENTRIES = 20000
+EDITORIAL_ANALYSIS_CACHE_MAX_AGE_DAYS = 14
+EDITORIAL_ANALYSIS_CACHE_SAVE_INTERVAL_SECONDS = 60  # Mentések közti minimális idő (kilépéskor mindig ment)
+# Phase 2 duplikátum-szűrés: "lsh" (MinHash) vagy "matrix" (NumPy). A mátrix jelölt-margója (CANDIDATE_MARGIN)
+# heurisztika, nem bizonyított korlát: csak akkor legyen alapértelmezett, ha az ai/dedup_index.py regressziós
+# futása a mátrix és a pontos döntések között azonos eredményt mutat
+EDITORIAL_DEDUP_ENGINE = "lsh"
+CROSS_RUN_DEDUP_ENABLED = True         # Új cikkek összevetése a korábban legenerált sztorikkal
+CROSS_RUN_DEDUP_WINDOW_HOURS = 48      # Gördülő ablak a korábbi sztorikra
+
 # Scraping settings
 SCRAPE_INTERVAL_MINUTES = 60
 MAX_ARTICLES_PER_SOURCE = 10
 REQUEST_TIMEOUT = 10
+SCRAPE_MAX_CONCURRENCY = 20       # Egyszerre futó feed letöltések száma
+SCRAPE_PER_HOST_CONCURRENCY = 2   # Egy host felé egyszerre futó kérések száma
+FEED_VALIDATOR_FILE = "data/feed_validators.json"  # ETag / Last-Modified / body hash feedenként
+DATA_COLLECTOR_VALIDATOR_FILE = "data/data_collector_validators.json"  # A DataCollector saját validátorai (a scraperétől független)
+DATA_COLLECTOR_STATUS_FILE = "data/data_collector_rss_status.json"    # Utolsó ismert feed státusz (304 / változatlan body esetén ezt adjuk)
+SCRAPER_SEEN_URL_CACHE_SIZE = 20000  # Memóriában tartott, már látott URL hash-ek száma
+
+# Adaptív feed ütemezés (feedenkénti lekérdezési időköz)
+FEED_SCHEDULE_FILE = "data/feed_schedule.json"
+FEED_POLL_MIN_MINUTES = 10            # Leggyakoribb lekérdezés normál forrásnál
+FEED_POLL_FAST_LANE_MIN_MINUTES = 3   # Leggyakoribb lekérdezés PREMIUM_FAST_LANE_SOURCES esetén
+FEED_POLL_MAX_MINUTES = 240           # Legritkább lekérdezés (ritkán frissülő feedek)
+FEED_SCHEDULER_TICK_MINUTES = 2       # Milyen sűrűn nézzük meg, melyik feed esedékes
+
+# Feed korpusz (scraper/feed_corpus.py): "live" = hálózat, "record" = hálózat + rögzítés, "replay" = offline visszajátszás
+FEED_TRANSPORT_MODE = os.getenv("HIRMAGNET_FEED_MODE", "live")
+FEED_CORPUS_FILE = os.getenv("HIRMAGNET_FEED_CORPUS", "data/feed_corpus/corpus.jsonl.gz")
+FEED_REPLAY_SPEED = float(os.getenv("HIRMAGNET_FEED_REPLAY_SPEED", "0"))  # 0 = késleltetés nélkül, 1 = valós idő, 60 = 60x gyorsítva
+
+# Streaming pipeline (scrape → editorial → generálás → TTS, cikkenként, sorokkal összekötve)
+STREAM_QUEUE_SIZE = 200                # Szakaszok közötti sor mérete (tele sor = back-pressure)
+STREAM_EDITORIAL_MAX_BATCH = 20        # Ennyi cikket gyűjt össze egy editorial kör
+STREAM_EDITORIAL_MAX_WAIT_SECONDS = 5  # Ennyit vár legfeljebb a batch feltöltésére
+STREAM_TTS_WORKERS = 2                 # Egyszerre futó TTS generálások
+STREAM_BACKLOG_HOURS = 2               # Körönként újra felvett, feldolgozatlan (halasztott / hibás) cikkek korhatára
+STREAM_MAX_GENERATION_ATTEMPTS = 3     # Ennyi sikertelen generálás után a cikk nem kerül újra sorba
 
 # Audio settings
 AUDIO_DIR = "./static/audio"
@@ -0,0 +1,48 @@
+# database/counters.py - CIKKSZÁMLÁLÓK
+# article_counts: triggerekkel karbantartott darabszámok (összes / kategória / forrás × feldolgozott) - COUNT(*) helyett
+
+from typing import List, Optional
+
+from sqlalchemy import text
+
+from database.models import sqlite_table_exists
+
+ARTICLE_COUNTS_TABLE = "article_counts"
+
+
+def has_article_counts(db) -> bool:
+    return sqlite_table_exists(db, ARTICLE_COUNTS_TABLE)
+
+
+def article_count(db, is_processed: Optional[bool] = True, category: Optional[str] = None,
+                  source: Optional[str] = None) -> Optional[int]:
+    """
+    Darabszám a számlálótáblából; `is_processed=None` = feldolgozott és feldolgozatlan együtt.
+    None, ha a szűrés nem egy számlálóra esik (kategória + forrás együtt) vagy nincs számlálótábla - ekkor COUNT(*) kell.
+    """
+    if (category and source) or not has_article_counts(db):
+        return None
+    if category:
+        scope, key = "category", category
+    elif source:
+        scope, key = "source", source
+    else:
+        scope, key = "all", ""
+    sql = f"SELECT COALESCE(SUM(count), 0) FROM {ARTICLE_COUNTS_TABLE} WHERE scope = :scope AND key = :key"
+    params = {"scope": scope, "key": key}
+    if is_processed is not None:
+        sql += " AND is_processed = :is_processed"
+        params["is_processed"] = int(is_processed)
+    return db.execute(text(sql), params).scalar()
+
+
+def grouped_counts(db, scope: str, is_processed: bool = True) -> Optional[List[dict]]:
+    """Kategóriánkénti / forrásonkénti darabszámok csökkenő sorrendben ({"name", "count"}); None számlálótábla nélkül."""
+    if not has_article_counts(db):
+        return None
+    rows = db.execute(
+        text(f"SELECT key, count FROM {ARTICLE_COUNTS_TABLE} "
+             "WHERE scope = :scope AND is_processed = :is_processed AND count > 0 ORDER BY count DESC"),
+        {"scope": scope, "is_processed": int(is_processed)}
+    )
+    return [{"name": key, "count": count} for key, count in rows]
@@ -1,33 +1,80 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
-from config.settings import DATABASE_URL
-from database.models import Base
+from sqlalchemy.pool import QueuePool
+from config.settings import (
+    DATABASE_URL,
+    SQLITE_WRITER_POOL_SIZE,
+    SQLITE_WRITER_MAX_OVERFLOW,
+    SQLITE_READER_POOL_SIZE,
+    SQLITE_READER_MAX_OVERFLOW,
+    SQLITE_POOL_TIMEOUT,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_MMAP_SIZE,
+)
+from database.models import Base, add_missing_article_columns
+from database.migrations import run_migrations
 
-# Adatbázis engine létrehozása
-if os.environ.get("RENDER"):
-    # CRITICAL FIX: NullPool for SQLite production - NO CONNECTION POOL
-    engine = create_engine(
-        DATABASE_URL,
-        poolclass=NullPool,  # !!!!! CRÍTICO: NullPool = zero connection pooling
+
+def _is_sqlite_file(url: str) -> bool:
+    return url.startswith("sqlite") and ":memory:" not in url and url.rstrip("/") not in ("sqlite:", "sqlite://")
+
+
+def _sqlite_engine(url: str, pool_size: int, max_overflow: int, read_only: bool = False):
+    """
+    Pool-olt SQLite engine; a PRAGMA-k a kapcsolat megnyitásakor egyszer futnak (connect event), nem kérésenként.
+    Az olvasó kapcsolatok `query_only` módban vannak: véletlen írás sem foghatja meg az író zárat.
+    """
+    sqlite_engine = create_engine(
+        url,
+        poolclass=QueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=SQLITE_POOL_TIMEOUT,
         connect_args={
             "check_same_thread": False,
-            "timeout": 60
+            "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
         },
         echo=False
     )
-    print("🚀 Production SQLite config: NullPool - No connection pool")
+
+    @event.listens_for(sqlite_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode = WAL")  # Olvasók és az író nem blokkolják egymást
+            cursor.execute("PRAGMA synchronous = NORMAL")  # WAL mellett biztonságos, commitonként nincs fsync
+            cursor.execute(f"PRAGMA busy_timeout = {int(SQLITE_BUSY_TIMEOUT_MS)}")
+            cursor.execute(f"PRAGMA cache_size = -{int(SQLITE_CACHE_SIZE_KB)}")
+            cursor.execute(f"PRAGMA mmap_size = {int(SQLITE_MMAP_SIZE)}")
+            cursor.execute("PRAGMA temp_store = MEMORY")
+            if read_only:
+                cursor.execute("PRAGMA query_only = ON")
+        finally:
+            cursor.close()
+
+    return sqlite_engine
+
+
+# Adatbázis engine-ek: író (scraper, generálás, admin, számlálók) és olvasó (API lekérdezések)
+if _is_sqlite_file(DATABASE_URL):
+    engine = _sqlite_engine(DATABASE_URL, SQLITE_WRITER_POOL_SIZE, SQLITE_WRITER_MAX_OVERFLOW)
+    read_engine = _sqlite_engine(DATABASE_URL, SQLITE_READER_POOL_SIZE, SQLITE_READER_MAX_OVERFLOW, read_only=True)
+    print(f"🗄️ SQLite WAL: író pool {SQLITE_WRITER_POOL_SIZE}+{SQLITE_WRITER_MAX_OVERFLOW}, "
+          f"olvasó pool {SQLITE_READER_POOL_SIZE}+{SQLITE_READER_MAX_OVERFLOW}")
 else:
-    # Development: normál konfiguráció  
+    # Memória-adatbázis vagy szerver alapú adatbázis: egy közös engine
     engine = create_engine(
         DATABASE_URL,
-        connect_args={"check_same_thread": False}
+        connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
     )
+    read_engine = engine
     print("🔧 Development database config loaded")
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 def create_tables():
     """Adatbázis táblák létrehozása"""
@@ -35,22 +82,36 @@ def create_tables():
     os.makedirs("data", exist_ok=True)
     os.makedirs("data/logs", exist_ok=True)
     os.makedirs("static/audio", exist_ok=True)
-    
+
     Base.metadata.create_all(bind=engine)
+    add_missing_article_columns(engine)
+    run_migrations(engine)
     print("✅ Adatbázis táblák létrehozva")
 
 def get_db():
-    """Adatbázis session lekérése (FastAPI dependency)"""
+    """Adatbázis session lekérése (FastAPI dependency) - író pool"""
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
+def get_read_db():
+    """Csak olvasó session (FastAPI dependency) - az írások nem tartják fel"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
 def get_db_session():
     """Egyszerű DB session (scriptekhez)"""
     return SessionLocal()
 
+def get_read_session():
+    """Csak olvasó DB session (scriptekhez, riportokhoz)"""
+    return ReadSessionLocal()
+
 # Kezdeti setup futtatása
 if __name__ == "__main__":
     create_tables()
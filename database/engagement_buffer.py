@@ -0,0 +1,207 @@
+# database/engagement_buffer.py - WRITE-BEHIND SZÁMLÁLÓ PUFFER
+# view_count / audio_play_count növelések memóriában gyűjtve, időszakos kiírás egy tranzakcióban, append naplóval
+
+import os
+import atexit
+import threading
+from collections import defaultdict
+from typing import Dict, Optional
+
+from sqlalchemy import text
+
+from config.settings import (
+    ENGAGEMENT_FLUSH_SECONDS,
+    ENGAGEMENT_FLUSH_MAX_PENDING,
+    ENGAGEMENT_LOG_FILE,
+)
+
+COUNTER_FIELDS = ("view_count", "audio_play_count")
+
+
+class EngagementCounterBuffer:
+    """
+    Cikkenkénti számláló-növelések pufferelése.
+
+    - `increment()` nem ír adatbázist: memóriába és az append naplóba kerül (folyamat-összeomlást túlél).
+    - `flush()` az összes függő növelést egyetlen író tranzakcióban írja ki; közben a napló
+      `.flushing` fájlra vált, az új növelések már friss naplóba mennek.
+    - Induláskor a napló (és egy félbemaradt `.flushing`) visszatöltődik - a commit és a napló
+      törlése közötti összeomlásnál egy kör kétszer számolódhat (legalább egyszer szemantika).
+    - `pending()` / `merged()`: olvasáskor a még ki nem írt növelések hozzáadhatók a DB értékhez.
+
+    `log_path=None` esetén csak memóriában gyűjt.
+    """
+
+    def __init__(self, log_path: Optional[str] = ENGAGEMENT_LOG_FILE,
+                 flush_interval: float = ENGAGEMENT_FLUSH_SECONDS,
+                 max_pending: int = ENGAGEMENT_FLUSH_MAX_PENDING,
+                 session_factory=None):
+        self.log_path = log_path
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.session_factory = session_factory
+        self.stats = {"increments": 0, "flushes": 0, "rows_written": 0, "errors": 0}
+        self._pending: Dict[int, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._log = None
+        self._recover()
+
+    # === NAPLÓ ===
+
+    def _read_log(self, path: str):
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split()
+                # Csonka utolsó sor (összeomlás írás közben) kimarad
+                if len(parts) == 3 and parts[1] in COUNTER_FIELDS and parts[0].isdigit() and parts[2].lstrip('-').isdigit():
+                    self._pending[int(parts[0])][parts[1]] += int(parts[2])
+
+    def _recover(self):
+        if not self.log_path:
+            return
+        os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+        flushing_path = f"{self.log_path}.flushing"
+        self._read_log(flushing_path)
+        self._read_log(self.log_path)
+        # Összevont napló a két fájl helyett
+        self._log = open(self.log_path + ".tmp", 'w', encoding='utf-8')
+        self._write_entries(self._pending)
+        self._log.close()
+        os.replace(self.log_path + ".tmp", self.log_path)
+        if os.path.exists(flushing_path):
+            os.remove(flushing_path)
+        self._log = open(self.log_path, 'a', encoding='utf-8')
+        if self._pending:
+            print(f"♻️ Számláló napló visszatöltve: {len(self._pending)} cikk függő növelése")
+
+    def _write_entries(self, entries: Dict[int, Dict[str, int]]):
+        for article_id, deltas in entries.items():
+            for field, amount in deltas.items():
+                if amount:
+                    self._log.write(f"{article_id} {field} {amount}\n")
+        self._log.flush()
+
+    # === NÖVELÉS / OLVASÁS ===
+
+    def increment(self, article_id: int, field: str, amount: int = 1):
+        if field not in COUNTER_FIELDS:
+            raise ValueError(f"Ismeretlen számláló: {field}")
+        with self._lock:
+            if self._log:
+                self._log.write(f"{article_id} {field} {amount}\n")
+                self._log.flush()
+            self._pending[article_id][field] += amount
+            self.stats["increments"] += 1
+            pending_articles = len(self._pending)
+        if pending_articles >= self.max_pending:
+            self._wakeup.set()
+
+    def pending(self, article_id: int, field: str) -> int:
+        with self._lock:
+            deltas = self._pending.get(article_id)
+            return deltas[field] if deltas else 0
+
+    def merged(self, article, field: str) -> int:
+        """A cikk DB-beli számlálója + a még ki nem írt növelések."""
+        return (getattr(article, field) or 0) + self.pending(article.id, field)
+
+    # === KIÍRÁS ===
+
+    def _session(self):
+        if self.session_factory:
+            return self.session_factory()
+        from database.db import get_db_session
+        return get_db_session()
+
+    def flush(self) -> int:
+        """Függő növelések kiírása egy tranzakcióban; a visszatérési érték a frissített cikkek száma."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch = dict(self._pending)
+                self._pending.clear()
+                if self._log:
+                    self._log.close()
+                    os.replace(self.log_path, f"{self.log_path}.flushing")
+                    self._log = open(self.log_path, 'a', encoding='utf-8')
+
+            rows = [
+                {"id": article_id, "views": deltas["view_count"], "plays": deltas["audio_play_count"]}
+                for article_id, deltas in batch.items()
+            ]
+            db = self._session()
+            try:
+                db.execute(text(
+                    "UPDATE articles SET view_count = COALESCE(view_count, 0) + :views, "
+                    "audio_play_count = COALESCE(audio_play_count, 0) + :plays WHERE id = :id"
+                ), rows)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                # Vissza a pufferbe és a friss naplóba, a következő kör újrapróbálja
+                with self._lock:
+                    for article_id, deltas in batch.items():
+                        for field, amount in deltas.items():
+                            self._pending[article_id][field] += amount
+                    if self._log:
+                        self._write_entries(batch)
+                    self.stats["errors"] += 1
+                if self.log_path:
+                    os.remove(f"{self.log_path}.flushing")
+                print(f"⚠️ Számláló kiírási hiba ({len(rows)} cikk, újrapróbálva): {e}")
+                return 0
+            finally:
+                db.close()
+
+            if self.log_path:
+                os.remove(f"{self.log_path}.flushing")
+            self.stats["flushes"] += 1
+            self.stats["rows_written"] += len(rows)
+            return len(rows)
+
+    def start(self):
+        """Háttérszál: `flush_interval` időnként (vagy `max_pending` elérésekor azonnal) kiír."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="engagement-flusher", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Számláló flusher hiba: {e}")
+
+    def stop(self):
+        """Leállítás utolsó kiírással (atexit)."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+
+_buffer: Optional[EngagementCounterBuffer] = None
+_registry_lock = threading.Lock()
+
+
+def get_engagement_buffer() -> EngagementCounterBuffer:
+    """Folyamatonként egy puffer; az első híváskor indul a háttér-kiíró és regisztrálódik a leállító kiírás."""
+    global _buffer
+    with _registry_lock:
+        if _buffer is None:
+            _buffer = EngagementCounterBuffer()
+            _buffer.start()
+            atexit.register(_buffer.stop)
+        return _buffer
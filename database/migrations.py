@@ -0,0 +1,261 @@
+# database/migrations.py - SÉMA MIGRÁCIÓK
+# Verziózott, egyszer lefutó séma-változtatások (schema_migrations tábla) + EXPLAIN ellenőrzés a forró lekérdezésekre
+
+import sys
+import argparse
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from sqlalchemy import String, and_, case, desc, func, literal, select, text, tuple_
+
+from database.models import Article
+from database.search import article_search_subquery, fts_match_expression
+
+def _count_statements(row: str, sign: str) -> str:
+    """article_counts trigger törzs: a `row` (new / old) cikk három számlálójának léptetése `sign` irányba."""
+    return "".join(
+        f"INSERT INTO article_counts (scope, key, is_processed, count) "
+        f"VALUES ('{scope}', {key}, COALESCE({row}.is_processed, 0), {sign}1) "
+        f"ON CONFLICT (scope, key, is_processed) DO UPDATE SET count = count {sign} 1; "
+        for scope, key in (("all", "''"), ("category", f"{row}.category"), ("source", f"{row}.source"))
+    )
+
+
+# (verzió, leírás, SQL utasítások) - sorrendben futnak, mindegyik a saját tranzakciójában.
+# Már kiadott migrációt ne módosíts: az új változás új verziót kap.
+MIGRATIONS: List[Tuple[str, str, List[str]]] = [
+    (
+        "0001_article_listing_indexes",
+        "Összetett és részleges indexek a cikklistázó / friss-cikk lekérdezésekhez",
+        [
+            # /api/articles, /api/latest (kategória nélkül), /api/trending időablak
+            "CREATE INDEX IF NOT EXISTS ix_articles_processed_created ON articles (is_processed, created_at DESC)",
+            # /api/articles?category=, /api/latest?category=
+            "CREATE INDEX IF NOT EXISTS ix_articles_processed_category_created ON articles (is_processed, category, created_at)",
+            # identify_fresh_articles: friss és régi feldolgozatlan cikkek published_at szerint
+            "CREATE INDEX IF NOT EXISTS ix_articles_processed_published ON articles (is_processed, published_at)",
+            # /api/articles?source= - csak a publikált cikkeken, a feldolgozatlan sorok nem terhelik
+            "CREATE INDEX IF NOT EXISTS ix_articles_processed_source_created ON articles (source, created_at) WHERE is_processed = 1",
+        ],
+    ),
+    (
+        "0002_article_fts",
+        "FTS5 teljes szöveges index (ékezet-független) triggerekkel szinkronizálva",
+        [
+            # External content tábla: a szöveg csak az articles-ben él, az FTS csak az indexet tárolja
+            "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+            "title, ai_title, summary, ai_summary, source, content='articles', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')",
+            "CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN "
+            "INSERT INTO articles_fts (rowid, title, ai_title, summary, ai_summary, source) "
+            "VALUES (new.id, new.title, new.ai_title, new.summary, new.ai_summary, new.source); END",
+            "CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN "
+            "INSERT INTO articles_fts (articles_fts, rowid, title, ai_title, summary, ai_summary, source) "
+            "VALUES ('delete', old.id, old.title, old.ai_title, old.summary, old.ai_summary, old.source); END",
+            # Csak a kereshető oszlopok változásakor - a view_count / audio_play_count frissítések nem érintik
+            "CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, ai_title, summary, ai_summary, source ON articles BEGIN "
+            "INSERT INTO articles_fts (articles_fts, rowid, title, ai_title, summary, ai_summary, source) "
+            "VALUES ('delete', old.id, old.title, old.ai_title, old.summary, old.ai_summary, old.source); "
+            "INSERT INTO articles_fts (rowid, title, ai_title, summary, ai_summary, source) "
+            "VALUES (new.id, new.title, new.ai_title, new.summary, new.ai_summary, new.source); END",
+            # Meglévő cikkek indexelése
+            "INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')",
+        ],
+    ),
+    (
+        "0003_article_counts",
+        "Triggerekkel karbantartott cikkszámlálók (összes / kategória / forrás × is_processed)",
+        [
+            "CREATE TABLE IF NOT EXISTS article_counts ("
+            "scope VARCHAR(20) NOT NULL, key VARCHAR(100) NOT NULL, is_processed INTEGER NOT NULL, count INTEGER NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (scope, key, is_processed))",
+            "CREATE TRIGGER IF NOT EXISTS article_counts_insert AFTER INSERT ON articles BEGIN "
+            + _count_statements("new", "+") + "END",
+            "CREATE TRIGGER IF NOT EXISTS article_counts_delete AFTER DELETE ON articles BEGIN "
+            + _count_statements("old", "-") + "END",
+            # Feldolgozáskor (is_processed 0 → 1) vagy átkategorizáláskor a régi csoportból az újba kerül
+            "CREATE TRIGGER IF NOT EXISTS article_counts_update AFTER UPDATE OF is_processed, category, source ON articles "
+            "WHEN old.is_processed IS NOT new.is_processed OR old.category IS NOT new.category OR old.source IS NOT new.source BEGIN "
+            + _count_statements("old", "-") + _count_statements("new", "+") + "END",
+            # Meglévő cikkek
+            "INSERT OR REPLACE INTO article_counts (scope, key, is_processed, count) "
+            "SELECT 'all', '', COALESCE(is_processed, 0), COUNT(*) FROM articles GROUP BY COALESCE(is_processed, 0)",
+            "INSERT OR REPLACE INTO article_counts (scope, key, is_processed, count) "
+            "SELECT 'category', category, COALESCE(is_processed, 0), COUNT(*) FROM articles GROUP BY category, COALESCE(is_processed, 0)",
+            "INSERT OR REPLACE INTO article_counts (scope, key, is_processed, count) "
+            "SELECT 'source', source, COALESCE(is_processed, 0), COUNT(*) FROM articles GROUP BY source, COALESCE(is_processed, 0)",
+        ],
+    ),
+    (
+        "0004_unpublish_linked_duplicates",
+        "Korábbi sztorihoz kötött, AI tartalom nélküli duplikátumok visszaállítása feldolgozatlanra",
+        [
+            # Régebben `is_processed = 1`-et kaptak, így nyers tartalommal kerültek a listákba és a TTS-be;
+            # a számláló triggerek a darabszámokat is átvezetik
+            "UPDATE articles SET is_processed = 0 WHERE duplicate_of_id IS NOT NULL AND ai_summary IS NULL",
+        ],
+    ),
+    (
+        "0005_daily_quotas",
+        "Folyamatok között közös napi kvóta-számlálók (GPT-4o prémium kvóta)",
+        [
+            "CREATE TABLE IF NOT EXISTS daily_quotas ("
+            "name VARCHAR(50) NOT NULL, day VARCHAR(10) NOT NULL, count INTEGER NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (name, day))",
+        ],
+    ),
+]
+
+
+def _ensure_migration_table(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version VARCHAR(100) PRIMARY KEY, description TEXT, applied_at DATETIME NOT NULL)"
+    ))
+
+
+def applied_migrations(engine) -> List[str]:
+    with engine.begin() as conn:
+        _ensure_migration_table(conn)
+        return [row[0] for row in conn.execute(text("SELECT version FROM schema_migrations ORDER BY version"))]
+
+
+def run_migrations(engine) -> List[str]:
+    """A még le nem futott migrációk alkalmazása (create_tables hívja); a visszaadott lista az újonnan futottaké."""
+    applied = set(applied_migrations(engine))
+    newly_applied = []
+    for version, description, statements in MIGRATIONS:
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, description, applied_at) VALUES (:version, :description, :applied_at)"),
+                {"version": version, "description": description, "applied_at": datetime.now()}
+            )
+        newly_applied.append(version)
+        print(f"✅ Migráció: {version} - {description}")
+
+    if newly_applied and engine.dialect.name == "sqlite":
+        # Friss statisztika, hogy a query planner az új indexeket válassza
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+    return newly_applied
+
+
+# === QUERY PLAN ELLENŐRZÉS ===
+
+def hot_queries() -> Dict[str, Tuple[object, str]]:
+    """A forró lekérdezések (az API végpontokkal és az orchestratorral azonos szűrés / rendezés) → elvárt index."""
+    now = datetime.now()
+    processed = Article.is_processed == True
+    unprocessed = and_(Article.is_processed == False, Article.duplicate_of_id.is_(None))
+    cutoff = now - timedelta(hours=2)
+    fpp = case((Article.source.in_(['Portfolio', 'HVG', 'Telex']), 80), else_=30)
+    fbp = case((Article.published_at >= now - timedelta(minutes=30), 120), else_=0)
+    search = article_search_subquery(fts_match_expression("kormány döntés"))
+
+    return {
+        "/api/articles": (
+            select(Article).where(processed).order_by(desc(Article.created_at)).limit(50),
+            "ix_articles_processed_created",
+        ),
+        "/api/articles?category": (
+            select(Article).where(processed, Article.category == "gazdasag")
+            .order_by(desc(Article.created_at)).limit(50),
+            "ix_articles_processed_category_created",
+        ),
+        "/api/articles?source": (
+            select(Article).where(processed, Article.source == "Telex").order_by(desc(Article.created_at)).limit(50),
+            "ix_articles_processed_source_created",
+        ),
+        "/api/articles total": (
+            select(func.count(Article.id)).where(processed, Article.category == "gazdasag"),
+            "ix_articles_processed_category_created",
+        ),
+        "/api/articles cursor": (
+            select(Article).where(processed, tuple_(Article.created_at, Article.id) < tuple_(literal(now.isoformat(" "), String), literal(1000)))
+            .order_by(desc(Article.created_at), desc(Article.id)).limit(51),
+            "ix_articles_processed_created",
+        ),
+        "/api/latest": (
+            select(Article).where(processed).order_by(desc(Article.created_at)).limit(20),
+            "ix_articles_processed_created",
+        ),
+        "/api/trending": (
+            select(Article).where(processed, Article.created_at >= now - timedelta(hours=24))
+            .order_by(desc(Article.view_count + Article.audio_play_count * 2)).limit(10),
+            "ix_articles_processed_created",
+        ),
+        "identify_fresh_articles": (
+            select(Article).where(unprocessed, Article.published_at >= cutoff).order_by(desc(fpp + fbp)).limit(50),
+            "ix_articles_processed_published",
+        ),
+        "/admin/articles/search": (
+            select(Article).join(search, search.c.id == Article.id).order_by(search.c.rank, desc(Article.created_at)).limit(50),
+            "articles_fts",
+        ),
+        "identify_fresh_articles old": (
+            select(func.count(Article.id)).where(unprocessed, Article.published_at < cutoff),
+            "ix_articles_processed_published",
+        ),
+    }
+
+
+def explain(conn, statement) -> List[str]:
+    """EXPLAIN QUERY PLAN sorai egy SQLAlchemy lekérdezésre."""
+    compiled = statement.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(
+        str(value) if isinstance(value, datetime) else value
+        for value in (compiled.params[name] for name in (compiled.positiontup or []))
+    )
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def check_query_plans(engine) -> Dict[str, Dict]:
+    """Minden forró lekérdezésre: a plan sorai és hogy az elvárt indexet használja-e."""
+    results = {}
+    with engine.connect() as conn:
+        for name, (statement, expected_index) in hot_queries().items():
+            plan = explain(conn, statement)
+            results[name] = {
+                "expected_index": expected_index,
+                "plan": plan,
+                "uses_index": any(expected_index in line for line in plan),
+            }
+    return results
+
+
+def assert_query_plans(engine):
+    """AssertionError, ha valamelyik forró lekérdezés nem az elvárt indexet használja."""
+    failures = {name: result for name, result in check_query_plans(engine).items() if not result["uses_index"]}
+    if failures:
+        raise AssertionError("Index nélküli lekérdezési terv: " + "; ".join(
+            f"{name} (elvárt: {result['expected_index']}, plan: {' | '.join(result['plan'])})"
+            for name, result in failures.items()
+        ))
+
+
+def main():
+    """python -m database.migrations [--check]"""
+    parser = argparse.ArgumentParser(description="HírMagnet séma migrációk")
+    parser.add_argument('--check', action='store_true', help="EXPLAIN QUERY PLAN ellenőrzés a forró lekérdezésekre")
+    args = parser.parse_args()
+
+    from database.db import engine, create_tables
+    create_tables()
+    print(f"📜 Alkalmazott migrációk: {', '.join(applied_migrations(engine)) or '-'}")
+
+    if args.check:
+        results = check_query_plans(engine)
+        for name, result in results.items():
+            status = "✅" if result["uses_index"] else "❌"
+            print(f"{status} {name}: {' | '.join(result['plan'])}")
+        if not all(result["uses_index"] for result in results.values()):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
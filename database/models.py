@@ -53,7 +53,9 @@ class Article(Base):
     original_title = Column(String(500), nullable=True)
     summary = Column(Text, nullable=True)
     original_content = Column(Text, nullable=True)
+    clean_content = Column(Text, nullable=True)  # HTML-mentes, normalizált szöveg (egyszer számolva)
     url = Column(String(1000), unique=True, nullable=False)
+    duplicate_of_id = Column(Integer, nullable=True, index=True)  # Korábban generált sztori, amihez hozzákötöttük
     source = Column(String(100), nullable=False, index=True)
     category = Column(String(50), nullable=False, index=True)
     published_at = Column(DateTime, nullable=True)
@@ -189,6 +191,18 @@ class AIJournalistStats(Base):
     # Categories covered
     categories_covered = Column(String(500), nullable=True)  # JSON list
 
+# 🔁 NEW: CROSS-RUN DUPLICATE DETECTION
+class StoryFingerprint(Base):
+    """Legenerált sztorik duplikátum-ujjlenyomata (gördülő ablakos, futásokon átívelő szűréshez)"""
+    __tablename__ = "story_fingerprints"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    article_id = Column(Integer, ForeignKey("articles.id"), nullable=False, index=True)
+    title = Column(String(500), nullable=True)
+    main_topic = Column(String(200), nullable=True)
+    key_entities = Column(Text, nullable=True)  # JSON list
+    created_at = Column(DateTime, default=func.now(), index=True)
+
 # Kategóriák konstansok - ENHANCED
 CATEGORIES = {
     "general": "📰 Általános",
@@ -370,6 +384,44 @@ def add_journalist_columns_if_missing():
     except Exception as e:
         print(f"❌ Migration error: {e}")
 
+# Utólag felvett articles oszlopok - meglévő adatbázisokban create_tables pótolja őket
+ARTICLE_COLUMN_MIGRATIONS = {
+    "clean_content": "ALTER TABLE articles ADD COLUMN clean_content TEXT",
+    "duplicate_of_id": "ALTER TABLE articles ADD COLUMN duplicate_of_id INTEGER",
+}
+
+def add_missing_article_columns(engine):
+    """A hiányzó articles oszlopok pótlása meglévő adatbázisokban (create_tables hívja)."""
+    from sqlalchemy import inspect, text
+
+    columns = {column['name'] for column in inspect(engine).get_columns('articles')}
+    missing = [name for name in ARTICLE_COLUMN_MIGRATIONS if name not in columns]
+    if not missing:
+        return
+    with engine.begin() as conn:
+        for name in missing:
+            conn.execute(text(ARTICLE_COLUMN_MIGRATIONS[name]))
+            print(f"✅ Added column: articles.{name}")
+        if "duplicate_of_id" in missing:
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_articles_duplicate_of_id ON articles (duplicate_of_id)"))
+
+_existing_sqlite_tables = set()
+
+def sqlite_table_exists(db, name: str) -> bool:
+    """Létezik-e a (migrációval létrehozott) SQLite tábla; a pozitív választ engine-enként megjegyzi."""
+    from sqlalchemy import text
+
+    bind = db.get_bind()
+    key = (str(bind.url), name)
+    if key in _existing_sqlite_tables:
+        return True
+    if bind.dialect.name != "sqlite":
+        return False
+    if db.execute(text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": name}).first() is None:
+        return False
+    _existing_sqlite_tables.add(key)
+    return True
+
 # VALIDATION FUNCTIONS
 def validate_importance_score(score):
     """Validate and clamp importance score to 1-20 range"""
@@ -0,0 +1,55 @@
+# database/pagination.py - KEYSET (CURSOR) LAPOZÁS
+# (created_at, id) szerinti lapozás átlátszatlan cursor tokennel: minden oldal egy index-keresés, offset-szkennelés nélkül
+
+import json
+import base64
+from typing import List, Optional, Tuple
+
+from sqlalchemy import String, desc, literal, tuple_, type_coerce
+
+from database.models import Article
+
+# A created_at nyers, tárolt szöveges alakja: a SQLite ezt rendezi, a cursor is ezt hordozza
+# (CURRENT_TIMESTAMP "2025-01-01 12:00:00", Python datetime "2025-01-01 12:00:00.123456" - datetime-ként kötve nem egyeznének)
+CREATED_AT_KEY = type_coerce(Article.created_at, String).label("created_at_key")
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(created_at_key: str, article_id: int) -> str:
+    payload = json.dumps([created_at_key, article_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[str, int]:
+    try:
+        payload = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        created_at_key, article_id = json.loads(payload)
+        if not isinstance(created_at_key, str) or not isinstance(article_id, int):
+            raise ValueError
+        return created_at_key, article_id
+    except Exception:
+        raise InvalidCursorError("Érvénytelen cursor")
+
+
+def keyset_page(query, limit: int, cursor: Optional[str] = None) -> Tuple[List, Optional[str]]:
+    """
+    Egy oldal (created_at DESC, id DESC) sorrendben a cursor utáni elemekből.
+    Visszaad: (cikkek, következő cursor vagy None az utolsó oldalon). A lekérdezés rendezetlen Article query legyen.
+    """
+    query = query.add_columns(CREATED_AT_KEY)
+    if cursor:
+        created_at_key, article_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(Article.created_at, Article.id) < tuple_(literal(created_at_key, String), literal(article_id))
+        )
+    rows = query.order_by(desc(Article.created_at), desc(Article.id)).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_article, last_key = rows[-1]
+        next_cursor = encode_cursor(last_key, last_article.id)
+    return [article for article, _ in rows], next_cursor
@@ -0,0 +1,102 @@
+# database/quota.py - FOLYAMATOK KÖZÖTT KÖZÖS NAPI KVÓTA
+# daily_quotas: (név, nap) → felhasznált darab; a foglalás egyetlen feltételes UPDATE, így az API, a scheduler és az orchestrator is ugyanabból fogy
+
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import text
+
+from database.models import sqlite_table_exists
+
+DAILY_QUOTA_TABLE = "daily_quotas"
+
+
+class DailyQuota:
+    """
+    Egy napi kvóta számlálója az adatbázisban.
+
+    - `try_reserve(limit)`: `UPDATE ... SET count = count + 1 WHERE count < :limit` - a feltétel és a
+      növelés egy utasítás, párhuzamos folyamatok / szálak foglalása sem vész el és nem lépi túl a limitet.
+    - `release()`: egy foglalás visszaadása (halasztás, failover).
+    - A nap a helyi dátum; napváltáskor új sor indul nulláról, a régi sorok megmaradnak (napi használat története).
+    """
+
+    def __init__(self, name: str, session_factory=None):
+        self.name = name
+        self.session_factory = session_factory
+        self._schema_checked = False
+
+    def _session(self):
+        if self.session_factory:
+            return self.session_factory()
+        from database.db import get_db_session
+        return get_db_session()
+
+    def _ensure_schema(self, db):
+        # A scheduler / orchestrator create_tables nélkül is indulhat: a hiányzó migrációk itt futnak le
+        if self._schema_checked:
+            return
+        if not sqlite_table_exists(db, DAILY_QUOTA_TABLE):
+            from database.migrations import run_migrations
+            run_migrations(db.get_bind())
+        self._schema_checked = True
+
+    @staticmethod
+    def _day(day: Optional[date] = None) -> str:
+        return str(day or datetime.now().date())
+
+    def used(self, day: Optional[date] = None) -> int:
+        db = self._session()
+        try:
+            self._ensure_schema(db)
+            count = db.execute(
+                text(f"SELECT count FROM {DAILY_QUOTA_TABLE} WHERE name = :name AND day = :day"),
+                {"name": self.name, "day": self._day(day)}
+            ).scalar()
+            return count or 0
+        finally:
+            db.close()
+
+    def try_reserve(self, limit: float) -> Optional[int]:
+        """Egy egység lefoglalása, ha a mai használat `limit` alatt van; visszaadja az új értéket, vagy None-t."""
+        params = {"name": self.name, "day": self._day(), "limit": limit}
+        db = self._session()
+        try:
+            self._ensure_schema(db)
+            db.execute(text(
+                f"INSERT INTO {DAILY_QUOTA_TABLE} (name, day, count) VALUES (:name, :day, 0) "
+                "ON CONFLICT (name, day) DO NOTHING"
+            ), params)
+            reserved = db.execute(text(
+                f"UPDATE {DAILY_QUOTA_TABLE} SET count = count + 1 WHERE name = :name AND day = :day AND count < :limit"
+            ), params).rowcount
+            count = db.execute(
+                text(f"SELECT count FROM {DAILY_QUOTA_TABLE} WHERE name = :name AND day = :day"), params
+            ).scalar()
+            db.commit()
+            return count if reserved else None
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def release(self) -> int:
+        """Egy mai foglalás visszaadása; visszaadja az új értéket."""
+        params = {"name": self.name, "day": self._day()}
+        db = self._session()
+        try:
+            self._ensure_schema(db)
+            db.execute(text(
+                f"UPDATE {DAILY_QUOTA_TABLE} SET count = MAX(count - 1, 0) WHERE name = :name AND day = :day"
+            ), params)
+            count = db.execute(
+                text(f"SELECT count FROM {DAILY_QUOTA_TABLE} WHERE name = :name AND day = :day"), params
+            ).scalar()
+            db.commit()
+            return count or 0
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
@@ -0,0 +1,56 @@
+# database/search.py - CIKK TELJES SZÖVEGES KERESÉS (SQLite FTS5)
+# articles_fts: triggerekkel szinkronizált FTS5 index (migráció: 0002_article_fts), ékezet-független tokenizálás, BM25 rangsor
+
+import re
+from typing import Optional, Sequence, Tuple
+
+from sqlalchemy import Float, Integer, or_, text
+
+from database.models import Article, sqlite_table_exists
+
+ARTICLE_FTS_TABLE = "articles_fts"
+# BM25 oszlopsúlyok: title, ai_title, summary, ai_summary, source
+ARTICLE_FTS_WEIGHTS = (10.0, 10.0, 3.0, 3.0, 1.0)
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_match_expression(search: str) -> Optional[str]:
+    """
+    Felhasználói keresőszöveg → FTS5 MATCH kifejezés.
+    Minden szó idézve (az FTS szintaxis nem szivároghat át) és prefixként keresve:
+    a magyar ragozott alakok ("kormány" → "kormánynak") így is találnak. A szavak ÉS kapcsolatban állnak.
+    """
+    tokens = _TOKEN_PATTERN.findall(search or "")
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def has_article_fts(db) -> bool:
+    """Van-e FTS index az adatbázisban (nem SQLite / FTS5 nélküli build esetén LIKE keresés marad)."""
+    return sqlite_table_exists(db, ARTICLE_FTS_TABLE)
+
+
+def article_search_subquery(match: str):
+    """(id, rank) részlekérdezés az FTS találatokra; kisebb rank = relevánsabb."""
+    weights = ", ".join(str(weight) for weight in ARTICLE_FTS_WEIGHTS)
+    return text(
+        f"SELECT rowid AS id, bm25({ARTICLE_FTS_TABLE}, {weights}) AS rank "
+        f"FROM {ARTICLE_FTS_TABLE} WHERE {ARTICLE_FTS_TABLE} MATCH :match"
+    ).bindparams(match=match).columns(id=Integer, rank=Float).subquery("article_fts_match")
+
+
+def apply_article_search(query, db, search: str, fallback_columns: Sequence) -> Tuple[object, Optional[object]]:
+    """
+    Keresés hozzáadása egy Article lekérdezéshez.
+    Visszaad: (szűrt lekérdezés, rangsor oszlop vagy None). FTS nélkül `fallback_columns` ILIKE szűrés, rangsor nélkül.
+    """
+    match = fts_match_expression(search)
+    if match is None:
+        return query, None
+    if has_article_fts(db):
+        matches = article_search_subquery(match)
+        return query.join(matches, matches.c.id == Article.id), matches.c.rank
+    search_term = f"%{search}%"
+    return query.filter(or_(*(column.ilike(search_term) for column in fallback_columns))), None
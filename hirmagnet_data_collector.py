@@ -22,6 +22,7 @@ LEGFRISSEBB MÓDOSÍTÁSOK:
 - Továbbra is: Tudás.hu és Kultúra.hu hozzáadva
 """
 
+import os
 import requests
 import feedparser
 import json
@@ -31,12 +32,18 @@ import xml.etree.ElementTree as ET
 from urllib.parse import urljoin
 import time
 
+from config.settings import DATA_COLLECTOR_VALIDATOR_FILE, DATA_COLLECTOR_STATUS_FILE
+from scraper.feed_cache import FeedValidatorCache
+from scraper.feed_corpus import mount_feed_transport, get_feed_mode
+
 class DataCollector:
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        # Feed korpusz rögzítés / visszajátszás (FEED_TRANSPORT_MODE)
+        mount_feed_transport(self.session)
         
         # RSS források konfigurálása - OPTIMALIZÁLT: CSAK MŰKÖDŐ FEEDEK
         # BACKWARD COMPATIBILITY: Eredeti kategória struktúra megtartva!
@@ -308,6 +315,37 @@ class DataCollector:
             'weather': 1800   # 30 perc
         }
 
+        # Feltételes GET: saját validátorok + az utolsó ismert státusz feedenként, újraindítás után is
+        # (visszajátszáskor csak memóriában: ismételhető futás, az éles állapot érintetlen marad)
+        persistent_state = get_feed_mode() != "replay"
+        self.feed_validators = FeedValidatorCache(DATA_COLLECTOR_VALIDATOR_FILE if persistent_state else None)
+        self.rss_status_path = DATA_COLLECTOR_STATUS_FILE if persistent_state else None
+        self.rss_status_cache = self._load_rss_status()
+
+    def _load_rss_status(self) -> Dict[str, Dict]:
+        if not self.rss_status_path or not os.path.exists(self.rss_status_path):
+            return {}
+        try:
+            with open(self.rss_status_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ RSS státusz cache betöltési hiba: {e}")
+            return {}
+
+    def _save_feed_state(self):
+        """Validátorok és utolsó státuszok mentése (atomikus fájlcsere)."""
+        self.feed_validators.save()
+        if not self.rss_status_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.rss_status_path) or ".", exist_ok=True)
+            tmp_path = f"{self.rss_status_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.rss_status_cache, f, ensure_ascii=False)
+            os.replace(tmp_path, self.rss_status_path)
+        except Exception as e:
+            print(f"⚠️ RSS státusz cache mentési hiba: {e}")
+
     def _is_cache_valid(self, key: str) -> bool:
         """Ellenőrzi, hogy a cache még érvényes-e"""
         if key not in self.cache['last_update']:
@@ -330,6 +368,7 @@ class DataCollector:
             for source in sources:
                 status = self._check_rss_source(source)
                 sources_status[category].append(status)
+        self._save_feed_state()
         
         # Cache frissítése
         self.cache['rss'] = sources_status
@@ -340,7 +379,15 @@ class DataCollector:
     def _check_rss_source(self, source: Dict) -> Dict:
         """Egyetlen RSS forrás ellenőrzése"""
         try:
-            response = self.session.get(source['url'], timeout=10)
+            previous_status = self.rss_status_cache.get(source['url'])
+            headers = self.feed_validators.conditional_headers(source['url']) if previous_status else {}
+            response = self.session.get(source['url'], timeout=10, headers=headers)
+            
+            # 304 vagy azonos body: nincs újraparse-olás, az előző státusz frissített időbélyeggel
+            if previous_status and self.feed_validators.is_unchanged(source['url'], response.status_code, response.content):
+                status = dict(previous_status)
+                status['last_sync'] = datetime.now().isoformat()
+                return status
             
             if response.status_code == 200:
                 # RSS feed parsing
@@ -355,7 +402,7 @@ class DataCollector:
                         'link': entry.get('link', '')
                     })
                 
-                return {
+                status = {
                     'name': source['name'],
                     'url': source['url'],
                     'priority': source['priority'],
@@ -365,6 +412,9 @@ class DataCollector:
                     'latest_articles': latest_articles,
                     'error': None
                 }
+                self.feed_validators.update(source['url'], response.headers, response.content)
+                self.rss_status_cache[source['url']] = status
+                return status
             else:
                 return self._create_error_status(source, f"HTTP {response.status_code}")
                 
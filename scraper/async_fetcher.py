@@ -0,0 +1,103 @@
+# scraper/async_fetcher.py - PÁRHUZAMOS FEED LETÖLTŐ MOTOR
+# Aszinkron RSS letöltés globális és host-onkénti párhuzamossági korláttal
+
+import asyncio
+import time
+import concurrent.futures
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from config.settings import (
+    REQUEST_TIMEOUT,
+    SCRAPE_MAX_CONCURRENCY,
+    SCRAPE_PER_HOST_CONCURRENCY,
+)
+from scraper.feed_cache import FeedValidatorCache
+
+
+class AsyncFeedFetcher:
+    """
+    Aszinkron feed letöltő.
+
+    - Globális korlát: egyszerre legfeljebb `max_concurrency` letöltés fut.
+    - Host korlát: egy szerverre egyszerre legfeljebb `per_host_concurrency` kérés megy.
+    - A feladatok a kapott sorrendben (prioritás szerint) kerülnek ütemezésre,
+      az eredmények ugyanebben a sorrendben térnek vissza.
+    - `validator_cache` megadásakor feltételes GET megy ki, és a változatlan feedek
+      `not_modified=True` jelölést kapnak (a cache frissítése a hívó dolga).
+    - `transport`: egyedi httpx transport (pl. feed korpusz rögzítés / visszajátszás).
+    """
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None,
+                 max_concurrency: int = SCRAPE_MAX_CONCURRENCY,
+                 per_host_concurrency: int = SCRAPE_PER_HOST_CONCURRENCY,
+                 timeout: float = REQUEST_TIMEOUT,
+                 validator_cache: Optional[FeedValidatorCache] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.headers = dict(headers or {})
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.timeout = timeout
+        self.validator_cache = validator_cache
+        self.transport = transport
+
+    async def fetch_all(self, sources: List[Dict]) -> List[Dict]:
+        """Összes forrás letöltése. A visszaadott lista sorrendje megegyezik a bemenetével."""
+        global_limit = asyncio.Semaphore(self.max_concurrency)
+        host_limits: Dict[str, asyncio.Semaphore] = {}
+
+        async with httpx.AsyncClient(headers=self.headers, timeout=self.timeout,
+                                     follow_redirects=True, transport=self.transport) as client:
+            tasks = [
+                asyncio.create_task(self._fetch_one(client, source, global_limit, host_limits))
+                for source in sources
+            ]
+            return await asyncio.gather(*tasks)
+
+    def fetch_all_sync(self, sources: List[Dict]) -> List[Dict]:
+        """Szinkron belépési pont (scheduler, cron). Futó event loop esetén külön szálon fut."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.fetch_all(sources))
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.fetch_all(sources)).result()
+
+    async def _fetch_one(self, client: httpx.AsyncClient, source: Dict,
+                         global_limit: asyncio.Semaphore,
+                         host_limits: Dict[str, asyncio.Semaphore]) -> Dict:
+        host = urlparse(source['url']).netloc.lower()
+        host_limit = host_limits.setdefault(host, asyncio.Semaphore(self.per_host_concurrency))
+
+        # Előbb a host-slot, utána a globális slot: így egy lassú host nem foglal globális helyet várakozás közben
+        async with host_limit:
+            async with global_limit:
+                start_time = time.time()
+                request_headers = self.validator_cache.conditional_headers(source['url']) if self.validator_cache else {}
+                try:
+                    response = await client.get(source['url'], headers=request_headers)
+                    not_modified = self.validator_cache is not None and self.validator_cache.is_unchanged(
+                        source['url'], response.status_code, response.content
+                    )
+                    return {
+                        "source": source,
+                        "status": response.status_code,
+                        "headers": dict(response.headers),
+                        "content": response.content,
+                        "not_modified": not_modified,
+                        "error": None if response.status_code < 400 else f"HTTP {response.status_code}",
+                        "elapsed": time.time() - start_time,
+                    }
+                except Exception as e:
+                    return {
+                        "source": source,
+                        "status": None,
+                        "headers": {},
+                        "content": None,
+                        "not_modified": False,
+                        "error": f"{type(e).__name__}: {str(e)}",
+                        "elapsed": time.time() - start_time,
+                    }
@@ -0,0 +1,93 @@
+# scraper/feed_cache.py - FEED VALIDÁTOR CACHE (ETag / Last-Modified / body hash)
+# Feltételes letöltés: változatlan feedeknél nincs parse és nincs DB munka
+
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from config.settings import FEED_VALIDATOR_FILE
+
+
+class FeedValidatorCache:
+    """
+    Feedenkénti validátorok tárolása URL szerint.
+
+    - `conditional_headers()` az If-None-Match / If-Modified-Since fejléceket adja.
+    - `is_unchanged()` igaz 304 válasznál, vagy ha a letöltött body hash-e nem változott.
+    - `update()` csak sikeres feldolgozás után hívandó, különben egy félbeszakadt kör
+      "változatlannak" jelölné a feedet.
+
+    `path=None` esetén csak memóriában él (pl. a DataCollector saját állapotához).
+    """
+
+    def __init__(self, path: Optional[str] = FEED_VALIDATOR_FILE):
+        self.path = path
+        self.validators: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.validators = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Feed validátor cache betöltési hiba: {e}")
+            self.validators = {}
+
+    def save(self):
+        """Validátorok mentése (atomikus fájlcsere)."""
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with self._lock:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.validators, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"⚠️ Feed validátor cache mentési hiba: {e}")
+
+    @staticmethod
+    def body_hash(content: Optional[bytes]) -> Optional[str]:
+        if not content:
+            return None
+        return hashlib.sha1(content).hexdigest()
+
+    def get(self, url: str) -> Dict:
+        with self._lock:
+            return dict(self.validators.get(url, {}))
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Feltételes GET fejlécek az utolsó sikeres letöltés alapján."""
+        stored = self.get(url)
+        headers = {}
+        if stored.get('etag'):
+            headers['If-None-Match'] = stored['etag']
+        if stored.get('last_modified'):
+            headers['If-Modified-Since'] = stored['last_modified']
+        return headers
+
+    def is_unchanged(self, url: str, status_code: Optional[int], content: Optional[bytes]) -> bool:
+        if status_code == 304:
+            return True
+        if status_code != 200:
+            return False
+        stored_hash = self.get(url).get('body_hash')
+        return stored_hash is not None and stored_hash == self.body_hash(content)
+
+    def update(self, url: str, response_headers: Dict[str, str], content: Optional[bytes]):
+        """Validátorok frissítése egy sikeresen feldolgozott 200-as válasz után."""
+        headers = {k.lower(): v for k, v in (response_headers or {}).items()}
+        with self._lock:
+            self.validators[url] = {
+                'etag': headers.get('etag'),
+                'last_modified': headers.get('last-modified'),
+                'body_hash': self.body_hash(content),
+                'updated_at': datetime.now().isoformat(),
+            }
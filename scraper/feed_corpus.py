@@ -0,0 +1,345 @@
+# scraper/feed_corpus.py - FEED KORPUSZ RÖGZÍTÉS ÉS VISSZAJÁTSZÁS
+# Nyers feed válaszok (fejlécekkel) tömörített korpuszba; offline visszajátszás httpx / requests transporttal
+
+import io
+import os
+import gzip
+import json
+import time
+import base64
+import asyncio
+import argparse
+import threading
+import http.client
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from config.settings import (
+    FEED_TRANSPORT_MODE,
+    FEED_CORPUS_FILE,
+    FEED_REPLAY_SPEED,
+)
+
+# A dekódolt törzs mellett ezek a fejlécek félrevezetnék a visszajátszást
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+
+def _source_names() -> Dict[str, str]:
+    from config.sources import NEWS_SOURCES
+    return {source['url']: source['name'] for source in NEWS_SOURCES}
+
+
+class FeedCorpusRecorder:
+    """
+    Válaszok hozzáfűzése egy gzip-elt JSONL korpuszhoz (soronként egy válasz, a törzs base64-ben).
+
+    - A 304 válasz nem kerül be (nincs új tartalom); a 3xx átirányítás igen, így a visszajátszás is követi.
+    - A forrás nevét a `NEWS_SOURCES` URL-je alapján tölti ki.
+    - Minden sor után flush: megszakított rögzítésnél is olvasható marad a korpusz.
+    """
+
+    def __init__(self, path: str = FEED_CORPUS_FILE):
+        self.path = path
+        self.count = 0
+        self._names = _source_names()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = gzip.open(path, 'at', encoding='utf-8')
+
+    def record(self, url: str, status: int, headers: Mapping[str, str], content: Optional[bytes],
+               elapsed: float, source: Optional[str] = None):
+        if status == 304:
+            return
+        entry = {
+            "url": url,
+            "source": source or self._names.get(url),
+            "recorded_at": time.time(),
+            "status": status,
+            "headers": {key.lower(): value for key, value in headers.items() if key.lower() not in _DROPPED_HEADERS},
+            "elapsed": round(elapsed, 4),
+            "content": base64.b64encode(content or b"").decode('ascii'),
+        }
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class FeedCorpusReplay:
+    """
+    Rögzített válaszok visszajátszása URL szerint.
+
+    - `speed > 0`: virtuális óra - az első kérés óta eltelt idő × `speed` szerinti legutolsó pillanatkép jön,
+      a rögzített letöltési idő `speed`-del osztva késleltet (1 = valós idő, 60 = egy óra egy perc alatt).
+    - `speed = 0`: késleltetés nélkül; URL-enként minden kérés a következő pillanatképet kapja (az utolsónál megáll).
+    - `If-None-Match` / `If-Modified-Since` egyezésnél 304 jön, mint az élő szervereknél.
+    - Rögzítetlen URL: 404.
+    """
+
+    def __init__(self, path: str = FEED_CORPUS_FILE, speed: float = FEED_REPLAY_SPEED):
+        self.path = path
+        self.speed = max(0.0, speed)
+        self.snapshots: Dict[str, List[Dict]] = {}
+        self.stats = {"requests": 0, "not_modified": 0, "missing": 0}
+        self._cursors: Dict[str, int] = {}
+        self._started: Optional[float] = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        if not entries:
+            return
+        base_time = min(entry['recorded_at'] for entry in entries)
+        for entry in sorted(entries, key=lambda item: item['recorded_at']):
+            entry['offset'] = entry['recorded_at'] - base_time
+            self.snapshots.setdefault(entry['url'], []).append(entry)
+
+    def sources(self) -> Dict[str, int]:
+        """Forrásnév → pillanatképek száma."""
+        return {snapshots[0].get('source') or url: len(snapshots) for url, snapshots in self.snapshots.items()}
+
+    def _select(self, url: str) -> Optional[Dict]:
+        snapshots = self.snapshots.get(url)
+        if not snapshots:
+            return None
+        with self._lock:
+            if self._started is None:
+                self._started = time.monotonic()
+            if self.speed > 0:
+                virtual_time = (time.monotonic() - self._started) * self.speed
+                chosen = snapshots[0]
+                for snapshot in snapshots:
+                    if snapshot['offset'] > virtual_time:
+                        break
+                    chosen = snapshot
+                return chosen
+            index = self._cursors.get(url, 0)
+            self._cursors[url] = index + 1
+            return snapshots[min(index, len(snapshots) - 1)]
+
+    def respond(self, url: str, request_headers: Mapping[str, str]) -> Tuple[int, Dict[str, str], bytes, float]:
+        """(státusz, fejlécek, törzs, késleltetés másodpercben) egy kérésre."""
+        with self._lock:
+            self.stats["requests"] += 1
+        snapshot = self._select(url)
+        if snapshot is None:
+            with self._lock:
+                self.stats["missing"] += 1
+            return 404, {}, b"", 0.0
+
+        headers = dict(snapshot['headers'])
+        latency = snapshot['elapsed'] / self.speed if self.speed > 0 else 0.0
+        request_headers = {key.lower(): value for key, value in request_headers.items()}
+        etag, last_modified = headers.get('etag'), headers.get('last-modified')
+        if (etag and request_headers.get('if-none-match') == etag) or \
+                (last_modified and request_headers.get('if-modified-since') == last_modified):
+            with self._lock:
+                self.stats["not_modified"] += 1
+            return 304, headers, b"", latency
+        return snapshot['status'], headers, base64.b64decode(snapshot['content']), latency
+
+
+# === TRANSPORTOK ===
+
+class ReplayAsyncTransport(httpx.AsyncBaseTransport):
+    """httpx transport az `AsyncFeedFetcher`-hez: hálózat helyett a korpusz válaszol."""
+
+    def __init__(self, replay: FeedCorpusReplay):
+        self.replay = replay
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        status, headers, content, latency = self.replay.respond(str(request.url), request.headers)
+        if latency:
+            await asyncio.sleep(latency)
+        return httpx.Response(status, headers=headers, content=content, request=request)
+
+
+class RecordingAsyncTransport(httpx.AsyncBaseTransport):
+    """httpx transport, ami a valódi választ továbbadja és közben rögzíti."""
+
+    def __init__(self, recorder: FeedCorpusRecorder, wrapped: Optional[httpx.AsyncBaseTransport] = None):
+        self.recorder = recorder
+        self.wrapped = wrapped or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start_time = time.time()
+        response = await self.wrapped.handle_async_request(request)
+        content = await response.aread()
+        self.recorder.record(str(request.url), response.status_code, response.headers, content, time.time() - start_time)
+        return response
+
+    async def aclose(self):
+        await self.wrapped.aclose()
+
+
+class ReplayHTTPAdapter(BaseAdapter):
+    """requests adapter (NewsScraper / DataCollector / test_master szinkron letöltései) a korpuszból."""
+
+    def __init__(self, replay: FeedCorpusReplay):
+        super().__init__()
+        self.replay = replay
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        status, headers, content, latency = self.replay.respond(request.url, request.headers)
+        if latency:
+            time.sleep(latency)
+        response = requests.Response()
+        response.status_code = status
+        response.reason = http.client.responses.get(status, "")
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(content)
+        response._content = content
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+class RecordingHTTPAdapter(HTTPAdapter):
+    """requests adapter, ami a valódi választ rögzíti."""
+
+    def __init__(self, recorder: FeedCorpusRecorder, **kwargs):
+        super().__init__(**kwargs)
+        self.recorder = recorder
+
+    def send(self, request, **kwargs):
+        start_time = time.time()
+        response = super().send(request, **kwargs)
+        self.recorder.record(request.url, response.status_code, response.headers, response.content, time.time() - start_time)
+        return response
+
+
+# === KÖZÖS ÁLLAPOT ===
+# Egy folyamatban egy mód, egy korpusz: a scraper, a DataCollector és a test_master ugyanazt a visszajátszást látja
+
+_config = {"mode": FEED_TRANSPORT_MODE, "corpus": FEED_CORPUS_FILE, "speed": FEED_REPLAY_SPEED}
+_replay: Optional[FeedCorpusReplay] = None
+_recorder: Optional[FeedCorpusRecorder] = None
+_state_lock = threading.Lock()
+
+
+def configure_feed_transport(mode: Optional[str] = None, corpus_path: Optional[str] = None, speed: Optional[float] = None):
+    """Mód / korpusz / sebesség felülírása (CLI); a scraper és a DataCollector létrehozása előtt kell hívni."""
+    global _replay, _recorder
+    if mode is not None and mode not in ("live", "record", "replay"):
+        raise ValueError(f"Ismeretlen feed mód: {mode}")
+    with _state_lock:
+        for key, value in (("mode", mode), ("corpus", corpus_path), ("speed", speed)):
+            if value is not None:
+                _config[key] = value
+        if _recorder:
+            _recorder.close()
+        _replay, _recorder = None, None
+
+
+def get_feed_mode() -> str:
+    return _config["mode"]
+
+
+def get_feed_replay() -> FeedCorpusReplay:
+    global _replay
+    with _state_lock:
+        if _replay is None:
+            _replay = FeedCorpusReplay(_config["corpus"], _config["speed"])
+            print(f"📼 Feed visszajátszás: {_config['corpus']} ({len(_replay.snapshots)} URL, sebesség: {_config['speed'] or 'max'})")
+        return _replay
+
+
+def get_feed_recorder() -> FeedCorpusRecorder:
+    global _recorder
+    with _state_lock:
+        if _recorder is None:
+            _recorder = FeedCorpusRecorder(_config["corpus"])
+            print(f"🔴 Feed rögzítés: {_config['corpus']}")
+        return _recorder
+
+
+def async_feed_transport() -> Optional[httpx.AsyncBaseTransport]:
+    """Új httpx transport a beállított módhoz (a kliens lezárja); élő módban None = alapértelmezett."""
+    mode = get_feed_mode()
+    if mode == "replay":
+        return ReplayAsyncTransport(get_feed_replay())
+    if mode == "record":
+        return RecordingAsyncTransport(get_feed_recorder())
+    return None
+
+
+def mount_feed_transport(session: requests.Session):
+    """A beállított mód adapterének felszerelése egy requests sessionre (élő módban nem változik semmi)."""
+    mode = get_feed_mode()
+    if mode == "replay":
+        adapter = ReplayHTTPAdapter(get_feed_replay())
+    elif mode == "record":
+        adapter = RecordingHTTPAdapter(get_feed_recorder())
+    else:
+        return
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+
+def record_sources(sources: List[Dict], path: str = FEED_CORPUS_FILE, rounds: int = 1,
+                   interval_seconds: float = 0.0, headers: Optional[Dict[str, str]] = None) -> int:
+    """A források teljes (feltétel nélküli) letöltése és rögzítése `rounds` körben, `interval_seconds` szünetekkel."""
+    from scraper.async_fetcher import AsyncFeedFetcher
+
+    recorder = FeedCorpusRecorder(path)
+    try:
+        for round_index in range(rounds):
+            round_start = time.time()
+            fetcher = AsyncFeedFetcher(headers=headers, transport=RecordingAsyncTransport(recorder))
+            results = fetcher.fetch_all_sync(sources)
+            failed = sum(1 for result in results if result['error'])
+            print(f"🔴 {round_index + 1}/{rounds}. kör: {len(results) - failed}/{len(results)} feed rögzítve "
+                  f"({time.time() - round_start:.1f}s), összesen {recorder.count} válasz")
+            if round_index + 1 < rounds:
+                time.sleep(max(0.0, interval_seconds - (time.time() - round_start)))
+    finally:
+        recorder.close()
+    return recorder.count
+
+
+def main():
+    from config.sources import NEWS_SOURCES
+
+    parser = argparse.ArgumentParser(description="HírMagnet feed korpusz rögzítés / ellenőrzés")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    record_parser = subparsers.add_parser('record', help="Az aktív NEWS_SOURCES feedek rögzítése")
+    record_parser.add_argument('--corpus', default=FEED_CORPUS_FILE)
+    record_parser.add_argument('--rounds', type=int, default=1, help="Rögzítési körök száma")
+    record_parser.add_argument('--interval-minutes', type=float, default=10, help="Körök közötti idő")
+    record_parser.add_argument('--sources', nargs='*', help="Csak ezek a források (név szerint)")
+    info_parser = subparsers.add_parser('info', help="Korpusz tartalma")
+    info_parser.add_argument('--corpus', default=FEED_CORPUS_FILE)
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        from scraper.news_scraper import SCRAPER_HEADERS
+        sources = [source for source in NEWS_SOURCES if source.get('active', True)
+                   and (not args.sources or source['name'] in args.sources)]
+        sources.sort(key=lambda source: source.get('priority', 99))
+        count = record_sources(sources, args.corpus, args.rounds, args.interval_minutes * 60, headers=SCRAPER_HEADERS)
+        print(f"💾 {count} válasz rögzítve: {args.corpus} ({os.path.getsize(args.corpus) / 1024 / 1024:.1f} MB)")
+    else:
+        replay = FeedCorpusReplay(args.corpus)
+        sources = replay.sources()
+        print(f"📼 {args.corpus}: {len(sources)} URL, {sum(sources.values())} pillanatkép")
+        for name, count in sorted(sources.items()):
+            print(f"   {name}: {count}")
+
+
+if __name__ == "__main__":
+    main()
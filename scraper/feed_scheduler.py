@@ -0,0 +1,169 @@
+# scraper/feed_scheduler.py - ADAPTÍV FEED ÜTEMEZŐ
+# Feedenkénti lekérdezési időköz a megfigyelt publikálási ütem alapján
+
+import os
+import json
+import time
+import calendar
+import threading
+from typing import Dict, List, Optional
+
+from config.settings import (
+    FEED_SCHEDULE_FILE,
+    FEED_POLL_MIN_MINUTES,
+    FEED_POLL_MAX_MINUTES,
+    FEED_POLL_FAST_LANE_MIN_MINUTES,
+)
+from config.sources import is_fast_lane_source
+
+# Ennyi legfrissebb bejegyzés időbélyegéből becsüljük a publikálási ütemet
+CADENCE_SAMPLE_SIZE = 20
+# Egy hétnél régebbi bejegyzések nem számítanak bele az ütembe
+CADENCE_WINDOW_SECONDS = 7 * 24 * 3600
+# A becsült publikálási időköz ekkora hányadában kérdezünk le (2x mintavétel)
+POLL_TO_PUBLISH_RATIO = 0.5
+# Új becslés súlya az exponenciális simításban
+CADENCE_SMOOTHING = 0.5
+# Változatlan feed / hiba esetén az időköz szorzója
+UNCHANGED_BACKOFF = 1.25
+ERROR_BACKOFF = 2.0
+
+
+class AdaptiveFeedScheduler:
+    """
+    Adaptív feed ütemező.
+
+    Minden feedhez nyilvántartja a becsült publikálási időközt és a következő
+    lekérdezés idejét. A busy feedek a minimum közelében, a ritkán frissülők a
+    maximum közelében kerülnek lekérdezésre. A Fast Lane források alacsonyabb
+    minimumot kapnak (`FEED_POLL_FAST_LANE_MIN_MINUTES`).
+    """
+
+    def __init__(self, path: Optional[str] = FEED_SCHEDULE_FILE):
+        self.path = path
+        self.state: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Feed ütemező állapot betöltési hiba: {e}")
+            self.state = {}
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with self._lock:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.state, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"⚠️ Feed ütemező állapot mentési hiba: {e}")
+
+    # === IDŐKÖZ HATÁROK ===
+
+    def min_interval(self, source: Dict) -> float:
+        if is_fast_lane_source(source['name']):
+            return FEED_POLL_FAST_LANE_MIN_MINUTES * 60
+        return FEED_POLL_MIN_MINUTES * 60
+
+    def max_interval(self, source: Dict) -> float:
+        return FEED_POLL_MAX_MINUTES * 60
+
+    def _clamp(self, source: Dict, interval: float) -> float:
+        return max(self.min_interval(source), min(self.max_interval(source), interval))
+
+    # === ÜTEMEZÉS ===
+
+    def due_sources(self, sources: List[Dict], now: Optional[float] = None) -> List[Dict]:
+        """Az esedékes források, a bemeneti (prioritás) sorrend megtartásával."""
+        now = now or time.time()
+        with self._lock:
+            return [s for s in sources if self.state.get(s['url'], {}).get('next_poll', 0) <= now]
+
+    def next_poll_at(self, source: Dict) -> float:
+        return self.state.get(source['url'], {}).get('next_poll', 0)
+
+    def record_poll(self, source: Dict, entries=None, new_articles: int = 0,
+                    changed: bool = True, now: Optional[float] = None):
+        """Sikeres lekérdezés rögzítése; `changed=False` a 304 / azonos hash eset."""
+        now = now or time.time()
+        with self._lock:
+            feed_state = self.state.setdefault(source['url'], {'name': source['name'], 'polls': 0, 'changes': 0})
+            previous_interval = feed_state.get('interval', self.min_interval(source))
+
+            publish_interval = self._estimate_publish_interval(entries, now) if changed else None
+            if publish_interval is not None:
+                estimate = feed_state.get('publish_interval')
+                if estimate:
+                    publish_interval = CADENCE_SMOOTHING * publish_interval + (1 - CADENCE_SMOOTHING) * estimate
+                feed_state['publish_interval'] = publish_interval
+                interval = publish_interval * POLL_TO_PUBLISH_RATIO
+            elif changed:
+                interval = previous_interval
+            else:
+                interval = previous_interval * UNCHANGED_BACKOFF
+
+            # Ha tényleg jött új cikk, ne lassuljunk a becslés miatt
+            if new_articles > 0:
+                interval = min(interval, previous_interval)
+
+            interval = self._clamp(source, interval)
+            feed_state['polls'] += 1
+            feed_state['changes'] += 1 if changed else 0
+            feed_state['interval'] = interval
+            feed_state['last_poll'] = now
+            feed_state['next_poll'] = now + interval
+            feed_state['errors'] = 0
+
+    def record_error(self, source: Dict, now: Optional[float] = None):
+        """Sikertelen lekérdezés: az időköz duplázódik (maximumig)."""
+        now = now or time.time()
+        with self._lock:
+            feed_state = self.state.setdefault(source['url'], {'name': source['name'], 'polls': 0, 'changes': 0})
+            interval = self._clamp(source, feed_state.get('interval', self.min_interval(source)) * ERROR_BACKOFF)
+            feed_state['interval'] = interval
+            feed_state['last_poll'] = now
+            feed_state['next_poll'] = now + interval
+            feed_state['errors'] = feed_state.get('errors', 0) + 1
+
+    def _estimate_publish_interval(self, entries, now: float) -> Optional[float]:
+        """Átlagos publikálási időköz (mp) a bejegyzések időbélyegeiből; None, ha nem becsülhető."""
+        timestamps = []
+        for entry in entries or []:
+            parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+            if not parsed:
+                continue
+            try:
+                timestamp = calendar.timegm(parsed)
+            except Exception:
+                continue
+            if now - CADENCE_WINDOW_SECONDS <= timestamp <= now + 3600:
+                timestamps.append(timestamp)
+
+        timestamps = sorted(timestamps, reverse=True)[:CADENCE_SAMPLE_SIZE]
+        if len(timestamps) < 2:
+            return None
+
+        span = timestamps[0] - timestamps[-1]
+        # A legutóbbi bejegyzés óta eltelt idő is jelzés: egy elhallgatott feed lassuljon
+        average_gap = span / (len(timestamps) - 1)
+        return max(average_gap, now - timestamps[0])
+
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            intervals = [s['interval'] for s in self.state.values() if 'interval' in s]
+        return {
+            "tracked_feeds": len(intervals),
+            "avg_interval_minutes": (sum(intervals) / len(intervals) / 60) if intervals else 0,
+            "min_interval_minutes": min(intervals) / 60 if intervals else 0,
+            "max_interval_minutes": max(intervals) / 60 if intervals else 0,
+        }
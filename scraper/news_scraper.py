@@ -8,34 +8,59 @@ from sqlalchemy.orm import Session
 from database.db import get_db_session
 from database.models import Article, ProcessingLog
 from config.sources import NEWS_SOURCES
-from config.settings import MAX_ARTICLES_PER_SOURCE, REQUEST_TIMEOUT
+from config.settings import MAX_ARTICLES_PER_SOURCE, REQUEST_TIMEOUT, SCRAPER_SEEN_URL_CACHE_SIZE
+from scraper.async_fetcher import AsyncFeedFetcher
+from scraper.feed_cache import FeedValidatorCache
+from scraper.feed_corpus import async_feed_transport, get_feed_mode, mount_feed_transport
+from scraper.feed_scheduler import AdaptiveFeedScheduler
+from scraper.text_cleaner import clean_html
 import time
 import hashlib
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
 from dateutil import parser as date_parser
 
-# === TAKTIKAI DEKONTAMINÁCIÓS EGYSÉG IMPORTÁLÁSA ===
-import re
-from bs4 import BeautifulSoup
-# ====================================================
-
 
 # === JAVÍTÁS: STAHLFILTER KONFIGURÁCIÓ (SZÓ-ALAPÚ) ===
 MINIMUM_WORD_COUNT = 100  # Az Acélszűrő minimális szólimtje
 # =======================================================
 
+SCRAPER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36'
+}
+
 class NewsScraperError(Exception):
     pass
 
 class NewsScraper:
     def __init__(self):
         self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36'
-        })
+        self.session.headers.update(SCRAPER_HEADERS)
+        # Feed korpusz rögzítés / visszajátszás (FEED_TRANSPORT_MODE)
+        mount_feed_transport(self.session)
+        # Visszajátszáskor memóriában: ismételhető futás, az éles állapot érintetlen marad
+        persistent_state = get_feed_mode() != "replay"
+        # ETag / Last-Modified / body hash feedenként - változatlan feedet nem dolgozunk fel újra
+        self.validator_cache = FeedValidatorCache() if persistent_state else FeedValidatorCache(path=None)
+        # Nemrég látott URL-ek hash-e (LRU) - a legtöbb bejegyzés DB lekérdezés nélkül kiszűrhető
+        self.seen_url_hashes = OrderedDict()
+        # Feedenkénti adaptív lekérdezési időköz
+        self.feed_scheduler = AdaptiveFeedScheduler() if persistent_state else AdaptiveFeedScheduler(path=None)
+        # Az aktuális forrásból elmentett cikkek ID-i (streaming pipeline értesítéshez)
+        self._saved_article_ids = []
         
-    def scrape_all_sources(self):
-        """Összes aktív forrás lescrapelése STRATÉGIAI PRIORITÁS szerint."""
+    def scrape_due_sources(self, on_new_articles: Optional[Callable[[List[int]], None]] = None):
+        """Csak az adaptív ütemező szerint esedékes források lescrapelése."""
+        return self.scrape_all_sources(only_due=True, on_new_articles=on_new_articles)
+
+    def scrape_all_sources(self, only_due: bool = False,
+                           on_new_articles: Optional[Callable[[List[int]], None]] = None):
+        """
+        Összes aktív forrás lescrapelése STRATÉGIAI PRIORITÁS szerint.
+        `on_new_articles`: forrásonként, a commit után hívódik az új cikkek ID-ival.
+        """
         total_new_articles = 0
+        unchanged_feeds = 0
         db = get_db_session()
         
         start_time = time.time()
@@ -43,26 +68,55 @@ class NewsScraper:
         try:
             # A források sorba rendezése a `priority` mező alapján
             sorted_sources = sorted([s for s in NEWS_SOURCES if s.get('active', True)], key=lambda x: x.get('priority', 99))
+            if only_due:
+                active_count = len(sorted_sources)
+                sorted_sources = self.feed_scheduler.due_sources(sorted_sources)
+                print(f"⏱️ Adaptív ütemező: {len(sorted_sources)}/{active_count} forrás esedékes.")
+                if not sorted_sources:
+                    return 0
             print(f"🎖️ Stratégiai sorrend felállítva. {len(sorted_sources)} aktív forrás a célkeresztben.")
 
-            for source in sorted_sources:
+            # Párhuzamos letöltés (prioritás szerinti ütemezés), utána sorrendben feldolgozás
+            fetcher = AsyncFeedFetcher(headers=dict(self.session.headers), validator_cache=self.validator_cache,
+                                       transport=async_feed_transport())
+            fetch_results = fetcher.fetch_all_sync(sorted_sources)
+            print(f"⚡ Párhuzamos letöltés kész: {len(fetch_results)} feed {time.time() - start_time:.1f} másodperc alatt.")
+
+            for result in fetch_results:
+                source = result['source']
+                if result['not_modified']:
+                    unchanged_feeds += 1
+                    self.feed_scheduler.record_poll(source, changed=False)
+                    continue
+
                 print(f"\n🔍 Támadás alatt: {source['name']} (Prioritás: {source.get('priority', 'N/A')})")
                 try:
-                    new_count = self._scrape_single_source(source, db)
+                    if result['error']:
+                        raise Exception(f"RSS letöltési hiba ({result['error']})")
+
+                    self._saved_article_ids = []
+                    new_count, complete = self._process_feed_content(result['content'], source, db)
+                    # Részleges mentésnél a validátor marad: a következő kör újra letölti, az elveszett cikkek újra jönnek
+                    if complete:
+                        self.validator_cache.update(source['url'], result['headers'], result['content'])
                     total_new_articles += new_count
+                    if on_new_articles and self._saved_article_ids:
+                        on_new_articles(list(self._saved_article_ids))
                     if new_count > 0:
                         print(f"✅ Sikeres behatolás: {source['name']} - {new_count} új cikk biztosítva.")
                     else:
                         print(f"ⓘ {source['name']}: Nincs új harcászati értékű információ.")
                     
-                    time.sleep(0.5)
-                    
                 except Exception as e:
+                    self.feed_scheduler.record_error(source)
                     error_message = f"Hiba a(z) '{source['name']}' frontszakaszán: {str(e)}"
                     print(f"❌ {error_message}")
                     self._log_error(db, "scraping", source['name'], error_message)
                     continue
             
+            self.validator_cache.save()
+            self.feed_scheduler.save()
+            print(f"\n💤 Változatlan feed (304 / azonos hash): {unchanged_feeds} db - kihagyva.")
             processing_time = time.time() - start_time
             
             log = ProcessingLog(
@@ -84,93 +138,170 @@ class NewsScraper:
             db.close()
 
     def _clean_html_content(self, html_content: str) -> str:
-        """Taktikai Dekontaminációs eljárás a nyers HTML tartalomhoz."""
-        if not html_content:
-            return ""
-        try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            for script in soup(["script", "style"]):
-                script.decompose()
-            text = soup.get_text()
-            return re.sub(r'\s+', ' ', text).strip()
-        except Exception:
-            text = re.sub(r'<[^>]+>', '', html_content)
-            return re.sub(r'\s+', ' ', text).strip()
+        """Taktikai Dekontaminációs eljárás a nyers HTML tartalomhoz (közös text_cleaner)."""
+        return clean_html(html_content)
 
     def _scrape_single_source(self, source, db: Session):
-        """Egy forrás lescrapelése"""
+        """Egy forrás lescrapelése (szinkron, egyedi futtatáshoz)"""
         try:
-            response = self.session.get(source['url'], timeout=REQUEST_TIMEOUT)
+            response = self.session.get(source['url'], timeout=REQUEST_TIMEOUT,
+                                        headers=self.validator_cache.conditional_headers(source['url']))
             response.raise_for_status()
-            feed = feedparser.parse(response.content)
-            if not feed.entries: return 0
-            
-            new_articles = 0
-            for entry in feed.entries[:MAX_ARTICLES_PER_SOURCE]:
-                try:
-                    if self._save_article(entry, source, db):
-                        new_articles += 1
-                except Exception as e:
-                    print(f"  ⚠️ Cikk mentési hiba ({entry.get('link', 'N/A')}): {str(e)}")
-                    continue
-            return new_articles
+            if self.validator_cache.is_unchanged(source['url'], response.status_code, response.content):
+                return 0
+            new_count, complete = self._process_feed_content(response.content, source, db)
+            if complete:
+                self.validator_cache.update(source['url'], response.headers, response.content)
+            return new_count
         except Exception as e:
             raise Exception(f"RSS letöltési hiba")
-    
-    def _save_article(self, entry, source_config, db: Session):
-        """Cikk mentése az adatbázisba a megerősített STAHLFILTER doktrínával."""
-        try:
+
+    def _process_feed_content(self, content: bytes, source, db: Session) -> Tuple[int, bool]:
+        """
+        Letöltött feed feldolgozása és az új cikkek mentése.
+        Visszaad: (új cikkek száma, teljes-e) - a validátor csak teljes mentés után frissülhet.
+        """
+        feed = feedparser.parse(content)
+        if not feed.entries:
+            self.feed_scheduler.record_poll(source, entries=[], new_articles=0)
+            return 0, True
+        new_articles, failed = self._save_articles(feed.entries[:MAX_ARTICLES_PER_SOURCE], source, db)
+        self.feed_scheduler.record_poll(source, entries=feed.entries, new_articles=new_articles)
+        return new_articles, failed == 0
+
+    def _save_articles(self, entries, source_config, db: Session) -> Tuple[int, int]:
+        """
+        Egy forrás bejegyzéseinek mentése a STAHLFILTER doktrínával.
+        URL-duplikáció: memóriabeli hash-halmaz + EGY `IN (...)` lekérdezés a batch-re,
+        majd egyetlen bulk insert és egyetlen commit forrásonként.
+        Visszaad: (mentett, sikertelen) - sikertelen a feldolgozási vagy mentési hibás bejegyzés, az elutasított nem.
+        """
+        candidate_urls = [entry.get('link', '') for entry in entries if entry.get('link', '')]
+        known_urls = self._find_known_urls(candidate_urls, db)
+        
+        new_articles = []
+        failed = 0
+        for entry in entries:
             article_url = entry.get('link', '')
-            if not article_url: return False
-                
-            existing = db.query(Article).filter(Article.url == article_url).first()
-            if existing: return False
-            
-            title = entry.get('title', '').strip()
-            if not title: return False
-                
-            published_at = None
-            if 'published' in entry:
-                try:
-                    published_at = date_parser.parse(entry.published)
-                except:
-                    pass
-            
-            raw_content = ""
-            if 'summary' in entry:
-                raw_content = entry.summary
-            elif 'description' in entry:
-                raw_content = entry.description
-
-            clean_content = self._clean_html_content(raw_content)
-
-            # === JAVÍTÁS: STAHLFILTER DOKTRÍNA (SZÓ-ALAPÚ) ===
-            # A karakterek helyett a szavak számát ellenőrizzük
-            word_count = len(clean_content.split())
-            if word_count < MINIMUM_WORD_COUNT:
-                #print(f"  🛡️ STAHLFILTER: Cikk elutasítva - túl rövid ({word_count} szó). Cím: {title[:50]}...")
-                return False
-            # ===============================================
-            
-            article = Article(
-                title=title,
-                original_title=title,
-                original_content=clean_content,
-                url=article_url,
-                source=source_config['name'],
-                category=source_config.get('category', 'general'),
-                published_at=published_at,
-                is_processed=False
-            )
-            
-            db.add(article)
+            if not article_url or article_url in known_urls:
+                continue
+            known_urls.add(article_url)  # feeden belüli ismétlődés ellen
+            try:
+                article = self._build_article(entry, source_config)
+            except Exception as e:
+                print(f"  ⚠️ Cikk feldolgozási hiba ({article_url}): {str(e)}")
+                failed += 1
+                continue
+            # Az URL csak sikeres mentés (_bulk_insert) vagy végleges elutasítás (_build_article) után kerül a halmazba
+            if article is not None:
+                new_articles.append(article)
+        
+        if not new_articles:
+            return 0, failed
+        saved = self._bulk_insert(new_articles, db)
+        return saved, failed + len(new_articles) - saved
+
+    def _find_known_urls(self, urls, db: Session) -> set:
+        """A batch már ismert URL-jei: előbb a memóriabeli hash-halmaz, a maradékra egy DB lekérdezés."""
+        known = {url for url in urls if self._url_hash(url) in self.seen_url_hashes}
+        unresolved = [url for url in urls if url not in known]
+        if unresolved:
+            for (url,) in db.query(Article.url).filter(Article.url.in_(unresolved)).all():
+                known.add(url)
+                self._remember_url(url)
+        return known
+
+    def _bulk_insert(self, articles, db: Session) -> int:
+        """Új cikkek mentése egy tranzakcióban; ütközésnél soronkénti visszaesés."""
+        try:
+            db.add_all(articles)
+            db.flush()
+            article_ids = [article.id for article in articles]
+            article_urls = [article.url for article in articles]
             db.commit()
-            
-            return True
-            
+            self._saved_article_ids.extend(article_ids)
+            for article_url in article_urls:
+                self._remember_url(article_url)
+            return len(articles)
         except Exception as e:
             db.rollback()
-            raise Exception(f"Adatbázis mentési hiba: {str(e)}")
+            print(f"  ⚠️ Bulk mentési hiba, soronkénti mentés: {str(e)}")
+        
+        saved = 0
+        for article in articles:
+            try:
+                db.add(article)
+                db.flush()
+                article_id, article_url = article.id, article.url
+                db.commit()
+                self._saved_article_ids.append(article_id)
+                self._remember_url(article_url)
+                saved += 1
+            except Exception as e:
+                db.rollback()
+                print(f"  ⚠️ Cikk mentési hiba ({article.url}): {str(e)}")
+        return saved
+
+    @staticmethod
+    def _url_hash(url: str) -> str:
+        return hashlib.md5(url.encode('utf-8')).hexdigest()
+
+    def _remember_url(self, url: str):
+        """URL hash felvétele a korlátos méretű (LRU) halmazba."""
+        url_hash = self._url_hash(url)
+        self.seen_url_hashes[url_hash] = True
+        self.seen_url_hashes.move_to_end(url_hash)
+        while len(self.seen_url_hashes) > SCRAPER_SEEN_URL_CACHE_SIZE:
+            self.seen_url_hashes.popitem(last=False)
+    
+    def _save_article(self, entry, source_config, db: Session):
+        """Egyetlen cikk mentése (visszafelé kompatibilis belépési pont)."""
+        saved, _ = self._save_articles([entry], source_config, db)
+        return saved == 1
+
+    def _build_article(self, entry, source_config):
+        """Article objektum összeállítása a STAHLFILTER szűréssel; None, ha a bejegyzés elutasítva."""
+        article_url = entry.get('link', '')
+        
+        title = entry.get('title', '').strip()
+        if not title: return None
+            
+        published_at = None
+        if 'published' in entry:
+            try:
+                published_at = date_parser.parse(entry.published)
+            except:
+                pass
+        
+        raw_content = ""
+        if 'summary' in entry:
+            raw_content = entry.summary
+        elif 'description' in entry:
+            raw_content = entry.description
+
+        clean_content = self._clean_html_content(raw_content)
+
+        # === JAVÍTÁS: STAHLFILTER DOKTRÍNA (SZÓ-ALAPÚ) ===
+        # A karakterek helyett a szavak számát ellenőrizzük
+        word_count = len(clean_content.split())
+        if word_count < MINIMUM_WORD_COUNT:
+            #print(f"  🛡️ STAHLFILTER: Cikk elutasítva - túl rövid ({word_count} szó). Cím: {title[:50]}...")
+            # Végleges elutasítás: megjegyezzük, hogy ne tisztítsuk újra minden körben
+            self._remember_url(article_url)
+            return None
+        # ===============================================
+        
+        return Article(
+            title=title,
+            original_title=title,
+            original_content=clean_content,
+            clean_content=clean_content,
+            url=article_url,
+            source=source_config['name'],
+            category=source_config.get('category', 'general'),
+            published_at=published_at,
+            is_processed=False
+        )
     
     def _log_error(self, db: Session, action: str, source: str, error: str):
         """Hiba naplózása"""
@@ -0,0 +1,176 @@
+# scraper/text_cleaner.py - KÖZÖS SZÖVEG-NORMALIZÁLÓ
+# Egyetlen HTML → szöveg tisztító a scraper, a processor és az editorial AI számára
+
+import re
+import html
+import time
+from typing import Dict, List, Optional
+
+# Opcionális gyors parser backend
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+_SCRIPT_STYLE_RE = re.compile(r'<(script|style)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _clean_with_selectolax(html_content: str) -> str:
+    tree = HTMLParser(html_content)
+    for node in tree.css('script, style'):
+        node.decompose()
+    return tree.text(separator=' ')
+
+
+def _clean_with_regex(html_content: str) -> str:
+    text = _COMMENT_RE.sub(' ', html_content)
+    text = _SCRIPT_STYLE_RE.sub(' ', text)
+    # A címkék helyére szóköz kerül, hogy a "<p>a</p><p>b</p>" ne olvadjon "ab"-vé
+    text = _TAG_RE.sub(' ', text)
+    return html.unescape(text)
+
+
+def clean_html(html_content: Optional[str]) -> str:
+    """
+    HTML tartalom normalizálása sima szöveggé:
+    script/style eltávolítás, címkék törlése, HTML entitások dekódolása, whitespace összevonás.
+    """
+    if not html_content:
+        return ""
+
+    if '<' not in html_content and '&' not in html_content:
+        text = html_content
+    elif SELECTOLAX_AVAILABLE:
+        try:
+            text = _clean_with_selectolax(html_content)
+        except Exception:
+            text = _clean_with_regex(html_content)
+    else:
+        text = _clean_with_regex(html_content)
+
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def get_clean_content(article) -> str:
+    """
+    Az Article tisztított tartalma. Ha a `clean_content` még nincs kitöltve,
+    egyszer kiszámoljuk és az objektumon tároljuk, így a következő mentéssel
+    a sorba is bekerül és a későbbi fázisok már nem tisztítanak újra.
+    """
+    cached = getattr(article, 'clean_content', None)
+    if cached is not None:
+        return cached
+
+    cleaned = clean_html(getattr(article, 'original_content', None) or "")
+    try:
+        article.clean_content = cleaned
+    except Exception:
+        pass
+    return cleaned
+
+
+# === MIKRO-BENCHMARK ===
+
+def _legacy_scraper_clean(html_content: str) -> str:
+    """A korábbi NewsScraper._clean_html_content (BeautifulSoup html.parser)."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html_content, 'html.parser')
+    for script in soup(["script", "style"]):
+        script.decompose()
+    return re.sub(r'\s+', ' ', soup.get_text()).strip()
+
+
+def _legacy_regex_clean(html_content: str) -> str:
+    """A korábbi processor / editorial AI _clean_content (regex)."""
+    clean = re.sub(r'<[^>]+>', '', html_content)
+    return re.sub(r'\s+', ' ', clean).strip()
+
+
+def load_feed_payload_corpus(feed_payloads: List[bytes]) -> List[str]:
+    """Nyers feed válaszokból a bejegyzések HTML summary/description mezői."""
+    import feedparser
+    corpus = []
+    for payload in feed_payloads:
+        feed = feedparser.parse(payload)
+        for entry in feed.entries:
+            raw = entry.get('summary') or entry.get('description') or ""
+            if raw:
+                corpus.append(raw)
+    return corpus
+
+
+def read_feed_payload_files(path: str) -> List[bytes]:
+    """Elmentett feed válaszok beolvasása egy fájlból vagy egy könyvtár összes fájljából."""
+    import os
+    paths = [path] if os.path.isfile(path) else [
+        os.path.join(path, name) for name in sorted(os.listdir(path))
+        if os.path.isfile(os.path.join(path, name))
+    ]
+    payloads = []
+    for file_path in paths:
+        with open(file_path, 'rb') as f:
+            payloads.append(f.read())
+    return payloads
+
+
+def fetch_live_feed_payloads(limit: int = 20) -> List[bytes]:
+    """Élő feed válaszok letöltése a NEWS_SOURCES első `limit` aktív forrásából."""
+    from config.sources import NEWS_SOURCES
+    from scraper.async_fetcher import AsyncFeedFetcher
+
+    sources = [s for s in NEWS_SOURCES if s.get('active', True)][:limit]
+    results = AsyncFeedFetcher().fetch_all_sync(sources)
+    return [r['content'] for r in results if r['content'] and not r['error']]
+
+
+def benchmark_cleaners(corpus: List[str], rounds: int = 3) -> Dict[str, Dict]:
+    """Az új és a korábbi tisztító utak összehasonlítása ugyanazon a korpuszon."""
+    cleaners = {
+        "legacy_bs4_html_parser": _legacy_scraper_clean,
+        "legacy_regex": _legacy_regex_clean,
+        "clean_html": clean_html,
+    }
+    total_chars = sum(len(item) for item in corpus)
+    report = {}
+    for name, cleaner in cleaners.items():
+        best = None
+        for _ in range(rounds):
+            start_time = time.perf_counter()
+            for item in corpus:
+                cleaner(item)
+            elapsed = time.perf_counter() - start_time
+            best = elapsed if best is None else min(best, elapsed)
+        report[name] = {
+            "seconds": best,
+            "docs_per_sec": len(corpus) / best if best else 0,
+            "mb_per_sec": total_chars / 1e6 / best if best else 0,
+        }
+    return report
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="HTML tisztító mikro-benchmark")
+    parser.add_argument('--corpus', type=str, default=None, help="Elmentett feed fájl vagy könyvtár (különben élő letöltés)")
+    parser.add_argument('--feeds', type=int, default=20, help="Élő letöltésnél a feedek száma")
+    parser.add_argument('--rounds', type=int, default=3, help="Ismétlések száma (a legjobb számít)")
+    args = parser.parse_args()
+
+    payloads = read_feed_payload_files(args.corpus) if args.corpus else fetch_live_feed_payloads(args.feeds)
+    corpus = load_feed_payload_corpus(payloads)
+    if not corpus:
+        print("❌ Üres korpusz - nincs mit mérni.")
+        return
+
+    print(f"🧪 Korpusz: {len(corpus)} bejegyzés, {sum(len(c) for c in corpus) / 1e6:.2f} MB HTML")
+    print(f"⚙️ Backend: {'selectolax' if SELECTOLAX_AVAILABLE else 'regex'}")
+    for name, stats in benchmark_cleaners(corpus, args.rounds).items():
+        print(f"   {name:<24} {stats['seconds'] * 1000:8.1f} ms | {stats['docs_per_sec']:10.0f} doc/s | {stats['mb_per_sec']:6.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
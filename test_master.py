@@ -4,7 +4,6 @@
 import asyncio
 import argparse
 import random
-import re
 from typing import List, Dict, Any
 from datetime import datetime
 
@@ -15,6 +14,8 @@ from scraper.news_scraper import NewsScraper
 from ai.editorial_ai import StrategicEditorialAI
 from ai.v5_orchestrator import ChimeraDualChannelOrchestrator
 from config.sources import NEWS_SOURCES
+from ai.providers import use_fake_providers
+from scraper.feed_corpus import configure_feed_transport
 
 # === TESZT KONFIGURÁCIÓ ===
 QUICK_MODE_SOURCES = [
@@ -207,7 +208,6 @@ async def run_master_test(mode: str, force_scrape: bool, generate_content: bool)
     
     NewsScraper._scrape_single_source_for_entries = _scrape_single_source_for_entries
     NewsScraper._create_article_object_from_entry = _create_article_object_from_entry
-    NewsScraper._clean_html_content = lambda self, text: re.sub(r'<[^>]+>', '', text or "")
 
     urls_seen = set() if force_scrape else {row.url for row in db.query(Article.url)}
     all_entries = []
@@ -275,6 +275,7 @@ async def run_master_test(mode: str, force_scrape: bool, generate_content: bool)
                 # Frissítjük a létező cikket
                 db_article.original_title = mem_article.original_title
                 db_article.original_content = mem_article.original_content
+                db_article.clean_content = mem_article.clean_content
                 db_article.is_processed = False
                 articles_for_orchestrator.append(db_article)
             else:
@@ -317,7 +318,7 @@ def _create_article_object_from_entry(self, entry, source_config):
         try: published_at = date_parser.parse(entry.published) 
         except: pass
     return Article(
-        title=title, original_title=title, original_content=clean_content,
+        title=title, original_title=title, original_content=clean_content, clean_content=clean_content,
         url=entry.get('link'), source=source_config['name'], 
         category=source_config.get('category', 'general'), published_at=published_at
     )
@@ -327,6 +328,18 @@ if __name__ == "__main__":
     parser.add_argument('--mode', type=str, choices=['quick', 'complete'], default='quick', help="A teszt módusza.")
     parser.add_argument('--force-scrape', action='store_true', help="Figyelmen kívül hagyja a meglévő cikkeket.")
     parser.add_argument('--generate-content', action='store_true', help="Lefuttatja a tényleges cikk-generálást is.")
+    parser.add_argument('--fake-llm', action='store_true', help="Offline, determinisztikus fake LLM / TTS az élő API-k helyett.")
+    parser.add_argument('--feed-mode', choices=['live', 'record', 'replay'], help="Feed letöltés: élő, rögzítés vagy offline visszajátszás.")
+    parser.add_argument('--corpus', help="Feed korpusz fájl (alapértelmezés: FEED_CORPUS_FILE).")
+    parser.add_argument('--replay-speed', type=float, help="Visszajátszási sebesség (0 = késleltetés nélkül, 1 = valós idő).")
     args = parser.parse_args()
     
+    if args.feed_mode or args.corpus or args.replay_speed is not None:
+        # A NewsScraper létrehozása előtt: a session és a httpx kliens ehhez a módhoz kap transportot
+        configure_feed_transport(args.feed_mode, args.corpus, args.replay_speed)
+    
+    if args.fake_llm:
+        # A komponensek létrehozása előtt: minden AI hívás a fake szolgáltatóhoz megy
+        use_fake_providers()
+    
     asyncio.run(run_master_test(args.mode, args.force_scrape, args.generate_content))
\ No newline at end of file